@@ -0,0 +1,224 @@
+"""
+Lookup akun user di belakang tool get_account_info (learn2_langchain.py).
+
+Sebelumnya get_account_info membaca dict USER_DATABASE di level modul. Di produksi datanya
+ada di tabel dengan jutaan akun, jadi lookup dipisah jadi dua lapis:
+
+- backend (AccountBackend): apa pun yang punya fetch_many(user_ids) -> {user_id: Account}.
+  SQLiteAccountBackend adalah pengganti lokal: tabel accounts dengan user_id sebagai
+  PRIMARY KEY (WITHOUT ROWID, lookup lewat index), satu koneksi per thread, batch lewat
+  `WHERE user_id IN (...)`.
+- AccountStore: read-through cache di depan backend (ttl_cache.TTLCache, key user_id).
+  get() untuk satu user, get_many() untuk banyak user sekaligus (satu query untuk semua
+  yang miss). Agent yang bersamaan menanyakan user yang sama berbagi satu fetch.
+
+    store = AccountStore.from_env(seed=USER_DATABASE)
+    account = store.get("user123")
+
+Benchmark:
+    python account_store.py
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from os import getenv
+from typing import Protocol
+
+from ttl_cache import TTLCache
+
+_BATCH = 500  # jumlah parameter per query IN (...), di bawah batas SQLite
+
+
+@dataclass(frozen=True)
+class Account:
+    user_id: str
+    name: str
+    account_type: str
+    balance: float
+    email: str
+
+    def summary(self) -> str:
+        return f"Account holder: {self.name}\nType: {self.account_type}\nBalance: ${self.balance:,.2f}"
+
+
+class AccountBackend(Protocol):
+    def fetch_many(self, user_ids: list[str]) -> dict[str, Account]: ...
+
+
+class SQLiteAccountBackend:
+    """Tabel akun di SQLite; aman dipakai dari banyak thread (koneksi per thread)."""
+
+    def __init__(self, path: str = ":memory:"):
+        if path == ":memory:":
+            # shared cache supaya semua koneksi thread melihat database memory yang sama
+            path = f"file:accounts-{id(self)}?mode=memory&cache=shared"
+        self.path = path
+        self._local = threading.local()
+        # koneksi pertama dipegang terus: database memory hilang kalau semua koneksi ditutup
+        self._keepalive = self._connect()
+        self._keepalive.execute(
+            "CREATE TABLE IF NOT EXISTS accounts ("
+            "user_id TEXT PRIMARY KEY, name TEXT NOT NULL, account_type TEXT NOT NULL, "
+            "balance REAL NOT NULL, email TEXT NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, uri=self.path.startswith("file:"), check_same_thread=False, timeout=30)
+        if not self.path.startswith("file:"):
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def upsert(self, accounts: Iterable[Account]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO accounts (user_id, name, account_type, balance, email) VALUES (?, ?, ?, ?, ?)",
+                ((a.user_id, a.name, a.account_type, a.balance, a.email) for a in accounts),
+            )
+
+    def seed(self, accounts: Iterable[Account]) -> bool:
+        """Isi tabel hanya kalau masih kosong; data yang sudah ada tidak ditimpa. True kalau diisi."""
+        conn = self._conn()
+        with conn:
+            # BEGIN IMMEDIATE: cek kosong + insert atomik, proses lain yang seed bersamaan menunggu
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM accounts)").fetchone()[0]:
+                return False
+            conn.executemany(
+                "INSERT INTO accounts (user_id, name, account_type, balance, email) VALUES (?, ?, ?, ?, ?)",
+                ((a.user_id, a.name, a.account_type, a.balance, a.email) for a in accounts),
+            )
+        return True
+
+    def fetch_many(self, user_ids: list[str]) -> dict[str, Account]:
+        conn = self._conn()
+        found: dict[str, Account] = {}
+        for i in range(0, len(user_ids), _BATCH):
+            batch = user_ids[i:i + _BATCH]
+            rows = conn.execute(
+                "SELECT user_id, name, account_type, balance, email FROM accounts "
+                f"WHERE user_id IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for row in rows:
+                found[row[0]] = Account(*row)
+        return found
+
+
+class AccountStore:
+    """Read-through cache (TTL + LRU + coalescing) di depan AccountBackend."""
+
+    def __init__(self, backend: AccountBackend, *, cache: TTLCache | None = None):
+        self.backend = backend
+        # user yang tidak ada di-cache lebih singkat, supaya akun baru cepat kelihatan
+        self.cache = cache or TTLCache(maxsize=100_000, ttl=60, negative_ttl=5)
+
+    @classmethod
+    def from_env(cls, seed: Mapping[str, Mapping] | None = None) -> AccountStore:
+        """Backend SQLite di ACCOUNT_DB_PATH (default in-memory), diisi dari dict kalau masih kosong.
+
+        Database yang sudah berisi (file yang dipakai ulang) tidak ditimpa data seed.
+        """
+        backend = SQLiteAccountBackend(getenv("ACCOUNT_DB_PATH", ":memory:"))
+        if seed:
+            backend.seed(Account(user_id=user_id, **fields) for user_id, fields in seed.items())
+        return cls(backend)
+
+    def _load_one(self, user_id: str) -> Account | None:
+        return self.backend.fetch_many([user_id]).get(user_id)
+
+    def get(self, user_id: str) -> Account | None:
+        return self.cache.get_or_load(user_id, self._load_one)
+
+    def get_many(self, user_ids: Iterable[str]) -> dict[str, Account | None]:
+        return self.cache.get_many_or_load(user_ids, self.backend.fetch_many)
+
+    def invalidate(self, user_id: str) -> None:
+        """Panggil setelah akun diubah di backend."""
+        self.cache.invalidate(user_id)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    n_accounts = 1_000_000
+    backend = SQLiteAccountBackend()
+    start = time.perf_counter()
+    backend.upsert(
+        Account(f"user{i}", f"User {i}", "Premium" if i % 5 == 0 else "Standard", i % 10_000, f"user{i}@example.com")
+        for i in range(n_accounts)
+    )
+    print(f"seed {n_accounts} akun: {time.perf_counter() - start:.1f}s")
+
+    fetches = []
+
+    class CountingBackend:
+        def fetch_many(self, user_ids):
+            fetches.append(len(user_ids))
+            return backend.fetch_many(user_ids)
+
+    rng = random.Random(0)
+    # trafik agent: sebagian kecil user sangat aktif
+    lookups = [f"user{min(int(rng.paretovariate(1.1)) * 37, n_accounts - 1)}" for _ in range(100_000)]
+
+    start = time.perf_counter()
+    for user_id in lookups:
+        backend.fetch_many([user_id])
+    direct = time.perf_counter() - start
+
+    store = AccountStore(CountingBackend())
+    start = time.perf_counter()
+    for user_id in lookups:
+        store.get(user_id)
+    cached = time.perf_counter() - start
+    print(f"{len(lookups)} lookup: langsung ke SQLite {direct / len(lookups) * 1e6:.1f}us/lookup, "
+          f"AccountStore {cached / len(lookups) * 1e6:.1f}us/lookup "
+          f"(hit rate {store.cache.stats.hit_rate:.1%}, {len(fetches)} fetch)")
+
+    class RemoteBackend:
+        """Backend dengan round trip 1ms per query, seperti database di host lain."""
+
+        def fetch_many(self, user_ids):
+            fetches.append(len(user_ids))
+            time.sleep(0.001)
+            return backend.fetch_many(user_ids)
+
+    ids = [f"user{i * 97}" for i in range(1_000)]
+    remote = RemoteBackend()
+    start = time.perf_counter()
+    for user_id in ids:
+        remote.fetch_many([user_id])
+    one_by_one = time.perf_counter() - start
+    fetches.clear()
+    store = AccountStore(remote)
+    start = time.perf_counter()
+    accounts = store.get_many(ids)
+    batched = time.perf_counter() - start
+    print(f"1000 user, round trip 1ms: satu-satu {one_by_one * 1000:.0f}ms, "
+          f"get_many {batched * 1000:.0f}ms ({len(fetches)} query)")
+    assert all(accounts[user_id] is not None for user_id in ids)
+
+    # 32 agent bersamaan menanyakan user yang sama ke backend yang lambat
+    class SlowBackend:
+        def fetch_many(self, user_ids):
+            fetches.append(len(user_ids))
+            time.sleep(0.05)
+            return backend.fetch_many(user_ids)
+
+    fetches.clear()
+    store = AccountStore(SlowBackend())
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda _: store.get("user123"), range(32)))
+    print(f"32 agent bersamaan untuk user123: {len(fetches)} fetch ke backend")
+    assert len(fetches) == 1 and all(r == results[0] for r in results)
@@ -0,0 +1,235 @@
+"""
+Event per langkah dari agent create_agent, di-stream selagi agent jalan.
+
+run_react_agent() di langchain3_learn.py menunggu agent.invoke selesai dulu, baru membaca
+response["messages"] untuk mencetak trace Thought/Action/Observation. Frontend baru bisa
+menampilkan sesuatu setelah seluruh loop ReAct selesai.
+
+stream_agent_events(agent, inputs) adalah async generator di atas
+agent.astream(stream_mode=["updates", "messages"]):
+- "messages" -> AgentEvent("token"): potongan teks jawaban model, begitu token datang
+- "updates" dari node model -> AgentEvent("tool_call") per tool call yang diputuskan model,
+  atau AgentEvent("final") kalau model menjawab tanpa tool call
+- "updates" dari node tools -> AgentEvent("observation") per hasil tool
+
+stream_many(agent, jobs) menjalankan banyak sesi (satu thread_id per sesi) di satu event
+loop dengan batas max_concurrency (concurrency.bounded_map) dan menggabungkan event semua
+sesi jadi satu stream (thread_id, AgentEvent). Error satu sesi jadi AgentEvent("error")
+untuk sesi itu saja. Antrian event dibatasi (max_buffered): kalau consumer lambat, sesi
+menunggu di put() alih-alih menumpuk token di memori.
+
+    async for event in stream_agent_events(agent, {"messages": [("user", "...")]}):
+        print(event.type, event.content)
+
+Benchmark 200 sesi:
+    python agent_events.py
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from concurrency import bounded_map
+
+EventType = Literal["token", "tool_call", "observation", "final", "error"]
+
+
+@dataclass(frozen=True)
+class AgentEvent:
+    type: EventType
+    step: int                      # nomor update graph (langkah loop ReAct) saat event terjadi
+    content: str = ""
+    name: str | None = None        # nama tool (tool_call / observation)
+    args: dict[str, Any] | None = None
+    call_id: str | None = None     # menghubungkan tool_call dengan observation-nya
+    node: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict, compare=False)
+
+
+def _update_messages(update: Any) -> list:
+    # node middleware bisa mengembalikan None atau update tanpa messages
+    if not isinstance(update, dict):
+        return []
+    messages = update.get("messages") or []
+    return messages if isinstance(messages, list) else [messages]
+
+
+async def stream_agent_events(agent, inputs: Any, config: dict | None = None) -> AsyncIterator[AgentEvent]:
+    """Event tiap langkah agent selagi jalan (token, tool_call, observation, final)."""
+    step = 0
+    async for mode, chunk in agent.astream(inputs, config, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if isinstance(message, AIMessageChunk) and message.text:
+                yield AgentEvent("token", step, message.text, node=metadata.get("langgraph_node"),
+                                 metadata=metadata)
+            continue
+        for node, update in chunk.items():
+            step += 1
+            for message in _update_messages(update):
+                if isinstance(message, ToolMessage):
+                    yield AgentEvent("observation", step, message.text, name=message.name,
+                                     call_id=message.tool_call_id, node=node)
+                elif isinstance(message, AIMessage) and message.tool_calls:
+                    for call in message.tool_calls:
+                        yield AgentEvent("tool_call", step, message.text, name=call["name"],
+                                         args=call["args"], call_id=call["id"], node=node)
+                elif isinstance(message, AIMessage):
+                    yield AgentEvent("final", step, message.text, node=node)
+
+
+def _session_config(config: dict | None, thread_id: str) -> dict:
+    config = dict(config or {})
+    config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+    return config
+
+
+async def stream_many(
+    agent,
+    jobs: Iterable[tuple[Any, str]] | AsyncIterable[tuple[Any, str]],
+    *,
+    max_concurrency: int = 64,
+    max_buffered: int = 1024,
+    config: dict | None = None,
+) -> AsyncIterator[tuple[str, AgentEvent]]:
+    """Event dari banyak sesi (input, thread_id) sekaligus, digabung sesuai urutan datang.
+
+    max_buffered: jumlah event maksimal yang menunggu consumer; sesudah itu sesi ikut melambat.
+    """
+    events: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+    done = object()
+
+    async def run(job):
+        inputs, thread_id = job
+        async for event in stream_agent_events(agent, inputs, _session_config(config, thread_id)):
+            await events.put((thread_id, event))
+
+    async def drive():
+        cancelled = False
+        try:
+            async for (_, thread_id), _, error in bounded_map(run, jobs, max_concurrency=max_concurrency):
+                if error is not None:
+                    await events.put((thread_id, AgentEvent("error", -1, f"{type(error).__name__}: {error}")))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # dibatalkan = consumer sudah berhenti: put() ke antrian penuh akan menunggu selamanya
+            if not cancelled:
+                await events.put(done)
+
+    driver = asyncio.create_task(drive())
+    try:
+        while (item := await events.get()) is not done:
+            yield item
+        await driver  # error di sisi input jobs diangkat lagi di sini
+    finally:
+        # consumer berhenti lebih awal (misal client disconnect): sesi yang masih jalan dibatalkan
+        if not driver.done():
+            driver.cancel()
+            await asyncio.gather(driver, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    from langchain.agents import create_agent
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+    from langchain_core.tools import tool
+
+    class ScriptedModel(BaseChatModel):
+        """Model palsu: panggil tool dulu, setelah ada observation jawab; latency seperti API."""
+
+        first_token_latency: float = 0.3
+        token_latency: float = 0.01
+
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def _reply(self, messages) -> AIMessage:
+            if isinstance(messages[-1], ToolMessage):
+                return AIMessage(f"Your order status is {messages[-1].text}. Anything else I can help with?")
+            return AIMessage("", tool_calls=[{"name": "order_status", "args": {"order_id": "ORD-999"},
+                                              "id": f"call-{len(messages)}"}])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            reply = self._reply(messages)
+            await asyncio.sleep(self.first_token_latency)
+            if reply.tool_calls:
+                yield ChatGenerationChunk(message=AIMessageChunk("", tool_calls=reply.tool_calls))
+                return
+            for word in reply.text.split(" "):
+                await asyncio.sleep(self.token_latency)
+                yield ChatGenerationChunk(message=AIMessageChunk(word + " "))
+
+    @tool
+    async def order_status(order_id: str) -> str:
+        """Gets the shipping status of an order."""
+        await asyncio.sleep(0.05)
+        return "Delivered"
+
+    agent = create_agent(ScriptedModel(), [order_status])
+    question = {"messages": [("user", "Where is my order ORD-999?")]}
+
+    async def one_session():
+        start = time.perf_counter()
+        first = None
+        trace = []
+        async for event in stream_agent_events(agent, question):
+            first = first or time.perf_counter() - start
+            trace.append(event.type)
+        return first, time.perf_counter() - start, trace
+
+    first, total, trace = asyncio.run(one_session())
+    print(f"1 sesi: event pertama {first * 1000:.0f}ms, selesai {total * 1000:.0f}ms (invoke baru mengembalikan "
+          f"hasil setelah {total * 1000:.0f}ms)")
+    print("  " + " -> ".join(dict.fromkeys(trace)))
+    assert trace[0] == "tool_call" and trace[1] == "observation" and trace[-1] == "final"
+
+    async def many_sessions(n):
+        start = time.perf_counter()
+        first_seen: dict[str, float] = {}
+        finals = 0
+        jobs = ((question, f"session-{i}") for i in range(n))
+        async for thread_id, event in stream_many(agent, jobs, max_concurrency=n):
+            first_seen.setdefault(thread_id, time.perf_counter() - start)
+            finals += event.type == "final"
+        elapsed = time.perf_counter() - start
+        firsts = sorted(first_seen.values())
+        return elapsed, firsts[len(firsts) // 2], firsts[-1], finals
+
+    n = 200
+    elapsed, first_p50, first_max, finals = asyncio.run(many_sessions(n))
+    print(f"{n} sesi bersamaan di 1 proses: selesai {elapsed:.2f}s (berurutan ~{n * total:.0f}s), "
+          f"event pertama p50 {first_p50 * 1000:.0f}ms / max {first_max * 1000:.0f}ms")
+    assert finals == n
+
+    async def slow_consumer(n, max_buffered):
+        """Consumer lambat lalu berhenti di tengah: antrian tidak melebihi batas, sesi dibatalkan."""
+        jobs = ((question, f"session-{i}") for i in range(n))
+        stream = stream_many(agent, jobs, max_concurrency=n, max_buffered=max_buffered)
+        received = 0
+        async for _ in stream:
+            received += 1
+            await asyncio.sleep(0.01)
+            if received == 50:
+                break
+        await stream.aclose()
+        return received
+
+    start = time.perf_counter()
+    received = asyncio.run(asyncio.wait_for(slow_consumer(n, max_buffered=16), timeout=30))
+    print(f"consumer lambat berhenti setelah {received} event: {time.perf_counter() - start:.2f}s, "
+          f"antrian maksimal 16 event")
@@ -0,0 +1,179 @@
+"""
+Cache key node LangGraph dari proyeksi state, bukan seluruh state.
+
+Key bawaan CachePolicy (default_cache_key) mem-pickle seluruh input node. Di AppState
+(langgraph_learn.py) field logs terus bertambah, jadi key manager selalu beda di tiap
+invoke (cache tidak pernah hit) dan list yang makin panjang itu di-pickle tiap kali.
+
+- CacheKeyExclude: penanda di Annotated untuk field yang tidak ikut key
+      logs: Annotated[list[str], CacheKeyExclude, AppendLogChannel]
+  Taruh SEBELUM reducer: StateGraph membaca reducer dari item Annotated terakhir.
+- state_cache_key(schema, include=None, exclude=()): bikin key_func untuk CachePolicy.
+  include = proyeksi eksplisit (hanya field ini), exclude = tambahan di luar penanda.
+  Digest tiap field disimpan per objek nilai, jadi field yang objeknya sama dengan
+  panggilan sebelumnya tidak di-hash ulang. Memo ini cuma untuk nilai immutable (str,
+  angka, tuple, frozenset, AppendLog): list/dict bisa diubah di tempat dengan identitas
+  yang sama, jadi selalu di-hash ulang supaya key tidak basi.
+
+    CachePolicy(ttl=60, key_func=state_cache_key(AppState, include=("query",)))
+
+  key_func.graph_cache_key = setelannya (schema, field), supaya graph_cache menganggap
+  key_func baru dengan setelan sama sebagai struktur yang sama.
+
+Benchmark + cek cache hit:
+    python cache_keys.py
+"""
+from __future__ import annotations
+
+import hashlib
+import pickle
+import threading
+from typing import Any, get_type_hints
+
+from log_channel import AppendLog
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None), frozenset, AppendLog)
+
+
+class _CacheKeyExclude:
+    """Instance (bukan kelas dan tidak callable) supaya tidak dikira reducer."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "CacheKeyExclude"
+
+
+CacheKeyExclude = _CacheKeyExclude()
+
+
+def excluded_fields(schema) -> set[str]:
+    """Nama field di schema yang ditandai CacheKeyExclude."""
+    hints = get_type_hints(schema, include_extras=True)
+    return {
+        name for name, hint in hints.items()
+        if any(meta is CacheKeyExclude for meta in getattr(hint, "__metadata__", ()))
+    }
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(_is_immutable(item) for item in value)
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+class _FieldDigests:
+    """Digest per field; untuk nilai immutable dihitung ulang hanya kalau objeknya berganti."""
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self._last: dict[str, tuple[Any, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, name: str, value: Any) -> bytes:
+        with self._lock:
+            last = self._last.get(name)
+        if last is not None and last[0] is value:
+            return last[1]
+        digest = hashlib.blake2b(pickle.dumps(value, protocol=5), digest_size=16).digest()
+        if _is_immutable(value):
+            with self._lock:
+                # referensi ke value ikut disimpan supaya id-nya tidak dipakai ulang objek lain
+                self._last[name] = (value, digest)
+        return digest
+
+
+def state_cache_key(schema, include=None, exclude=()):
+    """key_func untuk CachePolicy: hash dari field state yang relevan saja."""
+    hints = get_type_hints(schema, include_extras=True)
+    skip = excluded_fields(schema) | set(exclude)
+    names = [name for name in hints if name not in skip]
+    if include is not None:
+        unknown = set(include) - set(hints)
+        if unknown:
+            raise ValueError(f"Unknown state fields for cache key: {sorted(unknown)}")
+        names = [name for name in names if name in include]
+    digests = _FieldDigests(tuple(sorted(names)))
+    missing = object()
+
+    def key_func(state) -> str:
+        get = state.get if isinstance(state, dict) else lambda name, default: getattr(state, name, default)
+        h = hashlib.blake2b(digest_size=16)
+        for name in digests.fields:
+            value = get(name, missing)
+            if value is missing:
+                continue  # field yang belum ada beda dengan field bernilai None
+            h.update(name.encode())
+            h.update(digests.digest(name, value))
+        return h.hexdigest()
+
+    key_func.fields = digests.fields
+    key_func.graph_cache_key = ("state_cache_key", schema, digests.fields)
+    return key_func
+
+
+if __name__ == "__main__":
+    import time
+    from typing import Annotated
+
+    from langgraph._internal._cache import default_cache_key
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.types import CachePolicy, Command
+    from typing_extensions import TypedDict
+
+    from log_channel import AppendLogChannel
+    from node_cache import BoundedNodeCache
+
+    class AppState(TypedDict):
+        query: str
+        plan: str
+        logs: Annotated[list[str], CacheKeyExclude, AppendLogChannel]
+
+    manager_runs = []
+
+    def route_to_agent(state: AppState):
+        return Command(goto="manager", update={"logs": ["routed"]})
+
+    def manager(state: AppState):
+        manager_runs.append(state["query"])
+        return {"plan": f"plan for {state['query']}", "logs": ["manager_done"]}
+
+    def build(key_func):
+        builder = StateGraph(AppState)
+        builder.add_node("router", route_to_agent)
+        builder.add_node("manager", manager, cache_policy=CachePolicy(ttl=60, key_func=key_func))
+        builder.add_edge(START, "router")
+        builder.add_edge("manager", END)
+        cache = BoundedNodeCache()
+        return builder.compile(cache=cache, checkpointer=InMemorySaver()), cache
+
+    config = {"configurable": {"thread_id": "cache-demo"}}
+    for name, key_func in (
+        ("default_cache_key", default_cache_key),
+        ("state_cache_key", state_cache_key(AppState, include=("query",))),
+    ):
+        manager_runs.clear()
+        graph, cache = build(key_func)
+        for query in ["analyze data", "analyze data", "other", "analyze data"]:
+            graph.invoke({"query": query}, config)
+        print(f"{name:18s} manager dijalankan {len(manager_runs)}x dari 4 invoke, "
+              f"cache hit {cache.stats.hits}, miss {cache.stats.misses}")
+    assert len(manager_runs) == 2, manager_runs  # "analyze data" cukup sekali, "other" sekali
+
+    # list yang diubah di tempat (identitas sama) tetap menghasilkan key baru
+    plan_key = state_cache_key(AppState, include=("plan",))
+    plan = ["a"]
+    before = plan_key({"plan": plan})
+    plan.append("b")
+    assert plan_key({"plan": plan}) != before
+
+    # biaya hitung key dengan logs 100k entry
+    state = {"query": "analyze data", "plan": "p", "logs": [f"entry {i}" for i in range(100_000)]}
+    key_func = state_cache_key(AppState)
+    n = 200
+    for name, fn in (("default_cache_key", default_cache_key), ("state_cache_key", key_func)):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(state)
+        print(f"{name:18s} {(time.perf_counter() - start) / n * 1e6:9.1f}us/key (logs 100k entry)")
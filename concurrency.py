@@ -0,0 +1,127 @@
+"""
+Helper async yang dipakai bareng: jalanin banyak coroutine dengan batas concurrency,
+plus retry dengan exponential backoff kalau kena rate limit (HTTP 429).
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from typing import Any
+
+
+async def _aiter(items):
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def bounded_map(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterable | AsyncIterable,
+    *,
+    max_concurrency: int = 8,
+):
+    """Jalankan func(item) untuk tiap item, maksimal max_concurrency yang jalan bareng.
+
+    items boleh iterable biasa atau async iterable (stream), dan dibaca sedikit-sedikit,
+    jadi input jutaan item gak perlu dimuat semua. Hasil di-yield begitu selesai
+    (urutan tidak dijamin) sebagai tuple (item, result, error).
+    """
+    if max_concurrency <= 0:
+        # tanpa worker, produce() menunggu selamanya di queue yang tidak pernah dikosongkan
+        raise ValueError(f"max_concurrency harus > 0, dapat {max_concurrency}")
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def stop_workers():
+        for _ in range(max_concurrency):
+            await pending.put(done)
+
+    async def produce():
+        try:
+            async for item in _aiter(items):
+                await pending.put(item)
+        except Exception:
+            # worker tetap dihentikan, error-nya diangkat lagi lewat `await producer`
+            await stop_workers()
+            raise
+        await stop_workers()
+
+    async def work():
+        while True:
+            item = await pending.get()
+            if item is done:
+                await results.put(done)
+                return
+            try:
+                await results.put((item, await func(item), None))
+            except Exception as exc:
+                await results.put((item, None, exc))
+
+    producer = asyncio.create_task(produce())
+    workers = [asyncio.create_task(work()) for _ in range(max_concurrency)]
+    finished = 0
+    try:
+        while finished < max_concurrency:
+            out = await results.get()
+            if out is done:
+                finished += 1
+                continue
+            yield out
+        # error waktu baca input jangan sampai ketelan
+        await producer
+    finally:
+        for task in (producer, *workers):
+            task.cancel()
+        await asyncio.gather(producer, *workers, return_exceptions=True)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True untuk openai.RateLimitError dan error lain yang bawa status 429."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ == "RateLimitError"
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+):
+    """Panggil func(), ulangi kalau kena rate limit.
+
+    Delay pakai header retry-after kalau ada (dibatasi max_delay, server bisa minta
+    berjam-jam), kalau tidak exponential backoff dengan full jitter supaya worker-worker
+    yang kena 429 barengan gak retry serentak.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as exc:
+            if attempt >= max_retries or not is_rate_limit_error(exc):
+                raise
+            delay = _retry_after(exc)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            else:
+                delay = min(max(delay, 0.0), max_delay)
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,395 @@
+"""
+Memangkas history percakapan supaya muat di budget token sebelum tiap panggilan model.
+
+Contoh history manual di learn2_langchain.py (system + human + ai_msg + human) dan list
+message agent terus bertambah dan dikirim utuh di setiap panggilan.
+
+- get_tokenizer(): tokenizer lokal yang di-load sekali. Pakai tiktoken kalau encoding-nya
+  tersedia, kalau tidak (tiktoken tidak terpasang / file encoding tidak bisa diunduh)
+  pakai perkiraan berbasis regex.
+- count_message_tokens(): jumlah token per message disimpan di objek message itu sendiri
+  (di __dict__, tidak ikut serialize/==), jadi history yang tidak berubah tidak pernah
+  di-tokenize ulang. Kalau content diganti (model_copy(update=...)), hitungan diulang.
+- ContextWindow(max_tokens).fit(messages): system message di depan selalu dibawa, sisanya
+  diambil dari yang paling baru mundur sampai budget habis. Potongan tidak pernah dimulai
+  dari ToolMessage yang AIMessage tool_calls-nya sudah terbuang. Pesan user terakhir selalu
+  ikut (dipotong kalau sendirian sudah melebihi budget), begitu juga tool call terakhir
+  sesudahnya beserta hasilnya (hasil tool yang terlalu besar dipotong, pasangan call/hasil
+  tidak dibuang). Dengan summarizer, turn yang terbuang diringkas jadi satu SystemMessage;
+  ringkasan di-update incremental (hanya turn yang baru terbuang yang dikirim ke
+  summarizer, pesan user yang dipertahankan tidak ikut diringkas).
+- ContextWindow.middleware(): dipasang di create_agent(middleware=[...]) supaya tiap
+  panggilan model di loop agent dipangkas, tanpa mengubah state agent.
+
+Benchmark 1k turn:
+    python context_window.py
+"""
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+_MEMO_KEY = "_context_window_tokens"
+# overhead format chat per message (role, separator), mengikuti hitungan OpenAI
+MESSAGE_OVERHEAD = 3
+_APPROX_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class _ApproxTokenizer:
+    """Perkiraan BPE: tiap kata ~1 token per 4 karakter, tanda baca 1 token."""
+
+    name = "approx"
+
+    def count(self, text: str) -> int:
+        return sum((len(piece) + 3) // 4 for piece in _APPROX_PIECES.findall(text))
+
+
+class _TiktokenTokenizer:
+    def __init__(self, encoding):
+        self.name = encoding.name
+        self._encode = encoding.encode_ordinary
+
+    def count(self, text: str) -> int:
+        return len(self._encode(text))
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding: str = "o200k_base"):
+    """Tokenizer untuk encoding tiktoken (di-cache per nama), fallback ke perkiraan lokal."""
+    try:
+        import tiktoken
+
+        return _TiktokenTokenizer(tiktoken.get_encoding(encoding))
+    except Exception:
+        # tiktoken tidak ada, atau file encoding belum ada di cache dan tidak bisa diunduh
+        return _ApproxTokenizer()
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and "text" in block:
+            parts.append(block["text"])
+    return "".join(parts)
+
+
+def count_message_tokens(message: BaseMessage, tokenizer=None) -> int:
+    """Token satu message (content + name + tool_calls + overhead), di-memo di objeknya."""
+    tokenizer = tokenizer or get_tokenizer()
+    memo = message.__dict__.get(_MEMO_KEY)
+    content = message.content
+    tool_calls = getattr(message, "tool_calls", None)
+    if memo is not None and memo[0] is tokenizer and memo[1] is content and memo[2] is tool_calls:
+        return memo[3]
+    count = MESSAGE_OVERHEAD + tokenizer.count(_text_of(content))
+    if message.name:
+        count += 1 + tokenizer.count(message.name)
+    for call in tool_calls or ():
+        count += tokenizer.count(call["name"]) + tokenizer.count(str(call["args"]))
+    # referensi content/tool_calls disimpan: objek baru (content diganti) -> hitung ulang
+    message.__dict__[_MEMO_KEY] = (tokenizer, content, tool_calls, count)
+    return count
+
+
+def count_tokens(messages: Sequence[BaseMessage], tokenizer=None) -> int:
+    tokenizer = tokenizer or get_tokenizer()
+    return sum(count_message_tokens(message, tokenizer) for message in messages)
+
+
+class ContextWindow:
+    """Pangkas/ringkas turn terlama supaya total token <= max_tokens."""
+
+    def __init__(
+        self,
+        max_tokens: int,
+        *,
+        tokenizer=None,
+        summarizer: Callable[[str | None, list[BaseMessage]], str] | None = None,
+        summary_tokens: int = 256,
+    ):
+        """summarizer(ringkasan_lama, message_yang_baru_terbuang) -> teks ringkasan baru.
+
+        summary_tokens = budget yang disisihkan untuk message ringkasan.
+        """
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.summarizer = summarizer
+        self.summary_tokens = summary_tokens
+        self._lock = threading.Lock()
+        # (message terakhir yang sudah diringkas, jumlah message yang diringkas, teks ringkasan)
+        self._summary: tuple[BaseMessage, int, str] | None = None
+
+    def count(self, messages: Sequence[BaseMessage]) -> int:
+        return count_tokens(messages, self.tokenizer)
+
+    def _cut(self, messages: Sequence[BaseMessage], start: int, budget: int) -> int:
+        """Index pertama yang ikut dikirim: ambil dari belakang selama masih muat."""
+        cut = len(messages)
+        used = 0
+        while cut > start:
+            tokens = count_message_tokens(messages[cut - 1], self.tokenizer)
+            if used + tokens > budget:
+                break
+            used += tokens
+            cut -= 1
+        return cut
+
+    @staticmethod
+    def _skip_orphan_tools(messages: Sequence[BaseMessage], cut: int) -> int:
+        # jangan mulai dari hasil tool yang AIMessage pemanggilnya terbuang
+        while cut < len(messages) and isinstance(messages[cut], ToolMessage):
+            cut += 1
+        return cut
+
+    def _truncate(self, message: BaseMessage, budget: int) -> BaseMessage:
+        """Potong teks message dari depan (ekor dipertahankan) supaya <= budget token."""
+        empty = message.model_copy(update={"content": ""})
+        room = budget - count_message_tokens(empty, self.tokenizer)
+        text = _text_of(message.content)
+        if room <= 0:
+            raise ValueError(
+                f"ContextWindow: budget {budget} token tidak cukup untuk pesan user terakhir "
+                f"dan tool call sesudahnya (system message sudah memakai sisanya, max_tokens={self.max_tokens})"
+            )
+        # panjang ekor terbesar yang masih muat (binary search, tokenize O(log n) kali)
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.tokenizer.count(text[-mid:]) <= room:
+                low = mid
+            else:
+                high = mid - 1
+        return message.model_copy(update={"content": text[len(text) - low:]})
+
+    def _shrink_tools(self, messages: list[BaseMessage], budget: int) -> list[BaseMessage]:
+        """Potong content ToolMessage (yang terbesar duluan kena) supaya total <= budget token."""
+        tools = [i for i, message in enumerate(messages) if isinstance(message, ToolMessage)]
+        empty = {i: count_message_tokens(messages[i].model_copy(update={"content": ""}), self.tokenizer)
+                 for i in tools}
+        room = budget - sum(
+            count_message_tokens(message, self.tokenizer) for i, message in enumerate(messages) if i not in empty
+        ) - sum(empty.values())
+        shrunk = list(messages)
+        # hasil kecil dibawa utuh, sisa ruang dibagi rata ke hasil yang lebih besar
+        by_size = sorted(tools, key=lambda index: count_message_tokens(messages[index], self.tokenizer))
+        for left, i in enumerate(by_size):
+            share = max(room, 0) // (len(tools) - left)
+            content = count_message_tokens(messages[i], self.tokenizer) - empty[i]
+            if content > share:
+                shrunk[i] = messages[i].model_copy(update={"content": ""}) if share <= 0 else \
+                    self._truncate(messages[i], empty[i] + share)
+                content = count_message_tokens(shrunk[i], self.tokenizer) - empty[i]
+            room -= content
+        return shrunk
+
+    def _pin_last_human(
+        self, messages: Sequence[BaseMessage], last_human: int, budget: int
+    ) -> tuple[BaseMessage, int, list[BaseMessage]]:
+        """(pesan user terakhir, index awal ekor, ekor) yang bersama-sama muat di budget.
+
+        Tool call terakhir sesudah pesan user dibawa bersama hasilnya: tanpa itu model tidak
+        tahu tool-nya sudah jalan dan memanggilnya lagi sampai recursion limit.
+        """
+        human = messages[last_human]
+        human_tokens = count_message_tokens(human, self.tokenizer)
+        last_call = next(
+            (i for i in range(len(messages) - 1, last_human, -1) if getattr(messages[i], "tool_calls", None)), None
+        )
+        call = list(messages[last_call:]) if last_call is not None else []
+        call_tokens = self.count(call)
+        if human_tokens + call_tokens > budget:
+            # bagian tool call yang tidak bisa dipotong (AIMessage, overhead ToolMessage)
+            fixed = sum(
+                count_message_tokens(m.model_copy(update={"content": ""}) if isinstance(m, ToolMessage) else m,
+                                     self.tokenizer)
+                for m in call
+            )
+            available = budget - fixed
+            # pesan user dapat ruang yang tersisa dari hasil tool, minimal separuh
+            human_budget = max(available - (call_tokens - fixed), available // 2)
+            if human_tokens > human_budget:
+                human = self._truncate(human, human_budget)
+                human_tokens = count_message_tokens(human, self.tokenizer)
+        rest = budget - human_tokens
+        if call_tokens > rest:
+            call = self._shrink_tools(call, rest)
+            call_tokens = self.count(call)
+        if last_call is None:
+            cut = self._skip_orphan_tools(messages, self._cut(messages, last_human + 1, rest))
+            return human, cut, list(messages[cut:])
+        before = messages[:last_call]
+        cut = self._skip_orphan_tools(before, self._cut(before, last_human + 1, rest - call_tokens))
+        return human, cut, list(before[cut:]) + call
+
+    def fit(self, messages: Sequence[BaseMessage], budget: int | None = None) -> list[BaseMessage]:
+        """Message yang dikirim ke model: system di depan + turn terbaru yang muat (+ ringkasan).
+
+        Pesan user (HumanMessage) terakhir selalu ikut: kalau tidak muat, teksnya dipotong
+        (bagian akhirnya dipertahankan); ValueError kalau budget bahkan tidak cukup untuk itu.
+        """
+        budget = self.max_tokens if budget is None else budget
+        start = 0
+        while start < len(messages) and isinstance(messages[start], SystemMessage):
+            start += 1
+        head = list(messages[:start])
+        budget -= self.count(head)
+        # cuma message yang akhirnya dikirim yang dijumlahkan, history lama tidak disentuh
+        cut = self._cut(messages, start, budget)
+        if cut == start:
+            return list(messages)
+        if self.summarizer is not None:
+            budget -= self.summary_tokens
+        cut = self._skip_orphan_tools(messages, self._cut(messages, start, budget))
+        last_human = next(
+            (i for i in range(len(messages) - 1, start - 1, -1) if isinstance(messages[i], HumanMessage)), None
+        )
+        pinned = []
+        if last_human is not None and last_human < cut:
+            # pesan user terakhir ikut terbuang (terlalu besar, atau loop tool agent yang panjang):
+            # pertahankan, lalu ekor sesudahnya diisi dengan sisa budget
+            human, cut, tail = self._pin_last_human(messages, last_human, budget)
+            pinned = [human]
+        else:
+            last_human = None
+            tail = list(messages[cut:])
+        if self.summarizer is None:
+            return head + pinned + tail
+        summary = self._summarize(messages, start, cut, last_human)
+        return head + [summary] + pinned + tail
+
+    def _summarize(
+        self, messages: Sequence[BaseMessage], start: int, cut: int, pinned: int | None = None
+    ) -> BaseMessage:
+        """Ringkasan messages[start:cut], kecuali messages[pinned] yang tetap dikirim utuh."""
+        with self._lock:
+            previous = self._summary
+            done = 0
+            text = None
+            held = None  # pesan user yang di-pin dan belum pernah diringkas
+            # ringkasan lama masih berlaku kalau prefix history-nya sama dan tidak lebih panjang
+            if previous is not None:
+                anchor, count, old_text, old_held = previous
+                end = start + count
+                if count <= cut - start and end - 1 < len(messages) and messages[end - 1] is anchor:
+                    done, text, held = count, old_text, old_held
+            dropped = [message for i, message in enumerate(messages[start + done:cut], start + done) if i != pinned]
+            if held is not None and (pinned is None or messages[pinned] is not held):
+                dropped.insert(0, held)  # dulu di-pin, sekarang sudah bukan pesan user terakhir
+                held = None
+            if pinned is not None and start + done <= pinned < cut:
+                held = messages[pinned]
+            if dropped or text is None:
+                text = self.summarizer(text, dropped)
+            if cut > start:
+                self._summary = (messages[cut - 1], cut - start, text, held)
+        # SystemMessage, bukan AIMessage: model tidak menganggap ringkasan sebagai jawabannya sendiri
+        return SystemMessage(f"Ringkasan percakapan sebelumnya: {text}")
+
+    def middleware(self):
+        """Middleware create_agent: pangkas message tiap panggilan model (state agent tidak diubah)."""
+        from langchain.agents.middleware import wrap_model_call
+
+        window = self
+
+        @wrap_model_call
+        def trim_context(request, handler):
+            budget = window.max_tokens
+            if request.system_message is not None:
+                budget -= count_message_tokens(request.system_message, window.tokenizer)
+            return handler(request.override(messages=window.fit(request.messages, budget)))
+
+        return trim_context
+
+
+if __name__ == "__main__":
+    import time
+
+    from langchain_core.messages import AIMessage
+    from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+
+    turns = 1_000
+    history: list[BaseMessage] = [SystemMessage("You are a helpful assistant looking to help teacher create "
+                                                "calculus lesson plan.")]
+    for i in range(turns):
+        history.append(HumanMessage(f"Question {i}: explain limits, derivatives and integrals " * 5))
+        history.append(AIMessage(f"Answer {i}: a limit describes the value a function approaches " * 20))
+
+    tokenizer = get_tokenizer()
+    print(f"tokenizer: {tokenizer.name}, {turns} turn, {len(history)} message, "
+          f"{count_tokens(history)} token total")
+    window = ContextWindow(max_tokens=4_000)
+
+    def simulate(fit):
+        """Percakapan yang terus tumbuh: tiap turn baru, history dipangkas lalu dikirim."""
+        convo = list(history[:1])
+        start = time.perf_counter()
+        for i in range(1, len(history), 2):
+            convo += history[i:i + 2]
+            sent = fit(convo)
+        return time.perf_counter() - start, sent
+
+    for name, fit in (
+        ("trim_messages (tanpa memo)", lambda convo: trim_messages(
+            convo, max_tokens=4_000, token_counter=lambda msgs: sum(
+                tokenizer.count(_text_of(m.content)) + MESSAGE_OVERHEAD for m in msgs),
+            strategy="last", include_system=True)),
+        ("ContextWindow.fit", window.fit),
+    ):
+        for message in history:
+            message.__dict__.pop(_MEMO_KEY, None)
+        elapsed, sent = simulate(fit)
+        print(f"  {name:28s} {elapsed * 1000:8.1f}ms untuk {turns} turn "
+              f"({elapsed / turns * 1e6:.0f}us/turn), terkirim {len(sent)} message, {count_tokens(sent)} token")
+    assert count_tokens(sent) <= 4_000 and isinstance(sent[0], SystemMessage)
+
+    start = time.perf_counter()
+    count_tokens(history)
+    print(f"  hitung ulang history yang sudah di-memo: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    summaries = []
+
+    def summarize(previous, dropped):
+        summaries.append(len(dropped))
+        return f"{previous or ''} +{len(dropped)} turn".strip()
+
+    window = ContextWindow(max_tokens=4_000, summarizer=summarize)
+    elapsed, sent = simulate(window.fit)
+    print(f"  ContextWindow + summarizer   {elapsed * 1000:8.1f}ms, summarizer dipanggil {len(summaries)}x, "
+          f"total {sum(summaries)} message diringkas (tiap message sekali)")
+    assert sum(summaries) == len(history) - 1 - (len(sent) - 2)
+    assert count_tokens_approximately(sent) > 0
+
+    # pesan user terakhir yang sendirian melebihi budget tetap terkirim (dipotong), begitu juga
+    # kalau ekornya cuma hasil tool yang pemanggilnya terbuang
+    window = ContextWindow(max_tokens=500)
+    huge = history[:3] + [HumanMessage("please review this contract: " + "clause " * 5_000 + "is it valid?")]
+    sent = window.fit(huge)
+    assert isinstance(sent[-1], HumanMessage) and sent[-1].content.endswith("is it valid?")
+    assert count_tokens(sent) <= 500
+    # pesan user yang memenuhi budget + hasil tool besar: pasangan tool call/hasil tetap dikirim
+    # (hasilnya dipotong), kalau dibuang agent akan memanggil tool yang sama lagi
+    agent_loop = huge + [
+        AIMessage("", tool_calls=[{"name": "search", "args": {"q": "contract law"}, "id": "call-1"}]),
+        ToolMessage("found: " + "precedent " * 3_000 + "end of results", tool_call_id="call-1"),
+    ]
+    sent = window.fit(agent_loop)
+    assert [type(m) for m in sent] == [SystemMessage, HumanMessage, AIMessage, ToolMessage], sent
+    assert sent[-1].content.endswith("end of results") and sent[1].content.endswith("is it valid?")
+    assert count_tokens(sent) <= 500
+
+    # pesan user yang dipertahankan tidak ikut dikirim ke summarizer
+    received = []
+    window = ContextWindow(max_tokens=500, summarizer=lambda previous, dropped: received.extend(dropped) or "ok")
+    sent = window.fit(agent_loop)
+    assert agent_loop[3] not in received and len(received) == 2 and isinstance(sent[1], SystemMessage)
+    follow_up = agent_loop + [AIMessage("it is valid"), HumanMessage("thanks")]
+    window.fit(follow_up)
+    assert received.count(agent_loop[3]) == 1  # sudah bukan pesan terakhir: diringkas sekali
@@ -0,0 +1,198 @@
+"""
+Pipeline ekstraksi kontrak dalam jumlah besar.
+
+extraction_chain di learn3_lanchain_prompt_focus.py cuma memproses satu document_sample.
+Untuk backlog puluhan ribu kontrak:
+1. file dibaca satu-satu dari direktori (generator, gak dimuat semua ke memory)
+2. dokumen yang kepanjangan dipotong per paragraf jadi beberapa chunk (dengan overlap)
+3. semua chunk dikirim paralel ke extractor lewat thread pool (jumlah in-flight dibatasi)
+4. hasil per chunk digabung jadi satu objek per dokumen (misal key_deliverables di-union)
+5. hasil ditulis langsung ke JSONL begitu dokumen selesai; kalau proses mati di tengah
+   jalan, run berikutnya melewati dokumen yang sudah ada di file output
+
+Fungsi di sini generik terhadap schema Pydantic, jadi bisa dipakai untuk schema lain
+selain ContractExtraction.
+"""
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+_PENDING = object()
+
+
+def iter_documents(directory, pattern: str = "*.txt"):
+    """Yield (path, teks) untuk tiap file yang cocok dengan pattern (rekursif)."""
+    for path in Path(directory).rglob(pattern):
+        if path.is_file():
+            yield str(path), path.read_text(encoding="utf-8", errors="replace")
+
+
+def chunk_document(text: str, max_chars: int = 12_000, overlap: int = 500) -> list[str]:
+    """Potong dokumen per paragraf supaya tiap chunk <= max_chars.
+
+    Ekor chunk sebelumnya (overlap karakter) diulang di awal chunk berikutnya supaya
+    klausul yang kepotong di batas chunk tetap kebaca utuh di salah satu chunk. Ekor itu
+    ikut dihitung dalam max_chars. ValueError kalau bukan 0 <= overlap < max_chars.
+    """
+    if not 0 <= overlap < max_chars:
+        # overlap >= max_chars: potong keras tidak pernah maju (loop tanpa akhir)
+        raise ValueError(f"butuh 0 <= overlap < max_chars, dapat overlap={overlap}, max_chars={max_chars}")
+    if len(text) <= max_chars:
+        return [text]
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap else ""
+            candidate = f"{tail}\n\n{paragraph}" if tail else paragraph
+        while len(candidate) > max_chars:
+            # paragraf raksasa tanpa baris kosong: potong keras, potongan berikutnya mulai
+            # overlap karakter sebelum batas
+            chunks.append(candidate[:max_chars])
+            candidate = candidate[max_chars - overlap:]
+        current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def merge_extractions(results: list[BaseModel]) -> BaseModel:
+    """Gabungkan hasil ekstraksi per chunk jadi satu.
+
+    - field list: union, urutan kemunculan dipertahankan
+    - field bool: True kalau ada chunk yang bilang True (misal is_auto_renewal)
+    - field lain: nilai pertama yang bukan default/kosong
+    """
+    if len(results) == 1:
+        return results[0]
+    schema = type(results[0])
+    merged = {}
+    for name, field in schema.model_fields.items():
+        values = [getattr(result, name) for result in results]
+        if isinstance(values[0], list):
+            seen = set()
+            union = []
+            for value in values:
+                for item in value:
+                    key = item.strip().casefold() if isinstance(item, str) else json.dumps(item, sort_keys=True, default=str)
+                    if key not in seen:
+                        seen.add(key)
+                        union.append(item)
+            merged[name] = union
+        elif isinstance(values[0], bool):
+            merged[name] = any(values)
+        else:
+            merged[name] = next(
+                (value for value in values if value and value != field.default),
+                values[0],
+            )
+    return schema.model_validate(merged)
+
+
+def _completed_paths(output_path: Path) -> set[str]:
+    done = set()
+    if output_path.exists():
+        with output_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # baris terakhir bisa kepotong kalau proses mati waktu nulis
+                if "extraction" in record:
+                    done.add(record["path"])
+    return done
+
+
+@dataclass
+class PipelineStats:
+    documents: int = 0
+    chunks: int = 0
+    errors: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        rate = self.documents / self.elapsed if self.elapsed else 0.0
+        return (
+            f"documents={self.documents} chunks={self.chunks} errors={self.errors} "
+            f"skipped={self.skipped} elapsed={self.elapsed:.1f}s ({rate:.1f} docs/s)"
+        )
+
+
+def run_extraction_pipeline(
+    chain,
+    directory,
+    output_path,
+    *,
+    pattern: str = "*.txt",
+    max_workers: int = 8,
+    max_chars: int = 12_000,
+    overlap: int = 500,
+) -> PipelineStats:
+    """Ekstrak semua dokumen di directory lewat chain, tulis hasilnya ke output_path (JSONL).
+
+    chain: extraction_prompt | structured_extractor (input {"document_text": ...}).
+    Tiap baris output: {"path", "chunks", "extraction"} atau {"path", "error"}.
+    """
+    output_path = Path(output_path)
+    done = _completed_paths(output_path)
+    stats = PipelineStats()
+    start = time.perf_counter()
+    pending_docs: dict[str, list] = {}  # path -> hasil per chunk
+    futures = {}
+    max_in_flight = max_workers * 2
+
+    def finish(path, out):
+        results = pending_docs.pop(path)
+        errors = [r if r is not None else ValueError("empty extraction") for r in results
+                  if r is None or isinstance(r, Exception)]
+        if errors:
+            record = {"path": path, "error": repr(errors[0])}
+            stats.errors += 1
+        else:
+            record = {
+                "path": path,
+                "chunks": len(results),
+                "extraction": merge_extractions(results).model_dump(mode="json"),
+            }
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        stats.documents += 1
+
+    def collect(out):
+        finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in finished:
+            path, index = futures.pop(future)
+            try:
+                pending_docs[path][index] = future.result()
+            except Exception as exc:
+                pending_docs[path][index] = exc
+            if all(r is not _PENDING for r in pending_docs[path]):
+                finish(path, out)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, output_path.open("a", encoding="utf-8") as out:
+        for path, text in iter_documents(directory, pattern):
+            if path in done:
+                stats.skipped += 1
+                continue
+            chunks = chunk_document(text, max_chars=max_chars, overlap=overlap)
+            pending_docs[path] = [_PENDING] * len(chunks)
+            stats.chunks += len(chunks)
+            for index, chunk in enumerate(chunks):
+                while len(futures) >= max_in_flight:
+                    collect(out)
+                future = pool.submit(chain.invoke, {"document_text": chunk})
+                futures[future] = (path, index)
+        while futures:
+            collect(out)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
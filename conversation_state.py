@@ -0,0 +1,152 @@
+"""
+History percakapan dengan index per role.
+
+get_all_user_messages / get_last_user_message di learn2_langchain.py men-scan seluruh
+runtime["messages"] dengan isinstance setiap kali dipanggil. Dengan ribuan turn dan
+agent yang memanggil tool itu berulang kali, biayanya jadi O(n) per panggilan.
+
+IndexedMessages menyimpan message seperti list biasa (append/extend), tapi sekalian
+mencatat posisi tiap message per role saat di-append:
+- last("human")      -> O(1)
+- contents("human")  -> content message role itu, O(jumlah message role itu), tanpa scan ulang
+- of_role("human")   -> list message untuk role itu
+
+Content dibaca dari message waktu dipanggil (bukan disalin saat append), jadi message
+yang diubah belakangan tetap terlihat versi terbarunya.
+
+last_of_role() / contents_of_role() menerima IndexedMessages maupun list biasa: index cuma
+dipakai kalau caller memang menyimpan IndexedMessages, list biasa di-scan langsung (dari
+belakang untuk last_of_role, berhenti di message pertama yang cocok) tanpa membangun index
+sekali pakai.
+
+Role diambil dari kelas message (HumanMessage -> "human", AIMessage -> "ai", dst.),
+jadi chunk (HumanMessageChunk, ...) ikut terhitung sama seperti isinstance.
+
+Benchmark:
+    python conversation_state.py
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+_ROLE_CLASSES = (
+    (HumanMessage, "human"),
+    (AIMessage, "ai"),
+    (SystemMessage, "system"),
+    (ToolMessage, "tool"),
+)
+_role_cache: dict[type, str] = {}
+
+
+def message_role(message: BaseMessage) -> str:
+    cls = type(message)
+    role = _role_cache.get(cls)
+    if role is None:
+        role = next((name for base, name in _ROLE_CLASSES if issubclass(cls, base)), message.type)
+        _role_cache[cls] = role
+    return role
+
+
+class IndexedMessages(Sequence):
+    """List message append-only dengan index per role yang di-update incremental."""
+
+    def __init__(self, messages: Iterable[BaseMessage] = ()):
+        self._messages: list[BaseMessage] = []
+        self._positions: dict[str, list[int]] = {}
+        self.extend(messages)
+
+    def append(self, message: BaseMessage) -> None:
+        self._positions.setdefault(message_role(message), []).append(len(self._messages))
+        self._messages.append(message)
+
+    def extend(self, messages: Iterable[BaseMessage]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{role}={len(p)}" for role, p in self._positions.items())
+        return f"IndexedMessages({len(self._messages)} messages: {counts})"
+
+    def last(self, role: str) -> BaseMessage | None:
+        positions = self._positions.get(role)
+        return self._messages[positions[-1]] if positions else None
+
+    def count(self, role: str) -> int:
+        return len(self._positions.get(role, ()))
+
+    def of_role(self, role: str) -> list[BaseMessage]:
+        return [self._messages[i] for i in self._positions.get(role, ())]
+
+    def contents(self, role: str) -> list:
+        return [self._messages[i].content for i in self._positions.get(role, ())]
+
+    def to_list(self) -> list[BaseMessage]:
+        return list(self._messages)
+
+
+def last_of_role(messages: Sequence[BaseMessage], role: str) -> BaseMessage | None:
+    """Message terakhir dengan role itu: O(1) untuk IndexedMessages, scan dari belakang untuk list."""
+    if isinstance(messages, IndexedMessages):
+        return messages.last(role)
+    return next((m for m in reversed(messages) if message_role(m) == role), None)
+
+
+def contents_of_role(messages: Sequence[BaseMessage], role: str) -> list:
+    """Content semua message dengan role itu, sesuai urutan."""
+    if isinstance(messages, IndexedMessages):
+        return messages.contents(role)
+    return [m.content for m in messages if message_role(m) == role]
+
+
+if __name__ == "__main__":
+    import timeit
+
+    history = []
+    for i in range(5_000):
+        history.append(HumanMessage(content=f"question {i}"))
+        history.append(AIMessage(content=f"answer {i}"))
+    # ekor panjang tanpa pesan user (loop tool agent), kasus terburuk untuk scan dari belakang
+    for i in range(1_000):
+        history.append(ToolMessage(content=f"result {i}", tool_call_id=f"call_{i}"))
+    indexed = IndexedMessages(history)
+
+    def scan_last():
+        for message in reversed(history):
+            if isinstance(message, HumanMessage):
+                return message.content
+
+    def scan_all():
+        return [m.content for m in history if isinstance(m, HumanMessage)]
+
+    assert scan_last() == indexed.last("human").content == last_of_role(history, "human").content
+    assert scan_all() == indexed.contents("human") == contents_of_role(history, "human")
+
+    n = 1_000
+    print(f"{len(history)} messages, {n} calls each")
+    for name, fn in (
+        ("last user (scan)", scan_last),
+        ("last user (indexed)", lambda: indexed.last("human").content),
+        ("all user (scan)", scan_all),
+        ("all user (indexed)", lambda: indexed.contents("human")),
+    ):
+        per_call = timeit.timeit(fn, number=n) / n
+        print(f"  {name:22s} {per_call * 1e6:9.1f}us/call")
+    per_append = timeit.timeit(lambda: indexed.append(HumanMessage(content="x")), number=n) / n
+    print(f"  {'append (indexed)':22s} {per_append * 1e6:9.1f}us/call")
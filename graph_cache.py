@@ -0,0 +1,286 @@
+"""
+Cache graph hasil compile, di-key dari struktur graph.
+
+Script-script di repo ini membangun dan compile() StateGraph tiap kali dijalankan, dan
+run_react_agent() di langchain3_learn.py memanggil create_agent(...) di tiap panggilan.
+compile() memvalidasi graph dan membuat channel/node Pregel dari nol, jadi membangun
+ulang topologi yang sama berkali-kali (misal di worker yang membuat graph per request)
+cuma buang waktu.
+
+- compile_cached(builder, **compile_kwargs): hash struktur builder (schema state, node
+  beserta fungsi dan policy-nya, edge, conditional edge, argumen compile) lalu kembalikan
+  graph yang sudah pernah di-compile kalau hash-nya sama.
+  Fungsi dibandingkan dari bytecode + isi closure/default-nya. Objek yang punya atribut
+  graph_cache_key (key_func dari state_cache_key, DeltaSqliteSaver ke file) dibandingkan dari
+  konfigurasinya, jadi objek baru dengan setelan sama di tiap build tetap hit; objek lain
+  (cache, schema, saver in-memory) dari identitasnya, jadi graph yang beda checkpointer
+  tidak tertukar.
+- get_or_build(key, factory): cache umum untuk graph yang tidak lewat StateGraph
+  (misal create_agent), key ditentukan pemanggil.
+- semua cache di sini LRU dengan batas jumlah entry.
+
+Benchmark:
+    python graph_cache.py
+"""
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import marshal
+import threading
+import types
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+_SIMPLE = (type(None), bool, int, float, complex, str, bytes)
+
+_lock = threading.Lock()
+_compiled: OrderedDict[str, tuple[Any, list]] = OrderedDict()
+_built: OrderedDict[Any, Any] = OrderedDict()
+_code_digests: OrderedDict[int, tuple[types.CodeType, bytes]] = OrderedDict()
+_max_entries = 128
+_max_code_digests = 4096
+stats = {"hits": 0, "misses": 0}
+
+
+def _code_digest(code: types.CodeType) -> bytes:
+    with _lock:
+        cached = _code_digests.get(id(code))
+        if cached is not None and cached[0] is code:
+            _code_digests.move_to_end(id(code))
+            return cached[1]
+    digest = hashlib.blake2b(marshal.dumps(code), digest_size=16).digest()
+    with _lock:
+        _code_digests[id(code)] = (code, digest)
+        _code_digests.move_to_end(id(code))
+        while len(_code_digests) > _max_code_digests:
+            _code_digests.popitem(last=False)
+    return digest
+
+
+class _Fingerprint:
+    """Ubah objek jadi bytes yang stabil; objek tanpa nilai jelas dicatat dari id-nya."""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        # referensi objek yang di-key dari id, supaya id-nya tidak dipakai ulang objek lain
+        self.refs: list[Any] = []
+        self._seen: set[int] = set()
+
+    def add(self, obj: Any) -> None:
+        parts = self.parts
+        if isinstance(obj, _SIMPLE):
+            parts.append(f"{type(obj).__name__}:{obj!r};".encode())
+        elif isinstance(obj, (tuple, list)):
+            parts.append(f"{type(obj).__name__}[{len(obj)}](".encode())
+            for item in obj:
+                self.add(item)
+            parts.append(b")")
+        elif isinstance(obj, (set, frozenset)):
+            items = sorted(obj, key=repr)
+            parts.append(f"set[{len(items)}](".encode())
+            for item in items:
+                self.add(item)
+            parts.append(b")")
+        elif isinstance(obj, dict):
+            parts.append(f"dict[{len(obj)}](".encode())
+            for key in sorted(obj, key=repr):
+                self.add(key)
+                self.add(obj[key])
+            parts.append(b")")
+        elif not isinstance(obj, type) and (config := getattr(obj, "graph_cache_key", None)) is not None:
+            # objek yang dibuat ulang tiap build dengan setelan sama: di-key dari setelannya
+            parts.append(f"cfg:{type(obj).__qualname__}(".encode())
+            self.add(config)
+            parts.append(b")")
+        elif id(obj) in self._seen:
+            parts.append(b"cycle;")
+        elif isinstance(obj, types.FunctionType):
+            self._seen.add(id(obj))
+            parts.append(f"fn:{obj.__module__}.{obj.__qualname__}:".encode())
+            parts.append(_code_digest(obj.__code__))
+            self.add(obj.__defaults__)
+            self.add(obj.__kwdefaults__)
+            for cell in obj.__closure__ or ():
+                try:
+                    self.add(cell.cell_contents)
+                except ValueError:  # cell kosong
+                    parts.append(b"empty-cell;")
+        elif isinstance(obj, functools.partial):
+            parts.append(b"partial:")
+            self.add(obj.func)
+            self.add(obj.args)
+            self.add(obj.keywords)
+        elif isinstance(obj, types.MethodType):
+            self.add(obj.__func__)
+            self.add_identity(obj.__self__)
+        elif type(obj).__name__ == "RunnableCallable":
+            self.add(getattr(obj, "func", None))
+            self.add(getattr(obj, "afunc", None))
+        elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            self._seen.add(id(obj))
+            parts.append(f"dc:{type(obj).__qualname__}(".encode())
+            for f in dataclasses.fields(obj):
+                parts.append(f.name.encode())
+                self.add(getattr(obj, f.name))
+            parts.append(b")")
+        else:
+            self.add_identity(obj)
+
+    def add_identity(self, obj: Any) -> None:
+        self.refs.append(obj)
+        name = getattr(obj, "__qualname__", type(obj).__qualname__)
+        self.parts.append(f"id:{name}:{id(obj)};".encode())
+
+    def digest(self) -> str:
+        return hashlib.blake2b(b"".join(self.parts), digest_size=20).hexdigest()
+
+
+def structure_hash(builder, **compile_kwargs) -> tuple[str, list]:
+    """Hash struktur StateGraph + argumen compile. Return (hash, objek yang direferensikan)."""
+    fp = _Fingerprint()
+    fp.add_identity(builder.state_schema)
+    fp.add(sorted((name, schema) for name, schema in _schema_names(builder)))
+    for name in sorted(builder.nodes):
+        fp.add(name)
+        fp.add(builder.nodes[name])
+    fp.add(builder.edges)
+    fp.add(builder.waiting_edges)
+    for source in sorted(builder.branches):
+        for name, branch in sorted(builder.branches[source].items()):
+            fp.add((source, name))
+            fp.add(branch)
+    fp.add(compile_kwargs)
+    return fp.digest(), fp.refs
+
+
+def _schema_names(builder):
+    for schema in (builder.input_schema, builder.output_schema, builder.context_schema):
+        yield getattr(schema, "__qualname__", repr(schema)), id(schema)
+
+
+def compile_cached(builder, **compile_kwargs):
+    """builder.compile(**compile_kwargs), tapi pakai hasil lama kalau strukturnya sama."""
+    key, refs = structure_hash(builder, **compile_kwargs)
+    with _lock:
+        entry = _compiled.get(key)
+        if entry is not None:
+            _compiled.move_to_end(key)
+            stats["hits"] += 1
+            return entry[0]
+        stats["misses"] += 1
+    graph = builder.compile(**compile_kwargs)
+    with _lock:
+        # refs + builder ikut disimpan: id di dalam key tetap valid selama entry ada
+        entry = _compiled.setdefault(key, (graph, [builder, *refs]))
+        while len(_compiled) > _max_entries:
+            _compiled.popitem(last=False)
+        return entry[0]
+
+
+def get_or_build(key, factory: Callable[[], Any]):
+    """Ambil objek dengan key dari cache, atau bangun dengan factory() kalau belum ada."""
+    with _lock:
+        if key in _built:
+            _built.move_to_end(key)
+            stats["hits"] += 1
+            return _built[key]
+        stats["misses"] += 1
+    value = factory()
+    with _lock:
+        # kalau ada thread lain yang duluan selesai build, pakai punya dia
+        value = _built.setdefault(key, value)
+        while len(_built) > _max_entries:
+            _built.popitem(last=False)
+        return value
+
+
+def clear() -> None:
+    with _lock:
+        _compiled.clear()
+        _built.clear()
+        _code_digests.clear()
+        stats["hits"] = stats["misses"] = 0
+
+
+if __name__ == "__main__":
+    import time
+    from typing import Annotated
+
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.types import CachePolicy, Command, Send
+    from typing_extensions import TypedDict
+
+    from cache_keys import state_cache_key
+    from log_channel import AppendLogChannel
+    from sqlite_saver import DeltaSqliteSaver
+
+    class AppState(TypedDict):
+        query: str
+        plan: str
+        result: str
+        logs: Annotated[list[str], AppendLogChannel]
+
+    def route(state: AppState):
+        return Command(goto="multi" if "multi" in state["query"] else "agent_a")
+
+    def agent_a(state: AppState):
+        return Command(goto="manager", update={"logs": ["agent_a_done"]})
+
+    def agent_b(state: AppState):
+        return {"logs": ["agent_b_done"]}
+
+    def manager(state: AppState):
+        return Command(goto="worker", update={"plan": "Task"})
+
+    def worker(state: AppState):
+        return {"result": state["plan"], "logs": ["worker_done"]}
+
+    def multi_route(state: AppState):
+        return [Send(agent, {"query": state["query"], "logs": []}) for agent in ("agent_a", "agent_b")]
+
+    def build(manager_fn=manager):
+        builder = StateGraph(AppState)
+        builder.add_node("router", route)
+        builder.add_node("agent_a", agent_a)
+        builder.add_node("agent_b", agent_b)
+        # key_func baru di tiap build, tapi setelannya sama -> struktur sama
+        builder.add_node("manager", manager_fn,
+                         cache_policy=CachePolicy(ttl=60, key_func=state_cache_key(AppState, include=("query",))))
+        builder.add_node("worker", worker)
+        builder.add_node("multi", lambda state: {})
+        builder.add_edge(START, "router")
+        builder.add_conditional_edges("multi", multi_route)
+        builder.add_edge("agent_b", END)
+        builder.add_edge("worker", END)
+        return builder
+
+    def other_manager(state: AppState):
+        return Command(goto="worker", update={"plan": "Other task"})
+
+    # topologi sama -> graph sama; fungsi node beda -> graph beda
+    assert compile_cached(build()) is compile_cached(build())
+    assert compile_cached(build()) is not compile_cached(build(other_manager))
+    assert compile_cached(build()) is not compile_cached(build(), debug=True)
+    # checkpointer baru ke file yang sama -> graph sama; saver in-memory dibedakan per objek
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite")
+    assert compile_cached(build(), checkpointer=DeltaSqliteSaver(path)) is \
+        compile_cached(build(), checkpointer=DeltaSqliteSaver(path))
+    assert compile_cached(build(), checkpointer=DeltaSqliteSaver()) is not \
+        compile_cached(build(), checkpointer=DeltaSqliteSaver())
+
+    n = 200
+    builders = [build() for _ in range(n)]
+    for name, compile_fn in (("compile()", lambda b: b.compile()), ("compile_cached()", compile_cached)):
+        start = time.perf_counter()
+        for builder in builders:
+            graph = compile_fn(builder)
+        elapsed = time.perf_counter() - start
+        print(f"{name:17s} {elapsed / n * 1000:7.3f}ms per graph")
+    assert graph.invoke({"query": "multi", "logs": []})["logs"] == ["agent_a_done", "agent_b_done", "worker_done"]
+    print("cache:", stats)
@@ -0,0 +1,212 @@
+"""
+Menjalankan satu graph LangGraph untuk banyak thread_id sekaligus.
+
+Di langgraph_learn.py tiap skenario adalah graph.invoke(..., config) yang blocking untuk
+satu thread_id. Untuk puluhan ribu sesi independen, arun_many menjadwalkan pasangan
+(input, thread_id) secara concurrent di event loop asyncio:
+- jumlah sesi yang jalan bareng dibatasi max_concurrency (pakai concurrency.bounded_map),
+  input dibaca sedikit-sedikit jadi boleh generator/stream besar
+- semua sesi memakai graph hasil compile yang sama, jadi checkpointer dan node cache
+  (misal DeltaSqliteSaver + BoundedNodeCache) ikut dipakai bersama
+- hasil tiap thread di-yield begitu selesai sebagai RunResult (urutan tidak dijamin);
+  error satu sesi tidak menghentikan sesi lain
+- RunReport mengumpulkan throughput dan persentil latency (p50/p90/p99)
+
+    report = RunReport()
+    async for result in arun_many(graph, jobs, max_concurrency=64, report=report):
+        ...
+    print(report.summary())
+
+Benchmark:
+    python graph_runner.py
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from concurrency import bounded_map
+
+
+@dataclass
+class RunResult:
+    thread_id: str
+    output: Any = None
+    error: BaseException | None = None
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Persentil nearest-rank dari list yang sudah diurutkan (p dalam 0-100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class RunReport:
+    completed: int = 0
+    failed: int = 0
+    started_at: float | None = None
+    finished_at: float | None = None
+    latencies: list[float] = field(default_factory=list)
+
+    def add(self, result: RunResult) -> None:
+        if result.ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.latencies.append(result.latency)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Sesi selesai (sukses + gagal) per detik."""
+        elapsed = self.elapsed
+        return (self.completed + self.failed) / elapsed if elapsed else 0.0
+
+    def percentiles(self, ps=(50, 90, 99)) -> dict[str, float]:
+        values = sorted(self.latencies)
+        return {f"p{p}": percentile(values, p) for p in ps}
+
+    def summary(self) -> str:
+        pct = ", ".join(f"{name} {value * 1000:.1f}ms" for name, value in self.percentiles().items())
+        return (f"{self.completed} sukses, {self.failed} gagal dalam {self.elapsed:.2f}s "
+                f"({self.throughput:.0f} sesi/s); latency {pct}")
+
+
+def _thread_config(config: dict | None, thread_id: str) -> dict:
+    config = dict(config or {})
+    config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+    return config
+
+
+async def arun_many(
+    graph,
+    jobs: Iterable[tuple[Any, str]] | AsyncIterable[tuple[Any, str]],
+    *,
+    max_concurrency: int = 64,
+    config: dict | None = None,
+    report: RunReport | None = None,
+):
+    """Jalankan graph.ainvoke untuk tiap (input, thread_id); yield RunResult begitu selesai.
+
+    config dipakai sebagai dasar untuk semua sesi (misal recursion_limit/callbacks),
+    thread_id-nya diisi per sesi.
+    """
+    if report is not None and report.started_at is None:
+        report.started_at = time.perf_counter()
+
+    async def run(job):
+        graph_input, thread_id = job
+        start = time.perf_counter()
+        try:
+            output = await graph.ainvoke(graph_input, _thread_config(config, thread_id))
+        except Exception as exc:
+            # latency sesi yang gagal tetap dicatat (misal timeout ke LLM)
+            return RunResult(thread_id, None, exc, time.perf_counter() - start)
+        return RunResult(thread_id, output, None, time.perf_counter() - start)
+
+    try:
+        async for _, result, _ in bounded_map(run, jobs, max_concurrency=max_concurrency):
+            if report is not None:
+                report.add(result)
+            yield result
+    finally:
+        if report is not None:
+            report.finished_at = time.perf_counter()
+
+
+def run_many(graph, jobs, **kwargs) -> tuple[list[RunResult], RunReport]:
+    """Versi sync untuk script: jalankan semua job, return (hasil, report)."""
+    report = kwargs.pop("report", None) or RunReport()
+
+    async def collect():
+        return [result async for result in arun_many(graph, jobs, report=report, **kwargs)]
+
+    return asyncio.run(collect()), report
+
+
+if __name__ == "__main__":
+    from typing import Annotated
+
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.types import Command, Send
+    from typing_extensions import TypedDict
+
+    from log_channel import AppendLogChannel
+    from sqlite_saver import DeltaSqliteSaver
+
+    class AppState(TypedDict):
+        query: str
+        plan: str
+        result: str
+        logs: Annotated[list[str], AppendLogChannel]
+
+    # graph router/manager/worker seperti di langgraph_learn.py, manager pura-pura memanggil LLM
+    def route(state: AppState):
+        return Command(goto="multi" if "multi" in state["query"] else "agent_a")
+
+    def agent_a(state: AppState):
+        return Command(goto="manager", update={"logs": ["agent_a_done"]})
+
+    async def manager(state: AppState):
+        await asyncio.sleep(0.02)
+        return {"plan": f"plan for {state['query']}"}
+
+    def worker(state: AppState):
+        return {"result": f"done: {state['plan']}", "logs": ["worker_done"]}
+
+    builder = StateGraph(AppState)
+    builder.add_node("router", route)
+    builder.add_node("agent_a", agent_a)
+    builder.add_node("agent_b", lambda state: {"logs": ["agent_b_done"]})
+    builder.add_node("multi", lambda state: {})
+    builder.add_node("manager", manager)
+    builder.add_node("worker", worker)
+    builder.add_edge(START, "router")
+    builder.add_conditional_edges("multi", lambda state: [
+        Send(agent, {"query": state["query"], "logs": []}) for agent in ("agent_a", "agent_b")
+    ])
+    builder.add_edge("agent_b", END)
+    builder.add_edge("manager", "worker")
+    builder.add_edge("worker", END)
+    graph = builder.compile(checkpointer=DeltaSqliteSaver())
+
+    def jobs(n, prefix):
+        for i in range(n):
+            query = "multi analysis" if i % 2 else "analyze data"
+            yield {"query": query, "logs": []}, f"{prefix}-{i}"
+
+    async def sequential(n):
+        report = RunReport(started_at=time.perf_counter())
+        for graph_input, thread_id in jobs(n, "seq"):
+            start = time.perf_counter()
+            await graph.ainvoke(graph_input, _thread_config(None, thread_id))
+            report.add(RunResult(thread_id, latency=time.perf_counter() - start))
+        report.finished_at = time.perf_counter()
+        return report
+
+    n = 300
+    print(f"{n} sesi, sequential ainvoke:")
+    print("  " + asyncio.run(sequential(n)).summary())
+    for max_concurrency in (16, 64):
+        results, report = run_many(graph, jobs(n, f"c{max_concurrency}"), max_concurrency=max_concurrency)
+        assert all(result.ok for result in results)
+        print(f"{n} sesi, arun_many max_concurrency={max_concurrency}:")
+        print("  " + report.summary())
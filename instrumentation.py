@@ -0,0 +1,340 @@
+"""
+Instrumentasi latency dan token untuk graph LangGraph dan agent create_agent.
+
+Selama ini observability cuma print di manager/worker/agent_a dan dump message setelah
+run_react_agent() selesai. InstrumentationHandler adalah callback handler LangChain yang
+dipasang lewat config, jadi tidak perlu mengubah node:
+
+    metrics = InstrumentationHandler()
+    graph.invoke(inputs, {"callbacks": [metrics], ...})
+    agent.invoke(inputs, {"callbacks": [metrics]})
+    metrics.write_prometheus("metrics.prom")
+
+Yang dicatat (histogram, bucket tetap ala Prometheus):
+- langgraph_node_duration_seconds{node,status}: wall time tiap eksekusi node
+- langgraph_node_queue_wait_seconds{node}: jeda dari task pertama di step yang sama mulai
+  sampai node ini mulai (task yang antre di thread pool executor)
+- llm_request_duration_seconds{model,node}, llm_tokens_total{model,node,type} dari
+  usage_metadata, tool_duration_seconds{tool,status}
+
+Hot path-nya cuma time.perf_counter, beberapa operasi dict, dan bisect ke bucket; tidak ada
+alokasi per observasi selain entry run yang sedang jalan.
+
+Benchmark overhead:
+    python instrumentation.py
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+_HISTOGRAMS = {
+    "langgraph_node_duration_seconds": ("Wall time eksekusi node LangGraph.", LATENCY_BUCKETS),
+    "langgraph_node_queue_wait_seconds": ("Jeda antara task pertama di step dan mulainya node.", LATENCY_BUCKETS),
+    "llm_request_duration_seconds": ("Latency panggilan LLM.", LATENCY_BUCKETS),
+    "llm_request_tokens": ("Total token (input + output) per panggilan LLM.", TOKEN_BUCKETS),
+    "tool_duration_seconds": ("Wall time eksekusi tool.", LATENCY_BUCKETS),
+}
+_COUNTERS = {
+    "llm_tokens_total": "Jumlah token LLM dari usage_metadata.",
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "min", "max")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Perkiraan quantile, interpolasi linear di dalam bucket, dibatasi min/max yang teramati."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= target and n:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                estimate = low + (high - low) * (target - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+
+def _labels_text(labels: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """Registry histogram + counter, thread-safe, bisa diekspor ke format teks Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[tuple, Histogram]] = {name: {} for name in _HISTOGRAMS}
+        self._counters: dict[str, dict[tuple, float]] = {name: {} for name in _COUNTERS}
+
+    def observe(self, name: str, value: float, labels: tuple[tuple[str, str], ...]) -> None:
+        series = self._histograms[name]
+        with self._lock:
+            hist = series.get(labels)
+            if hist is None:
+                hist = series[labels] = Histogram(_HISTOGRAMS[name][1])
+            hist.observe(value)
+
+    def inc(self, name: str, value: float, labels: tuple[tuple[str, str], ...]) -> None:
+        series = self._counters[name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + value
+
+    def histogram(self, name: str, **labels) -> Histogram | None:
+        return self._histograms[name].get(tuple(labels.items()))
+
+    def counter(self, name: str, **labels) -> float:
+        return self._counters[name].get(tuple(labels.items()), 0)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                if not series:
+                    continue
+                help_text, buckets = _HISTOGRAMS[name]
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip((*buckets, "+Inf"), hist.counts):
+                        cumulative += n
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_labels_text(labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels_text(labels)} {hist.sum}")
+                    lines.append(f"{name}_count{_labels_text(labels)} {hist.count}")
+            for name, series in self._counters.items():
+                if not series:
+                    continue
+                lines += [f"# HELP {name} {_COUNTERS[name]}", f"# TYPE {name} counter"]
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Tulis atomik (tmp lalu rename) supaya scraper/textfile collector tidak baca file setengah jadi."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def summary(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                for labels, hist in sorted(series.items()):
+                    label_text = ",".join(f"{k}={v}" for k, v in labels)
+                    lines.append(f"{name}[{label_text}] n={hist.count} mean={hist.sum / hist.count:.4g} "
+                                 f"p50~{hist.quantile(0.5):.4g} p99~{hist.quantile(0.99):.4g}")
+            for name, series in self._counters.items():
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}[{','.join(f'{k}={v}' for k, v in labels)}] {value:g}")
+        return "\n".join(lines)
+
+
+def _model_name(serialized: dict | None, metadata: dict | None) -> str:
+    if metadata and metadata.get("ls_model_name"):
+        return metadata["ls_model_name"]
+    kwargs = (serialized or {}).get("kwargs") or {}
+    return kwargs.get("model_name") or kwargs.get("model") or "unknown"
+
+
+def _usage(response) -> dict | None:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage
+    token_usage = (response.llm_output or {}).get("token_usage")
+    if token_usage:
+        return {"input_tokens": token_usage.get("prompt_tokens", 0),
+                "output_tokens": token_usage.get("completion_tokens", 0)}
+    return None
+
+
+class InstrumentationHandler(BaseCallbackHandler):
+    """Callback handler yang mengisi Metrics dari event node, LLM, dan tool."""
+
+    run_inline = True  # jangan dijadwalkan ke executor di mode async, cukup catat di tempat
+
+    def __init__(self, metrics: Metrics | None = None):
+        self.metrics = metrics or Metrics()
+        self._runs: dict[UUID, tuple[str, tuple, float]] = {}
+        self._step_started: dict[UUID, dict[int, float]] = {}
+
+    # --- node LangGraph ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        now = time.perf_counter()
+        node = metadata.get("langgraph_node") if metadata else None
+        # run node sendiri diberi tag graph:step:N; runnable di dalam node (seq:step:N) dilewati
+        if node is None or kwargs.get("name") != node or not any(t.startswith("graph:step:") for t in tags or ()):
+            return
+        self._runs[run_id] = ("node", (("node", node),), now)
+        steps = self._step_started.setdefault(parent_run_id, {})
+        first = steps.setdefault(metadata.get("langgraph_step"), now)
+        self.metrics.observe("langgraph_node_queue_wait_seconds", now - first, (("node", node),))
+
+    def _end(self, run_id: UUID, status: str) -> None:
+        # graph (parent) selesai: buang catatan step-nya
+        self._step_started.pop(run_id, None)
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        kind, labels, start = run
+        elapsed = time.perf_counter() - start
+        if kind == "node":
+            self.metrics.observe("langgraph_node_duration_seconds", elapsed, labels + (("status", status),))
+        elif kind == "tool":
+            self.metrics.observe("tool_duration_seconds", elapsed, labels + (("status", status),))
+        elif kind == "llm":
+            self.metrics.observe("llm_request_duration_seconds", elapsed, labels)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # GraphBubbleUp (interrupt/Command ke parent) bukan error sungguhan
+        self._end(run_id, "interrupt" if type(error).__name__ in ("GraphInterrupt", "ParentCommand") else "error")
+
+    # --- LLM ---
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "")
+        self._runs[run_id] = ("llm", (("model", _model_name(serialized, metadata)), ("node", node)), time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self.on_llm_start(serialized, None, run_id=run_id, metadata=metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        self._end(run_id, "ok")
+        if run is None:
+            return
+        usage = _usage(response)
+        if usage:
+            labels = run[1]
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            self.metrics.inc("llm_tokens_total", input_tokens, labels + (("type", "input"),))
+            self.metrics.inc("llm_tokens_total", output_tokens, labels + (("type", "output"),))
+            self.metrics.observe("llm_request_tokens", input_tokens + output_tokens, labels)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error")
+
+    # --- tool ---
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._runs[run_id] = ("tool", (("tool", name),), time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, "ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, "error")
+
+    # --- ekspor ---
+
+    def to_prometheus(self) -> str:
+        return self.metrics.to_prometheus()
+
+    def write_prometheus(self, path: str) -> None:
+        self.metrics.write_prometheus(path)
+
+    def summary(self) -> str:
+        return self.metrics.summary()
+
+
+if __name__ == "__main__":
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import END, START, StateGraph
+    from typing_extensions import TypedDict
+
+    class State(TypedDict):
+        query: str
+        plan: str
+        result: str
+
+    def busy(seconds: float) -> None:
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def reply():
+        while True:
+            yield AIMessage("plan", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+    llm = GenericFakeChatModel(messages=reply())
+
+    def manager(state: State):
+        busy(0.001)
+        return {"plan": llm.invoke(state["query"]).content}
+
+    def worker(state: State):
+        busy(0.002)
+        return {"result": f"done {state['plan']}"}
+
+    builder = StateGraph(State)
+    builder.add_node("manager", manager)
+    builder.add_node("worker", worker)
+    builder.add_edge(START, "manager")
+    builder.add_edge("manager", "worker")
+    builder.add_edge("worker", END)
+    graph = builder.compile()
+
+    handler = InstrumentationHandler()
+    n = 300
+    cases = (("tanpa callback", []), ("BaseCallbackHandler kosong", [BaseCallbackHandler()]),
+             ("InstrumentationHandler", [handler]))
+    timings = {name: [] for name, _ in cases}
+    for _ in range(5):  # diselang-seling supaya noise mesin tersebar rata
+        for name, callbacks in cases:
+            start = time.perf_counter()
+            for _ in range(n):
+                graph.invoke({"query": "analyze"}, {"callbacks": callbacks})
+            timings[name].append(time.perf_counter() - start)
+    base = min(timings["BaseCallbackHandler kosong"])
+    for name, values in timings.items():
+        best = min(values)
+        print(f"{name:27s} {best / n * 1000:.3f}ms/invoke ({(best - base) / base:+.2%} vs handler kosong)")
+    print()
+    print(handler.summary())
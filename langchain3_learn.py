@@ -18,9 +18,10 @@ Dia harus ambil data order dulu, cek policy, baru kasih jawaban.
 """
 import os
 from dotenv import load_dotenv
-from langchain.agents import create_agent
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
+from llm_client import get_llm
+from graph_cache import get_or_build
+from instrumentation import InstrumentationHandler
 
 load_dotenv()
 
@@ -34,31 +35,53 @@ kapan tool dipakai dan bagaimana cara pakainya.
 Anggap saja seperti dokumentasi API tapi untuk AI.
 """
 
+# Data order dari OrderStore (SQLite di ORDER_DB_PATH, default in-memory) dengan index
+# (customer_id, purchase_date DESC), jadi order terakhir = satu index seek (lihat
+# order_store.py). Tanggal contoh relatif ke hari ini supaya hasil cek refund tetap masuk akal;
+# contoh cuma diisi kalau tabel orders masih kosong (database di ORDER_DB_PATH tidak ditimpa)
+from dataclasses import asdict
+from datetime import date, timedelta
+
+from order_store import REFUND_WINDOW_DAYS, Order, OrderStore, parse_purchase_date
+
+_today = date.today()
+order_store = OrderStore.from_env(seed=[
+    Order("ORD-998", "CUST-123", "Mouse", (_today - timedelta(days=75)).isoformat(), "Delivered"),
+    Order("ORD-999", "CUST-123", "Mechanical Keyboard", (_today - timedelta(days=12)).isoformat(), "Delivered"),
+    Order("ORD-1001", "CUST-456", "Monitor", (_today - timedelta(days=45)).isoformat(), "Delivered"),
+])
+
 @tool
 def get_latest_order(customer_id: str) -> dict:
     """Gets the latest order details for a given customer ID."""
     print(f"\n[Tool Execution] -> Mengambil data order untuk {customer_id}...")
-    return {
-        "order_id": "ORD-999",
-        "item": "Mechanical Keyboard",
-        "purchase_date": "2024-02-10",
-        "status": "Delivered"
-    }
+    order = order_store.latest_order(customer_id)
+    if order is None:
+        return {"error": f"No orders found for customer {customer_id}"}
+    return asdict(order)
 
 @tool
 def calculate_refund_eligibility(purchase_date: str) -> str:
     """Checks if a purchase date is eligible for a refund (within 30 days)."""
     print(f"\n[Tool Execution] -> Mengecek aturan refund untuk tanggal: {purchase_date}...")
-    return "Eligible. The purchase is within the 30-day return window."
+    # satu tanggal: cukup parse_purchase_date (aturan validasi sama dengan refund_eligibility
+    # versi batch), tidak perlu memuat numpy untuk satu nilai
+    try:
+        age = (date.today() - parse_purchase_date(purchase_date)).days
+    except ValueError:
+        return f"Invalid purchase date '{purchase_date}'. Expected format: YYYY-MM-DD."
+    if age < 0:
+        return "Not eligible. The purchase date is in the future."
+    if age <= REFUND_WINDOW_DAYS:
+        return f"Eligible. The purchase was {age} days ago, within the {REFUND_WINDOW_DAYS}-day return window."
+    return f"Not eligible. The purchase was {age} days ago, outside the {REFUND_WINDOW_DAYS}-day return window."
 
 # --- 2. THE REASONING ENGINE ---
 
 
-def run_react_agent():
-    llm = ChatOpenAI(
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-        base_url="https://openrouter.ai/api/v1",
-        model="stepfun/step-3.5-flash:free", temperature=0)
+def get_react_agent():
+    # ambil dari registry, jadi panggilan berikutnya pakai instance & koneksi yang sama
+    llm = get_llm(model="stepfun/step-3.5-flash:free", temperature=0, cache=True)
 
     # Giving the agent access to our defined functions
     tools = [get_latest_order, calculate_refund_eligibility]
@@ -78,7 +101,18 @@ def run_react_agent():
     Agent Executor lama (di Langchain klasik) ditinggalkan karena Tool Calling graph
     jauh lebih stabil untuk proses reasoningnya.
     """
-    agent_executor = create_agent(llm, tools, system_prompt=system_prompt)
+    def build_agent():
+        # import di sini: langchain.agents berat (~0.7s), cukup dibayar waktu agent pertama dibuat
+        from langchain.agents import create_agent
+
+        return create_agent(llm, tools, system_prompt=system_prompt)
+
+    # agent di-cache: panggilan run_react_agent() berikutnya tidak membangun graph lagi
+    return get_or_build(("react_agent", id(llm), tuple(t.name for t in tools), system_prompt), build_agent)
+
+
+def run_react_agent():
+    agent_executor = get_react_agent()
 
     # --- 5. EXECUTION & OBSERVATION ---
     print("\n" + "="*60)
@@ -86,9 +120,12 @@ def run_react_agent():
     print("="*60)
     
     # agent menerima message array untuk properti "messages"
+    # InstrumentationHandler mencatat latency LLM, tool, dan tiap node loop agent + token
+    # dari usage_metadata (lihat instrumentation.py)
+    metrics = InstrumentationHandler()
     response = agent_executor.invoke({
         "messages": [("user", "I am customer CUST-123. Can I get a refund on my last order?")]
-    })
+    }, config={"callbacks": [metrics]})
 
     # --- 6. UNPACKING THE REASONING ---
     """Setelah agent selesai, jawaban akhirnya ada di pesan terakhir array `messages`.
@@ -125,7 +162,63 @@ def run_react_agent():
             # Ini ekuivalen dengan bagian "Observation" di lama
             print(f"  OBSERVATION (Tool Result - {msg.name}): {msg.content}")
 
-run_react_agent()
+    print("\n--- METRICS (latency & token per langkah) ---")
+    print(metrics.summary())
+    if os.getenv("METRICS_PATH"):
+        metrics.write_prometheus(os.environ["METRICS_PATH"])
+
+async def arun_react_agent():
+    """Versi async + streaming: tiap langkah dicetak begitu terjadi, bukan setelah invoke selesai.
+
+    stream_agent_events membungkus agent.astream(stream_mode=["updates", "messages"]) jadi
+    event tool_call / observation / token / final (lihat agent_events.py). Satu proses bisa
+    menjalankan ratusan sesi seperti ini bareng-bareng (agent_events.stream_many).
+    """
+    from agent_events import stream_agent_events
+
+    agent_executor = get_react_agent()
+    query = "I am customer CUST-123. Can I get a refund on my last order?"
+    print("\n" + "="*60)
+    print(f"USER QUERY: {query}")
+    print("="*60)
+
+    metrics = InstrumentationHandler()
+    streaming = False
+    async for event in stream_agent_events(
+        agent_executor, {"messages": [("user", query)]}, config={"callbacks": [metrics]}
+    ):
+        if event.type == "token":
+            # token jawaban langsung ditampilkan, seperti yang dilakukan frontend
+            if not streaming:
+                print(f"\nStep {event.step + 1} STREAMING ANSWER: ", end="")
+                streaming = True
+            print(event.content, end="", flush=True)
+            continue
+        if streaming:
+            print()
+            streaming = False
+        if event.type == "tool_call":
+            print(f"\nStep {event.step} ACTION TAKEN: {event.name} with input '{event.args}'")
+        elif event.type == "observation":
+            print(f"\nStep {event.step} OBSERVATION (Tool Result - {event.name}): {event.content}")
+        elif event.type == "final":
+            print("\n" + "="*60)
+            print("FINAL ANSWER TO USER:")
+            print(event.content)
+            print("="*60)
+
+    print("\n--- METRICS (latency & token per langkah) ---")
+    print(metrics.summary())
+    if os.getenv("METRICS_PATH"):
+        metrics.write_prometheus(os.environ["METRICS_PATH"])
+
+# REACT_AGENT_MODE=stream -> versi async yang men-stream tiap langkah
+if os.getenv("REACT_AGENT_MODE") == "stream":
+    import asyncio
+
+    asyncio.run(arun_react_agent())
+else:
+    run_react_agent()
 
 """
 My Thought:
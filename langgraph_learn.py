@@ -97,9 +97,13 @@ from typing import Annotated
 from typing_extensions import TypedDict
 import operator
 
+from log_channel import AppendLogChannel
+
+# operator.add bikin list baru tiap update (O(N^2) kalau logs terus tumbuh),
+# AppendLogChannel cukup append ke storage bersama (lihat log_channel.py)
 class LogState(TypedDict):
     count: int
-    logs: Annotated[list[int], operator.add]
+    logs: Annotated[list[int], AppendLogChannel]
 
 def increment(state: LogState):
     # Hitung +1
@@ -135,8 +139,6 @@ hasil komputasi disimpan (misalnya dengan CachePolicy dan InMemoryCache). Contoh
 from typing import TypedDict, List, Annotated
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command, Send, CachePolicy
-from langgraph.cache.memory import InMemoryCache
-from langgraph.checkpoint.memory import InMemorySaver
 import operator
 
 
@@ -144,14 +146,17 @@ import operator
 """ STATE
  Ini wadah data utama yang bakal dishare ke semua node dalam graph.
  Semua key di sini bisa diakses dan diupdate oleh node manapun.
- Yang perlu diperkatiin: field logs pakai reducer (operator.add)
+ Yang perlu diperkatiin: field logs pakai channel append-only (AppendLogChannel)
  supaya kalau ada beberapa node jalan paralel dan nulis ke logs barengan,
  hasilnya digabung (append), bukan saling timpa."""
+from cache_keys import CacheKeyExclude, state_cache_key
+
 class AppState(TypedDict):
     query: str
     plan: str
     result: str
-    logs: Annotated[List[str], operator.add]  # reducer agar sinyal bisa tulis paralel
+    # append-only, aman ditulis paralel; CacheKeyExclude: tidak ikut cache key node
+    logs: Annotated[List[str], CacheKeyExclude, AppendLogChannel]
 """
 MANAGER / SUPERVISOR
 Manager ini kayak "bos" yang ngatur alur kerja. Dia bikin rencana (plan)
@@ -263,12 +268,24 @@ builder = StateGraph(AppState)
 builder.add_node("router", route_to_agent)
 
 builder.add_node("agent_a", agent_a)
-builder.add_node("agent_b", agent_b)
+# agent_b dijalankan di process pool (lihat process_nodes.py): kalau badannya berat di CPU,
+# fan-out Send agent_a + agent_b benar-benar jalan paralel di core lain, tidak rebutan GIL.
+# reads = key state yang dikirim ke proses worker; logs yang panjang tidak ikut di-pickle
+# Opt-in lewat env NODE_PROCESS_POOL=1, dan cuma kalau pool bisa fork: dengan spawn (Windows)
+# proses worker meng-import ulang script ini dari atas dan ikut menjalankan seluruh demo
+import multiprocessing
+import os
+from process_nodes import in_process, warm_up
+use_process_pool = (os.getenv("NODE_PROCESS_POOL") == "1"
+                    and "fork" in multiprocessing.get_all_start_methods())
+builder.add_node("agent_b", in_process(agent_b, reads=("query",)) if use_process_pool else agent_b)
 
 builder.add_node(
     "manager",
     manager,
-    cache_policy=CachePolicy(ttl=60)  # cache hasil manager selama 60 detik untuk input yang sama
+    # cache hasil manager selama 60 detik untuk query yang sama. Key cuma dari field query
+    # (lihat cache_keys.py); key default dari seluruh state selalu beda karena logs terus tumbuh
+    cache_policy=CachePolicy(ttl=60, key_func=state_cache_key(AppState, include=("query",)))
 )
 
 builder.add_node("worker", worker)
@@ -277,19 +294,36 @@ builder.add_node("worker", worker)
 builder.add_edge(START, "router")
 
 # sinyal: multi_router_node cuma pass-through, yang penting conditional edge-nya
-# nge-return list of Send buat dispatch ke agent_a dan agent_b secara paralel
-builder.add_node("multi_router_node", lambda state: state)
+# nge-return list of Send buat dispatch ke agent_a dan agent_b secara paralel.
+# Return {} (bukan state): kalau state dikembalikan, logs ikut ditulis ulang ke dirinya sendiri
+builder.add_node("multi_router_node", lambda state: {})
 builder.add_conditional_edges("multi_router_node", multi_route)
 
 builder.add_edge("agent_b", END)
 builder.add_edge("worker", END)
 
-# compile dengan memory (InMemorySaver) + cache (InMemoryCache)
-# checkpointer bikin state bisa dipersist antar invoke di thread yang sama
-graph = builder.compile(
-    cache=InMemoryCache(),
-    checkpointer=InMemorySaver()
+# compile dengan checkpointer SQLite (DeltaSqliteSaver) + cache node (BoundedNodeCache)
+# checkpointer bikin state bisa dipersist antar invoke di thread yang sama, dan karena
+# disimpan ke file (env CHECKPOINT_DB_PATH), juga antar run script (lihat thread_id di bawah). Logs yang terus
+# tumbuh disimpan sebagai delta, bukan salinan penuh tiap step (lihat sqlite_saver.py)
+# BoundedNodeCache = InMemoryCache + batas memori (LRU) + statistik hit/miss; kalau env
+# NODE_CACHE_PATH diisi, hasil node juga dibagi antar proses lewat SQLite (lihat node_cache.py)
+from sqlite_saver import DeltaSqliteSaver
+from node_cache import BoundedNodeCache
+
+node_cache = BoundedNodeCache(os.getenv("NODE_CACHE_PATH"), max_bytes=16 * 1024 * 1024)
+# compile_cached: kalau topologi + checkpointer/cache yang sama dibangun lagi (misal
+# di worker per request), graph hasil compile sebelumnya dipakai ulang (lihat graph_cache.py)
+from graph_cache import compile_cached
+
+graph = compile_cached(
+    builder,
+    cache=node_cache,
+    checkpointer=DeltaSqliteSaver.from_env()
 )
+# nyalakan worker process pool sekarang, sebelum graph jalan dan bikin thread
+if use_process_pool:
+    warm_up()
 """
 TEST RUN
 Jalanin dua skenario buat liat perbedaan single route vs multi route.
@@ -298,7 +332,16 @@ Pakai thread_id yang sama supaya state (termasuk logs) lanjut terakumulasi.
 - Query kedua ada kata "multi" -> sinyal ke agent_a + agent_b sekaligus
 
 """
-config = {"configurable": {"thread_id": "demo-thread"}}
+# instrumentation: latency tiap node + antrean di step yang sama, dicatat lewat callback
+# (lihat instrumentation.py). Print di node tetap ada, tapi angka pastinya dari sini
+from instrumentation import InstrumentationHandler
+
+instrumentation = InstrumentationHandler()
+# thread_id baru tiap run: kalau tetap "demo-thread", logs di file checkpoint terus menumpuk
+# dari run-run sebelumnya. Untuk melanjutkan thread lama, isi env DEMO_THREAD_ID
+import uuid
+thread_id = os.getenv("DEMO_THREAD_ID") or f"demo-{uuid.uuid4().hex[:8]}"
+config = {"configurable": {"thread_id": thread_id}, "callbacks": [instrumentation]}
 print("\n=== RUN SINGLE ROUTE ===")
 result1 = graph.invoke(
     {
@@ -319,4 +362,45 @@ result2 = graph.invoke(
     config
 )
 
-print(result2)
\ No newline at end of file
+print(result2)
+
+print("\n=== RUN SINGLE ROUTE LAGI (manager diambil dari cache) ===")
+result3 = graph.invoke(
+    {
+        "query": "please analyze data",
+        "logs": []
+    },
+    config
+)
+
+print(result3)
+
+"""
+RUN BANYAK SESI SEKALIGUS
+Kalau ada ribuan sesi independen (thread_id beda-beda), jangan invoke satu per satu.
+arun_many (graph_runner.py) menjalankan semuanya concurrent di event loop dengan batas
+max_concurrency, memakai graph, checkpointer, dan cache yang sama, lalu hasilnya
+di-stream per thread begitu selesai.
+"""
+import asyncio
+from graph_runner import RunReport, arun_many
+
+async def run_sessions():
+    jobs = [({"query": query, "logs": []}, f"session-{i}")
+            for i, query in enumerate(["analyze data", "multi analysis", "analyze data"])]
+    report = RunReport()
+    async for result in arun_many(graph, jobs, max_concurrency=8, report=report,
+                                  config={"callbacks": [instrumentation]}):
+        print(result.thread_id, "->", result.output["result"] if result.ok else result.error)
+    print(report.summary())
+
+print("\n=== RUN BANYAK SESI ===")
+asyncio.run(run_sessions())
+
+print("Node cache:", node_cache.stats)
+
+print("\n=== METRICS ===")
+print(instrumentation.summary())
+# METRICS_PATH diisi -> tulis format teks Prometheus (misal untuk textfile collector node_exporter)
+if os.getenv("METRICS_PATH"):
+    instrumentation.write_prometheus(os.environ["METRICS_PATH"])
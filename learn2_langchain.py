@@ -17,15 +17,13 @@ yang memerlukan interaksi antara pengguna dan sistem.
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
-from langchain_openai import ChatOpenAI
-from os import getenv
 from dotenv import load_dotenv
+from llm_client import get_llm
 load_dotenv()
-llm = ChatOpenAI(
-    api_key=getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-    model=getenv("MODEL"),
-)
+# semua model diambil dari registry bersama (llm_client.py) supaya satu connection pool
+# cache=True: request yang identik dijawab dari cache lokal (llm_cache.py); temperature=0
+# supaya jawaban yang di-cache memang jawaban yang akan keluar lagi (tidak membekukan satu sampel acak)
+llm = get_llm(temperature=0, cache=True)
 
 """
 Basic usage adalah cara sederhana untuk menggunakan message unit dalam langchain.
@@ -55,11 +53,7 @@ print("==== Message Prompt" * 1)
 
 "message prompt"
 
-llm2 = ChatOpenAI(
-    api_key=getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-    model="nvidia/nemotron-nano-12b-v2-vl:free",
-)
+llm2 = get_llm(model="nvidia/nemotron-nano-12b-v2-vl:free")
 
 messages = [
     SystemMessage("You are a helpful assistant."),
@@ -174,7 +168,13 @@ messages = [
     HumanMessage("Explain that concept further."),
 ]
 
-response = llm.invoke(messages)
+# History terus bertambah tiap turn; ContextWindow memangkas turn terlama supaya muat di
+# budget token sebelum dikirim. Token per message di-memo di objek message-nya, jadi
+# history yang sama tidak di-tokenize ulang tiap panggilan (lihat context_window.py)
+from context_window import ContextWindow
+
+context_window = ContextWindow(max_tokens=8_000)
+response = llm.invoke(context_window.fit(messages))
 logging.info(response.content)
 
 """
@@ -186,25 +186,26 @@ print("==== Tool Calls" * 1)
 
 "Tool Calls"
 
-from langchain_openai import ChatOpenAI
-from os import getenv
-
+from safe_calc import CalcError, evaluate, evaluate_many
 
 
 def calc(expression: str) -> float:
+    """Evaluate an arithmetic expression (numbers, + - * / // % **, sqrt, log, sin, cos, pi, e)."""
     try:
-        return eval(expression)
-    except Exception as e:
+        return evaluate(expression)
+    except (CalcError, ArithmeticError, ValueError, TypeError) as e:  # misal sqrt(-1), min()
         return f"Error: {e}"
 
 
-llmv20 = ChatOpenAI(
-    api_key=getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-    model="stepfun/step-3.5-flash:free",
-)
+def calc_batch(expressions: list[str]) -> list:
+    """Evaluate many arithmetic expressions at once; results are returned in the same order."""
+    return [f"Error: {r}" if isinstance(r, Exception) else r for r in evaluate_many(expressions)]
+
 
-model_with_tools = llmv20.bind_tools([calc])
+llmv20 = get_llm(model="stepfun/step-3.5-flash:free")
+
+calc_tools = {"calc": calc, "calc_batch": calc_batch}
+model_with_tools = llmv20.bind_tools(list(calc_tools.values()))
 
 response = model_with_tools.invoke(
     "What is 10 x 200? Use the calc tool to compute the answer."
@@ -215,12 +216,11 @@ for tool_call in response.tool_calls:
     print(f"Args: {tool_call['args']}")
     print(f"ID: {tool_call['id']}")
 
-if response.tool_calls:
-    tool_call = response.tool_calls[0]
-    tool_args = tool_call["args"]
-    expression = tool_args["expression"]
-    result = calc(expression)
-    print(f"Tool result: {result}")
+# semua tool call dalam satu response dijalankan paralel (lihat tool_executor.py)
+from tool_executor import execute_tool_calls
+
+for tool_message in execute_tool_calls(calc_tools, response, timeout=5.0):
+    print(f"Tool result ({tool_message.tool_call_id}): {tool_message.content}")
 
 """
 Token usage adalah jumlah token yang digunakan dalam proses generasi respons oleh model. 
@@ -252,14 +252,17 @@ pengguna untuk mulai membaca respons sebelum seluruhnya dihasilkan.
 """
 print("==== Streaming and Chunks" * 1)
 
+from streaming import StreamAggregator
+
 def chunks(llm, prompt):
-    chunks = []
-    full_message = None
+    # chunk cuma di-append ke buffer, pesan final dirakit sekali di akhir (lihat streaming.py)
+    aggregator = StreamAggregator()
     for chunk in llm.stream(prompt):
-        chunks.append(chunk)
         print(chunk.text)
-        full_message = chunk if full_message is None else full_message + chunk
+        aggregator.add(chunk)
+    full_message = aggregator.message()
     print("Full message:", full_message.text)
+    print("Stream stats:", aggregator.stats())
 
 chunks(llm, "Hi")
 
@@ -268,16 +271,32 @@ print("==== Basic tool definition" * 1)
 "Basic tool definition"
 from langchain_core.tools import tool
 
+# search_database mencari di index full-text lokal (SQLite FTS5, ranking BM25, lihat
+# search_index.py). SEARCH_DB_PATH menunjuk file index; default in-memory berisi data contoh
+# (cuma diisi kalau index-nya masih kosong). Ranking dibatasi ke 500 hasil cocok terbaru
+# supaya latency tool stabil; SEARCH_RANK_WINDOW=0 untuk ranking BM25 eksak
+from search_index import Record, SearchIndex
+
+search_index = SearchIndex.from_env(seed=[
+    Record(1, "customer", "Rizky Sulaeman", "Customer Rizky Sulaeman, Bandung, Premium account"),
+    Record(2, "customer", "Alice Johnson", "Customer Alice Johnson, Jakarta, Premium account"),
+    Record(3, "transaction", "Riwayat Transaksi pembelian Tokopedia", "customer 1 Rizky Sulaeman Rp250000 2024-02-10"),
+    Record(4, "transaction", "Riwayat Transaksi top up Gojek", "customer 1 Rizky Sulaeman Rp100000 2024-03-02"),
+    Record(5, "transaction", "Riwayat Transaksi refund Tokopedia", "customer 1 Rizky Sulaeman Rp250000 2024-03-05"),
+    Record(6, "transaction", "Riwayat Transaksi transfer BCA", "customer 2 Alice Johnson Rp1500000 2024-03-07"),
+])
+
 @tool
-def search_database(query: str, limit: int = 10) -> str:
+def search_database(query: str, limit: int = 10, offset: int = 0) -> str:
     """Search the customer database for records matching the query.
 
     Args:
         query: Search terms to look for
         limit: Maximum number of results to return
+        offset: Number of top results to skip (for the next page)
     """
 
-    return f"Found {limit} results for '{query}'"
+    return search_index.search(query, limit=limit, offset=offset).format()
 
 print(search_database.invoke({"query": "Riwayat Transaksi Rizky", "limit": 5}))
 
@@ -299,9 +318,18 @@ kompleks untuk alat dalam langchain menggunakan Pydantic. """
 
 print("==== Basic Advanced Schema Definition" * 1)
 
+# get_weather lewat WeatherService: cache TTL per (lokasi, units, include_forecast), nama
+# lokasi dinormalisasi dulu, dan banyak lokasi dalam satu panggilan di-fetch paralel
+# (lihat weather.py). FakeWeatherProvider = provider lokal, ganti dengan provider API asli
+from weather import FakeWeatherProvider, WeatherService
+
+weather_service = WeatherService(FakeWeatherProvider())
+
 class WeatherInput(BaseModel):
     """Input for weather queries."""
-    location: str = Field(description="City name or coordinates")
+    location: str | list[str] = Field(
+        description="City name or coordinates, or a list of them to look up several at once"
+    )
     units: Literal["celsius", "fahrenheit"] = Field(
         default="celsius",
         description="Temperature unit preference"
@@ -312,15 +340,18 @@ class WeatherInput(BaseModel):
     )
 
 @tool(args_schema=WeatherInput)
-def get_weather(location: str, units: str = "celsius", include_forecast: bool = False) -> str:
+def get_weather(location: str | list[str], units: str = "celsius", include_forecast: bool = False) -> str:
     """Get current weather and optional forecast."""
-    temp = 22 if units == "celsius" else 72
-    result = f"Current weather in {location}: {temp} degrees {units[0].upper()}"
-    if include_forecast:
-        result += "\nNext 5 days: Sunny"
-    return result
+    locations = [location] if isinstance(location, str) else location
+    results = weather_service.get_many(locations, units, include_forecast)
+    # ejaan berbeda untuk lokasi yang sama ("Jakarta", " JAKARTA ") cukup dilaporkan sekali
+    return "\n\n".join(dict.fromkeys(
+        weather.format() if weather is not None else f"Weather for {name} is unavailable right now"
+        for name, weather in results.items()
+    ))
 
 print(get_weather.invoke({"location": "Jakarta", "units": "celsius", "include_forecast": True}))
+print(get_weather.invoke({"location": ["Jakarta", "bandung", " JAKARTA "]}))
 
 """Short-term memory (State) adalah kemampuan model untuk menyimpan dan mengingat informasi selama percakapan berlangsung. Short-term memory memungkinkan model untuk mempertahankan konteks percakapan,
 mengingat informasi yang telah diberikan sebelumnya, dan menggunakan informasi tersebut untuk memberikan respons yang lebih relevan dan koheren. Short-term memory biasanya digunakan dalam chatbot, sistem dialog, 
@@ -335,21 +366,24 @@ from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage
 
 
+from conversation_state import IndexedMessages, contents_of_role, last_of_role
+
+# runtime["messages"] sebaiknya IndexedMessages supaya gak di-scan ulang tiap panggilan
+# (list biasa tetap bisa, di-scan langsung tanpa index)
+
 # Tool to get all user messages
 @tool
 def get_all_user_messages(runtime: dict) -> list:
     """Get all user messages' content as a list."""
-    messages = runtime["messages"]
-    return [m.content for m in messages if isinstance(m, HumanMessage)]
+    return contents_of_role(runtime["messages"], "human")
 
 # Tool to get the last user message
 @tool
 def get_last_user_message(runtime: dict) -> str:
     """Get the most recent message from the user."""
-    messages = runtime["messages"]
-    for message in reversed(messages):
-        if isinstance(message, HumanMessage):
-            return message.content
+    message = last_of_role(runtime["messages"], "human")
+    if message is not None:
+        return message.content
     return "No user messages found"
 
 # Access custom state fields
@@ -363,11 +397,11 @@ def get_user_preference(
     return preferences.get(pref_name, "Not set")
 
 
-user_messages = [
+user_messages = IndexedMessages([
     HumanMessage(content="Hello!"),
     HumanMessage(content="What is the weather like today?"),
     HumanMessage(content="Can you help me with my homework?"),
-]
+])
 print(get_last_user_message.invoke({"runtime": {"messages": user_messages}}))
 print(get_all_user_messages.invoke({"runtime": {"messages": user_messages}}))
 
@@ -383,7 +417,6 @@ application-specific settings that shouldn’t change during a conversation."""
 print("==== Basic Usage of Context" * 1)
 
 from dataclasses import dataclass
-from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 from langchain_core.tools import tool
 
@@ -403,6 +436,13 @@ USER_DATABASE = {
     }
 }
 
+# Lookup akun lewat AccountStore: tabel SQLite (ACCOUNT_DB_PATH, default in-memory) yang
+# diisi dari USER_DATABASE, dengan cache TTL per user_id. Agent yang bersamaan menanyakan
+# user yang sama cuma memicu satu query ke backend (lihat account_store.py)
+from account_store import AccountStore
+
+account_store = AccountStore.from_env(seed=USER_DATABASE)
+
 @dataclass
 class UserContext:
     user_id: str
@@ -412,31 +452,43 @@ class UserContext:
 def get_account_info(context: UserContext) -> str:
     """Get the current user's account information."""
     
-    user_id = context.user_id
-
-    if user_id in USER_DATABASE:
-        user = USER_DATABASE[user_id]
-        return (
-            f"Account holder: {user['name']}\n"
-            f"Type: {user['account_type']}\n"
-            f"Balance: ${user['balance']}"
-        )
+    account = account_store.get(context.user_id)
+    if account is not None:
+        return account.summary()
     
     return "User not found"
 
 
 # model = ChatOpenAI(model="gpt-4.1")
 
+# Token budget: semua panggilan LLM agent dihitung per model/user/thread di TokenAccountant.
+# Lewat 80% budget user -> dialihkan ke llm2; lewat batas -> TokenBudgetExceeded sebelum
+# request dikirim, jadi agent yang loop terus gak bisa ngabisin kuota (lihat token_budget.py)
+from token_budget import Budget, BudgetedChatModel, TokenAccountant, TokenBudgetExceeded
+
+token_accountant = TokenAccountant()
+token_accountant.set_budget("user", "*", Budget(max_tokens=50_000, downgrade_at=0.8))
+budgeted_llm = BudgetedChatModel(model=llm, fallback=llm2, accountant=token_accountant)
+
 agent = create_agent(
-    llm,
+    budgeted_llm,
     tools=[get_account_info],
     context_schema=UserContext,
-    system_prompt="You are a financial assistant."
+    system_prompt="You are a financial assistant.",
+    # tiap panggilan model di loop agent ikut dipangkas ke budget context_window
+    middleware=[context_window.middleware()]
 )
 
-result = agent.invoke(
-    {"messages": [{"role": "user", "content": "What's my current balance?"}]},
-    context=UserContext(user_id="user123")
-)
+user_context = UserContext(user_id="user123")
+try:
+    result = agent.invoke(
+        {"messages": [{"role": "user", "content": "What's my current balance?"}]},
+        # user_id di metadata supaya pemakaian token tercatat ke user ini
+        config={"metadata": {"user_id": user_context.user_id}},
+        context=user_context
+    )
+    print(result["messages"][-1].content)
+except TokenBudgetExceeded as exc:
+    print("Ditolak:", exc)
 
-print(result["messages"][-1].content)
\ No newline at end of file
+print("Token user123:", token_accountant.usage("user", "user123"))
\ No newline at end of file
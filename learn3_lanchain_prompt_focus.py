@@ -2,23 +2,20 @@
 
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from typing import List
 import os
 from dotenv import load_dotenv
 import logging
+from llm_client import get_llm
 
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
 
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-    model="stepfun/step-3.5-flash:free",
-    temperature=0.1 
-)
+# temperature=0 + prompt yang selalu sama -> aman di-cache (llm_cache.py); dengan temperature > 0
+# cache akan membekukan satu sampel acak dan mengembalikannya terus
+llm = get_llm(model="stepfun/step-3.5-flash:free", temperature=0, cache=True)
 
 print("\n" + "==== 1.Role-Based Basic Without Promptemplate ====" * 1)
 """
@@ -112,12 +109,40 @@ few_shot_template = ChatPromptTemplate.from_messages([
 
 print("Test Few-Shot Prompting untuk data keluhan email baru...\n")
 
-chain_2 = few_shot_template | llm
+# system message + contoh few-shot gak pernah berubah, jadi dirender sekali saja (lihat prompt_cache.py).
+# Prefix yang identik di tiap request juga bikin prompt caching di sisi provider bisa kena.
+from prompt_cache import freeze_chat_prompt
+
+frozen_few_shot = freeze_chat_prompt(few_shot_template)
+print(f"Few-shot prefix hash: {frozen_few_shot.prefix_hash[:16]}")
+
+chain_2 = frozen_few_shot | llm
 
 response_2 = chain_2.invoke({
     "user_email": "My Invoice from last month is incorrect. It shows a charge for a service I didn't use. Please fix this immediately."
 })
 print(response_2.content)
+
+"""
+Untuk volume besar (ribuan email per jam), chain yang sama dipakai lewat aclassify_emails:
+email diproses async dengan batas concurrency + backoff kalau kena rate limit,
+hasil keluar begitu selesai (lihat email_classifier.py).
+"""
+import asyncio
+from email_classifier import aclassify_emails
+
+inbound_emails = [
+    ("email-001", "I was charged twice for my subscription this month."),
+    ("email-002", "How do I add a new team member to our workspace?"),
+    ("email-003", "The export button throws an error and we have a board meeting in an hour."),
+]
+
+async def classify_inbound():
+    async for email_id, category, priority, reason in aclassify_emails(chain_2, inbound_emails, max_concurrency=4):
+        print(f"{email_id}: {category} | {priority} | {reason}")
+
+print("\nBulk classification (async)...\n")
+asyncio.run(classify_inbound())
 print("\n" + "="*80)
 
 
@@ -139,7 +164,11 @@ class ContractExtraction(BaseModel):
     is_auto_renewal: bool = Field(description="Whether the contract is automatically renewed at the end of the period.")
 
 # model dengan skema Pydantic
-structured_extractor = llm.with_structured_output(ContractExtraction)
+# StructuredExtractor: schema di-compile sekali, JSON divalidasi langsung dari teks,
+# JSON yang hampir valid diperbaiki lokal dulu sebelum tanya ulang model (lihat structured_output.py)
+from structured_output import StructuredExtractor, StructuredOutputError
+
+structured_extractor = StructuredExtractor(llm, ContractExtraction)
 
 extraction_prompt = ChatPromptTemplate.from_messages([
     ("system", """
@@ -176,8 +205,27 @@ try:
     print(f"Total Value     : ${contract_data.total_value_usd}")
     print(f"Auto Renewal?   : {contract_data.is_auto_renewal}")
     print(f"Deliverables    : \n - " + "\n - ".join(contract_data.key_deliverables))
-except Exception as e:
+except StructuredOutputError as e:
     print(f"Failed to extract structured output: {e}")
+    print(f"Raw model output: {e.raw}")
+print(f"Structured output stats: {structured_extractor.stats}")
+
+"""
+Untuk backlog kontrak dalam jumlah besar, extraction_chain yang sama dijalankan lewat
+run_extraction_pipeline: baca direktori, potong dokumen panjang, ekstrak paralel, gabung
+hasil per chunk, lalu tulis ke JSONL (lihat contract_pipeline.py).
+Set CONTRACTS_DIR untuk mencobanya.
+"""
+if os.getenv("CONTRACTS_DIR"):
+    from contract_pipeline import run_extraction_pipeline
+
+    pipeline_stats = run_extraction_pipeline(
+        extraction_chain,
+        os.getenv("CONTRACTS_DIR"),
+        os.getenv("CONTRACTS_OUTPUT", "contract_extractions.jsonl"),
+        max_workers=8,
+    )
+    print(f"Contract pipeline: {pipeline_stats}")
 
 print("\n" + "="*80)
 
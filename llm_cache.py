@@ -0,0 +1,186 @@
+"""
+Cache respons LLM (opt-in) untuk panggilan yang deterministik.
+
+Banyak panggilan di script ini diulang persis sama setiap kali dijalankan (messages
+security review di learn3, system prompt lesson plan kalkulus, llm.invoke("Hello!")),
+dan jalan di temperature 0 / 0.1. ResponseCache adalah BaseCache LangChain, jadi
+dipasang lewat parameter cache di ChatOpenAI (get_llm(..., cache=True)); LangChain
+sendiri yang memanggil lookup/update dengan:
+- prompt: messages yang sudah di-serialize (id message sudah dinolkan)
+- llm_string: model + semua parameter + tools hasil bind_tools
+
+Key cache = sha256 dari keduanya. Ada dua tier:
+- memory: LRU dengan batas jumlah entry
+- disk: SQLite, bertahan antar run, dengan batas jumlah entry (yang paling lama
+  tidak diakses dibuang duluan)
+Keduanya pakai TTL yang sama (None = tidak kedaluwarsa).
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import getenv
+
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+class ResponseCache(BaseCache):
+    """Cache dua tier (LRU memory + SQLite). path=None berarti memory saja."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        max_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        ttl: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[float | None, RETURN_VAL_TYPE]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+            self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.stats.expired += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] is None or row[1] > now:
+                        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        with suppress_langchain_beta_warning():
+                            value = loads(row[0], allowed_objects="core")
+                        self._remember(key, row[1], value)
+                        self.stats.disk_hits += 1
+                        return value
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._disk_entries -= 1
+                    self.stats.expired += 1
+
+            self.stats.misses += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remember(key, expires_at, return_val)
+            if self._conn is None:
+                return
+            payload = dumps(return_val)
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+                    (payload, expires_at, now, key),
+                )
+            self._disk_entries += inserted
+            if self._disk_entries > self.max_disk_entries:
+                self._evict_disk(now)
+            self._conn.commit()
+
+    def _remember(self, key, expires_at, value) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _evict_disk(self, now: float) -> None:
+        removed = self._conn.execute(
+            "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self.stats.expired += removed
+        self._disk_entries -= removed
+        overflow = self._disk_entries - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._disk_entries -= overflow
+            self.stats.evictions += overflow
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+                self._disk_entries = 0
+
+
+_default_cache = None
+
+
+def default_response_cache() -> ResponseCache:
+    """Cache bersama untuk get_llm(cache=True); file disk diatur lewat env LLM_CACHE_PATH."""
+    global _default_cache
+    if _default_cache is None:
+        ttl = getenv("LLM_CACHE_TTL")
+        _default_cache = ResponseCache(
+            getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+            ttl=float(ttl) if ttl else None,
+        )
+    return _default_cache
@@ -0,0 +1,200 @@
+"""
+Registry ChatOpenAI yang dipakai bareng semua script.
+
+Sebelumnya tiap script (dan tiap panggilan run_react_agent) bikin ChatOpenAI sendiri,
+jadi tiap instance punya HTTP client sendiri dan harus bayar TCP/TLS handshake lagi.
+Di sini semua model berbagi satu connection pool keep-alive (httpx), dan instance
+ChatOpenAI disimpan di registry dengan key (base_url, model, temperature, cache), jadi
+panggilan get_llm() kedua dengan parameter yang sama langsung dapat objek yang sama.
+
+Ukuran pool bisa diatur lewat configure_pool() atau env var:
+LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE, LLM_POOL_KEEPALIVE_EXPIRY.
+
+Benchmark cold vs warm connection (pakai server lokal yang meniru API OpenAI):
+    python llm_client.py
+"""
+from __future__ import annotations
+
+import threading
+from os import getenv
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+_lock = threading.Lock()
+_registry: dict[tuple, object] = {}
+_pool_settings = {
+    "max_connections": int(getenv("LLM_POOL_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(getenv("LLM_POOL_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30")),
+}
+_http_client = None
+_http_async_client = None
+
+
+def configure_pool(
+    max_connections: int | None = None,
+    max_keepalive_connections: int | None = None,
+    keepalive_expiry: float | None = None,
+) -> None:
+    """Atur ukuran connection pool. Client & registry lama dibuang supaya setting baru kepakai."""
+    global _http_client, _http_async_client
+    with _lock:
+        if max_connections is not None:
+            _pool_settings["max_connections"] = max_connections
+        if max_keepalive_connections is not None:
+            _pool_settings["max_keepalive_connections"] = max_keepalive_connections
+        if keepalive_expiry is not None:
+            _pool_settings["keepalive_expiry"] = keepalive_expiry
+        if _http_client is not None:
+            _http_client.close()
+        # async client gak bisa ditutup dari sini tanpa event loop, cukup dilepas
+        _http_client = None
+        _http_async_client = None
+        _registry.clear()
+
+
+def _pool_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=_pool_settings["max_connections"],
+        max_keepalive_connections=_pool_settings["max_keepalive_connections"],
+        keepalive_expiry=_pool_settings["keepalive_expiry"],
+    )
+
+
+def get_http_clients():
+    """Balikin pasangan (httpx.Client, httpx.AsyncClient) yang dishare semua model."""
+    global _http_client, _http_async_client
+    with _lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(limits=_pool_limits(), timeout=None)
+            _http_async_client = httpx.AsyncClient(limits=_pool_limits(), timeout=None)
+        return _http_client, _http_async_client
+
+
+def get_llm(
+    model: str | None = None,
+    temperature: float | None = None,
+    base_url: str = OPENROUTER_BASE_URL,
+    cache=None,
+):
+    """Ambil ChatOpenAI dari registry, bikin baru kalau belum ada.
+
+    Kalau model None, pakai env var MODEL (sama seperti learn2_langchain.py dulu).
+    cache=True memasang cache respons bersama (llm_cache.default_response_cache),
+    atau oper instance BaseCache sendiri. Default None = tanpa cache.
+    """
+    model = model or getenv("MODEL")
+    if cache is True:
+        from llm_cache import default_response_cache
+
+        cache = default_response_cache()
+    key = (base_url, model, temperature, id(cache) if cache is not None else None)
+    llm = _registry.get(key)
+    if llm is not None:
+        return llm
+
+    from langchain_openai import ChatOpenAI
+
+    http_client, http_async_client = get_http_clients()
+    kwargs = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if cache is not None:
+        kwargs["cache"] = cache
+    llm = ChatOpenAI(
+        api_key=getenv("OPENROUTER_API_KEY"),
+        base_url=base_url,
+        model=model,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **kwargs,
+    )
+    with _lock:
+        # kalau ada thread lain yang duluan daftar, pakai punya dia
+        return _registry.setdefault(key, llm)
+
+
+def _serve_fake_openai():
+    """Server lokal HTTP/1.1 keep-alive yang jawab /chat/completions dengan respons statis."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = json.dumps({
+        "id": "chatcmpl-local",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "local-model",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "hello"},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # header & body ditulis terpisah, tanpa ini kena delay Nagle/delayed-ACK ~40ms
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import os
+    import statistics
+    import time
+
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "local")
+    server = _serve_fake_openai()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    n = 200
+
+    def timed(make_llm):
+        latencies = []
+        for _ in range(n):
+            llm = make_llm()
+            start = time.perf_counter()
+            llm.invoke("Hello!")
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    def cold():
+        # perilaku lama: client baru (dan koneksi baru) tiap kali
+        return ChatOpenAI(
+            api_key="local", base_url=base_url, model="local-model",
+            http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=0)),
+        )
+
+    def warm():
+        return get_llm(model="local-model", base_url=base_url)
+
+    warm().invoke("warmup")
+    for name, make in (("cold", cold), ("warm", warm)):
+        lat = timed(make)
+        print(
+            f"{name:5s} n={n} mean={statistics.mean(lat):.2f}ms "
+            f"p50={statistics.median(lat):.2f}ms "
+            f"p99={statistics.quantiles(lat, n=100)[98]:.2f}ms"
+        )
+    server.shutdown()
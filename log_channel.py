@@ -0,0 +1,221 @@
+"""
+Channel append-only untuk field log di state LangGraph.
+
+LogState.logs dan AppState.logs di langgraph_learn.py pakai Annotated[list, operator.add]:
+setiap update bikin list baru berisi seluruh history (a + b), jadi N kali append = O(N^2)
+copy. Dengan checkpointer dan thread_id yang sama, logs terus tumbuh antar invoke dan
+BinaryOperatorAggregate menyimpan seluruh list di tiap checkpoint.
+
+AppendLog adalah view (storage, panjang) di atas list bersama:
+- append ke view yang ada di ujung storage cukup list.extend -> O(1) amortized
+- view lama tetap melihat prefix-nya sendiri (state yang sudah di-stream/di-checkpoint
+  tidak ikut berubah); kalau append dilakukan dari view lama (branch), storage di-copy
+- bertingkah seperti list untuk dibaca: len, index, slice, iterasi, == dengan list
+
+AppendLogChannel adalah channel LangGraph dengan reducer di atas. checkpoint() mengembalikan
+list biasa (di-cache per view, jadi step yang tidak menulis log tidak meng-copy apa-apa),
+sehingga serializer checkpoint bawaan tetap bisa menyimpannya tanpa tipe custom.
+Penyimpanan delta antar checkpoint dilakukan di saver, bukan di channel.
+
+Pemakaian:
+    logs: Annotated[list[str], AppendLogChannel]
+
+Update ditulis sebagai list biasa ({"logs": ["entry"]}). Jangan kembalikan state["logs"]
+itu sendiri sebagai update (misal node pass-through `lambda state: state`): isinya akan
+di-append ulang, dan AppendLog bukan tipe yang bisa di-serialize checkpointer.
+
+Benchmark:
+    python log_channel.py
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from itertools import islice
+from typing import Any
+
+from langgraph.channels import BaseChannel
+from langgraph.errors import InvalidUpdateError
+from langgraph.types import Overwrite
+
+
+class AppendLog(Sequence):
+    """View read-only atas list yang hanya ditambah di ujung."""
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: Iterable = ()):
+        self._items = list(items)
+        self._length = len(self._items)
+
+    @classmethod
+    def _view(cls, items: list, length: int) -> AppendLog:
+        view = cls.__new__(cls)
+        view._items = items
+        view._length = length
+        return view
+
+    def appended(self, values: Iterable) -> AppendLog:
+        """Return view baru dengan values di ujung; view ini sendiri tidak berubah."""
+        items = self._items
+        if len(items) != self._length:
+            # sudah ada yang append dari view ini sebelumnya (branch): copy prefix-nya
+            items = items[: self._length]
+        items.extend(values)
+        return AppendLog._view(items, len(items))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("AppendLog index out of range")
+        return self._items[index]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return islice(self._items, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AppendLog, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other: Iterable) -> AppendLog:
+        return self.appended(other)
+
+    def __copy__(self) -> AppendLog:
+        return self  # immutable view
+
+    def __reduce__(self):
+        return AppendLog, (list(self),)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def to_list(self) -> list:
+        return list(self)
+
+
+def _flatten(writes: Sequence[Any]) -> list:
+    values = []
+    for write in writes:
+        if isinstance(write, (list, tuple, AppendLog)):
+            values.extend(write)
+        else:
+            values.append(write)
+    return values
+
+
+class AppendLogChannel(BaseChannel):
+    """Channel append-only; update berupa list item (atau satu item), nilainya AppendLog."""
+
+    __slots__ = ("value", "_checkpoint")
+
+    def __init__(self, typ: Any = list, key: str = ""):
+        super().__init__(typ, key)
+        self.value = AppendLog()
+        self._checkpoint: tuple[AppendLog, list] | None = None
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AppendLogChannel)
+
+    @property
+    def ValueType(self) -> Any:
+        return self.typ
+
+    @property
+    def UpdateType(self) -> Any:
+        return self.typ
+
+    def copy(self) -> AppendLogChannel:
+        new = self.__class__(self.typ, self.key)
+        new.value = self.value  # view immutable, aman dipakai bersama
+        new._checkpoint = self._checkpoint
+        return new
+
+    def from_checkpoint(self, checkpoint: Any) -> AppendLogChannel:
+        new = self.__class__(self.typ, self.key)
+        if isinstance(checkpoint, (list, tuple, AppendLog)):
+            new.value = AppendLog(checkpoint)
+        return new
+
+    def update(self, values: Sequence[Any]) -> bool:
+        if not values:
+            return False
+        overwrites = [v for v in values if isinstance(v, Overwrite)]
+        if len(overwrites) > 1:
+            raise InvalidUpdateError("Can receive only one Overwrite value per super-step.")
+        if overwrites:
+            self.value = AppendLog(overwrites[0].value or ())
+            return True
+        appended = _flatten(values)
+        if appended:
+            self.value = self.value.appended(appended)
+        return True
+
+    def get(self) -> AppendLog:
+        return self.value
+
+    def is_available(self) -> bool:
+        return True
+
+    def checkpoint(self) -> list:
+        cached = self._checkpoint
+        if cached is None or cached[0] is not self.value:
+            cached = self._checkpoint = (self.value, self.value.to_list())
+        return cached[1]
+
+
+if __name__ == "__main__":
+    import operator
+    import time
+    from typing import Annotated
+
+    from langgraph.channels import BinaryOperatorAggregate
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import END, START, StateGraph
+    from typing_extensions import TypedDict
+
+    n = 100_000
+    print(f"{n} appended log entries (satu update per entry)")
+    for name, channel in (
+        ("operator.add", BinaryOperatorAggregate(list, operator.add)),
+        ("AppendLogChannel", AppendLogChannel(list)),
+    ):
+        channel = channel.from_checkpoint(channel.checkpoint())
+        start = time.perf_counter()
+        for i in range(n):
+            channel.update([[f"entry {i}"]])
+        elapsed = time.perf_counter() - start
+        assert len(channel.get()) == n and channel.get()[-1] == f"entry {n - 1}"
+        print(f"  {name:18s} {elapsed * 1000:9.1f}ms")
+
+    class BenchState(TypedDict):
+        logs: Annotated[list[str], AppendLogChannel]
+
+    class BaselineState(TypedDict):
+        logs: Annotated[list[str], operator.add]
+
+    def build(schema):
+        builder = StateGraph(schema)
+        builder.add_node("log", lambda state: {"logs": [f"entry {len(state['logs'])}"]})
+        builder.add_edge(START, "log")
+        builder.add_edge("log", END)
+        return builder.compile(checkpointer=InMemorySaver())
+
+    invokes = 300
+    print(f"{invokes} invoke pada thread yang sama (checkpointer InMemorySaver)")
+    for name, schema in (("operator.add", BaselineState), ("AppendLogChannel", BenchState)):
+        graph = build(schema)
+        config = {"configurable": {"thread_id": "bench"}}
+        start = time.perf_counter()
+        for _ in range(invokes):
+            result = graph.invoke({"logs": []}, config)
+        elapsed = time.perf_counter() - start
+        assert result["logs"] == [f"entry {i}" for i in range(invokes)]
+        saver = graph.checkpointer
+        stored = sum(len(v[1]) for v in saver.blobs.values() if v[0] != "empty")
+        print(f"  {name:18s} {elapsed * 1000:9.1f}ms, blob tersimpan {stored / 1024:.0f} KiB")
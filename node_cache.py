@@ -0,0 +1,352 @@
+"""
+Cache hasil node LangGraph dengan batas memori, eviction, dan statistik.
+
+Node manager di langgraph_learn.py pakai CachePolicy(ttl=60) + InMemoryCache(). InMemoryCache
+cuma membuang entry yang kedaluwarsa waktu dibaca: tidak ada batas ukuran (key unik
+terus menumpuk) dan tidak kelihatan berapa yang hit/miss.
+
+BoundedNodeCache adalah BaseCache LangGraph dengan:
+- batas byte (max_bytes) dihitung dari ukuran hasil serialize tiap entry
+- eviction "lru" (paling lama tidak dipakai) atau "lfu" (paling jarang dipakai,
+  seri diputus dengan LRU), keduanya O(1) per operasi
+- counter hit/miss/eviction/expired di .stats
+- tier disk opsional (SQLite, path=...): beberapa proses worker yang menjalankan graph
+  yang sama berbagi hasil node lewat file yang sama. Miss di memory dicek ke disk,
+  hit dari disk dinaikkan ke memory. Di aget/aset/aclear, akses SQLite (blocking)
+  dijalankan di thread lewat asyncio.to_thread supaya event loop tidak tertahan.
+
+Benchmark hit rate LRU vs LFU:
+    python node_cache.py
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+from langgraph.cache.base import BaseCache, FullKey, Namespace, ValueT
+
+_NS_SEP = "\x1f"
+
+
+@dataclass
+class NodeCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+    rejected: int = 0  # entry lebih besar dari max_bytes
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    type: str
+    data: bytes
+    expires_at: float | None
+    size: int
+
+
+class _LRUOrder:
+    def __init__(self):
+        self._order: OrderedDict[FullKey, None] = OrderedDict()
+
+    def add(self, key: FullKey) -> None:
+        self._order[key] = None
+
+    def touch(self, key: FullKey) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: FullKey) -> None:
+        del self._order[key]
+
+    def victim(self) -> FullKey:
+        return next(iter(self._order))
+
+
+class _LFUOrder:
+    """Bucket per frekuensi; di dalam bucket urut LRU.
+
+    Bucket yang ada disambung jadi linked list urut frekuensi naik (_prev/_next), bucket
+    kosong langsung dilepas, jadi frekuensi terkecil selalu kepala list: semua operasi O(1).
+    """
+
+    def __init__(self):
+        self._freq: dict[FullKey, int] = {}
+        self._buckets: dict[int, OrderedDict[FullKey, None]] = {}
+        self._prev: dict[int, int | None] = {}
+        self._next: dict[int, int | None] = {}
+        self._min: int | None = None
+
+    def _bucket(self, freq: int, prev: int | None) -> OrderedDict[FullKey, None]:
+        """Bucket freq; kalau belum ada, dibuat tepat setelah bucket prev (None = di kepala)."""
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+            after = self._min if prev is None else self._next[prev]
+            self._prev[freq], self._next[freq] = prev, after
+            if prev is None:
+                self._min = freq
+            else:
+                self._next[prev] = freq
+            if after is not None:
+                self._prev[after] = freq
+        return bucket
+
+    def _discard(self, key: FullKey, freq: int) -> None:
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            prev, after = self._prev.pop(freq), self._next.pop(freq)
+            if prev is None:
+                self._min = after
+            else:
+                self._next[prev] = after
+            if after is not None:
+                self._prev[after] = prev
+
+    def add(self, key: FullKey) -> None:
+        self._freq[key] = 1
+        self._bucket(1, None)[key] = None  # frekuensi 1 selalu di kepala
+
+    def touch(self, key: FullKey) -> None:
+        freq = self._freq[key]
+        self._freq[key] = freq + 1
+        # bucket freq + 1 dibuat dulu selagi bucket freq masih ada di list
+        self._bucket(freq + 1, freq)[key] = None
+        self._discard(key, freq)
+
+    def remove(self, key: FullKey) -> None:
+        self._discard(key, self._freq.pop(key))
+
+    def victim(self) -> FullKey:
+        return next(iter(self._buckets[self._min]))
+
+
+class BoundedNodeCache(BaseCache[ValueT]):
+    """Cache node dengan budget byte, LRU/LFU, dan tier SQLite opsional."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        policy: str = "lru",
+        max_disk_entries: int = 100_000,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.max_disk_entries = max_disk_entries
+        self.stats = NodeCacheStats()
+        self._entries: dict[FullKey, _Entry] = {}
+        self._order = _LRUOrder() if policy == "lru" else _LFUOrder()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._sets_since_trim = 0
+        if path is not None:
+            # timeout: proses lain mungkin sedang menulis ke file yang sama
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS node_cache ("
+                "ns TEXT NOT NULL, key TEXT NOT NULL, type TEXT NOT NULL, value BLOB NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL, PRIMARY KEY (ns, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS node_cache_accessed ON node_cache(accessed_at)")
+
+    # --- tier memory ---
+
+    def _drop(self, key: FullKey) -> None:
+        entry = self._entries.pop(key)
+        self._order.remove(key)
+        self.stats.bytes -= entry.size
+        self.stats.entries -= 1
+
+    def _store(self, key: FullKey, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            self.stats.rejected += 1
+            return
+        if key in self._entries:
+            self._drop(key)
+        while self.stats.bytes + entry.size > self.max_bytes:
+            self._drop(self._order.victim())
+            self.stats.evictions += 1
+        self._entries[key] = entry
+        self._order.add(key)
+        self.stats.bytes += entry.size
+        self.stats.entries += 1
+
+    @staticmethod
+    def _entry_size(key: FullKey, data: bytes) -> int:
+        ns, k = key
+        return len(data) + len(k) + sum(len(part) for part in ns)
+
+    # --- BaseCache ---
+
+    def get(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        if not keys:
+            return {}
+        now = time.time()
+        found: dict[FullKey, ValueT] = {}
+        missing: list[FullKey] = []
+        with self._lock:
+            for ns, k in keys:
+                key = (tuple(ns), k)
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                    self._drop(key)
+                    self.stats.expired += 1
+                    entry = None
+                if entry is None:
+                    missing.append(key)
+                    continue
+                self._order.touch(key)
+                self.stats.memory_hits += 1
+                found[key] = self.serde.loads_typed((entry.type, entry.data))
+
+            if missing and self._conn is not None:
+                for key, entry in self._disk_get(missing, now).items():
+                    self._store(key, entry)
+                    self.stats.disk_hits += 1
+                    found[key] = self.serde.loads_typed((entry.type, entry.data))
+            self.stats.misses += len(keys) - len(found)
+        return found
+
+    def _disk_get(self, keys: list[FullKey], now: float) -> dict[FullKey, _Entry]:
+        wanted = {(_NS_SEP.join(ns), k): (ns, k) for ns, k in keys}
+        rows = []
+        items = list(wanted)
+        for i in range(0, len(items), 400):  # batas jumlah parameter SQLite
+            batch = items[i:i + 400]
+            placeholders = " OR ".join(["(ns = ? AND key = ?)"] * len(batch))
+            rows += self._conn.execute(
+                f"SELECT ns, key, type, value, expires_at FROM node_cache WHERE {placeholders}",
+                [part for pair in batch for part in pair],
+            ).fetchall()
+        hits = {}
+        stale = []
+        for ns, k, type_, data, expires_at in rows:
+            if expires_at is not None and expires_at <= now:
+                stale.append((ns, k))
+                continue
+            key = wanted[(ns, k)]
+            hits[key] = _Entry(type_, data, expires_at, self._entry_size(key, data))
+        with self._conn:
+            if hits:
+                self._conn.executemany(
+                    "UPDATE node_cache SET accessed_at = ? WHERE ns = ? AND key = ?",
+                    [(now, _NS_SEP.join(ns), k) for ns, k in hits],
+                )
+            if stale:
+                self._conn.executemany("DELETE FROM node_cache WHERE ns = ? AND key = ?", stale)
+                self.stats.expired += len(stale)
+        return hits
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        if self._conn is None:  # tier memory saja: tidak ada I/O, thread hop cuma overhead
+            return self.get(keys)
+        return await asyncio.to_thread(self.get, keys)
+
+    def set(self, pairs: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        now = time.time()
+        rows = []
+        with self._lock:
+            for (ns, k), (value, ttl) in pairs.items():
+                key = (tuple(ns), k)
+                type_, data = self.serde.dumps_typed(value)
+                expires_at = now + ttl if ttl is not None else None
+                self._store(key, _Entry(type_, data, expires_at, self._entry_size(key, data)))
+                rows.append((_NS_SEP.join(key[0]), k, type_, data, expires_at, now))
+            if self._conn is not None and rows:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO node_cache (ns, key, type, value, expires_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._sets_since_trim += len(rows)
+                    if self._sets_since_trim >= 64:
+                        self._trim_disk(now)
+
+    def _trim_disk(self, now: float) -> None:
+        self._sets_since_trim = 0
+        self.stats.expired += self._conn.execute(
+            "DELETE FROM node_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self.stats.evictions += self._conn.execute(
+            "DELETE FROM node_cache WHERE rowid IN (SELECT rowid FROM node_cache ORDER BY accessed_at "
+            "LIMIT max(0, (SELECT COUNT(*) FROM node_cache) - ?))",
+            (self.max_disk_entries,),
+        ).rowcount
+
+    async def aset(self, pairs: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        if self._conn is None:
+            self.set(pairs)
+        else:
+            await asyncio.to_thread(self.set, pairs)
+
+    def clear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        with self._lock:
+            if namespaces is None:
+                for key in list(self._entries):
+                    self._drop(key)
+                if self._conn is not None:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM node_cache")
+                return
+            targets = {tuple(ns) for ns in namespaces}
+            for key in [key for key in self._entries if key[0] in targets]:
+                self._drop(key)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(
+                        "DELETE FROM node_cache WHERE ns = ?", [(_NS_SEP.join(ns),) for ns in targets]
+                    )
+
+    async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        if self._conn is None:
+            self.clear(namespaces)
+        else:
+            await asyncio.to_thread(self.clear, namespaces)
+
+
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    keys = [(("node",), f"input-{i}") for i in range(2_000)]
+    # workload miring: sebagian kecil input sering diulang (zipf-ish), sisanya jarang
+    weights = [1 / (rank + 1) for rank in range(len(keys))]
+    requests = rng.choices(keys, weights=weights, k=50_000)
+    value = {"plan": "x" * 1_000}
+
+    for policy in ("lru", "lfu"):
+        cache = BoundedNodeCache(max_bytes=200 * 1_100, policy=policy)  # muat ~200 entry
+        start = time.perf_counter()
+        for key in requests:
+            if not cache.get([key]):
+                cache.set({key: (value, None)})
+        elapsed = time.perf_counter() - start
+        s = cache.stats
+        print(f"{policy}: hit rate {s.hit_rate:.1%}, evictions {s.evictions}, entries {s.entries}, "
+              f"{s.bytes / 1024:.0f} KiB, {elapsed / len(requests) * 1e6:.1f}us/request")
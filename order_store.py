@@ -0,0 +1,316 @@
+"""
+Data order dan cek refund di belakang tool get_latest_order / calculate_refund_eligibility
+(langchain3_learn.py).
+
+Sebelumnya kedua tool mengembalikan data hardcode (order tanggal 2024-02-10 yang selalu
+"Eligible"). Sekarang:
+
+- tabel orders di SQLite dengan index (customer_id, purchase_date DESC): "order terakhir
+  customer X" = satu index seek (LIMIT 1), bukan scan + sort semua order
+- ConnectionPool: koneksi SQLite dibuka sekali lalu dipinjam-kembalikan lewat queue,
+  jumlahnya dibatasi; request agent yang bersamaan tidak membuka koneksi baru
+- latest_orders(customer_ids): banyak customer dalam satu statement (json_each + subquery
+  per customer, tiap customer tetap index seek)
+- refund_eligibility(purchase_dates): cek jendela 30 hari untuk banyak tanggal sekaligus
+  dengan numpy (datetime64), fallback ke loop Python kalau numpy tidak ada. numpy di-import
+  waktu dipakai pertama kali, bukan waktu modul di-import (startup script tetap ringan)
+
+    store = OrderStore.from_env(seed=[Order(...)])
+    order = store.latest_order("CUST-123")
+    days, eligible = refund_eligibility([order.purchase_date])
+
+Benchmark 10k customer bersamaan:
+    python order_store.py
+"""
+from __future__ import annotations
+
+import json
+import queue
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from os import getenv
+
+REFUND_WINDOW_DAYS = 30
+_ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+_DIGIT_COLUMNS = [0, 1, 2, 3, 5, 6, 8, 9]  # posisi angka di "YYYY-MM-DD", sisanya "-"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    item TEXT NOT NULL,
+    purchase_date TEXT NOT NULL,  -- ISO YYYY-MM-DD, urut teks = urut tanggal
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_customer_date ON orders (customer_id, purchase_date DESC);
+"""
+_COLUMNS = "order_id, customer_id, item, purchase_date, status"
+
+
+@dataclass(frozen=True)
+class Order:
+    order_id: str
+    customer_id: str
+    item: str
+    purchase_date: str
+    status: str
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite ber-batas; connection() meminjam satu dan mengembalikannya."""
+
+    def __init__(self, path: str, size: int = 8):
+        if path == ":memory:":
+            # shared cache supaya semua koneksi di pool melihat database memory yang sama
+            path = f"file:orders-{id(self)}?mode=memory&cache=shared"
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        # koneksi pertama dipegang terus: database memory hilang kalau semua koneksi ditutup
+        self._keepalive = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = self.path.startswith("file:")
+        conn = sqlite3.connect(self.path, uri=uri, check_same_thread=False, timeout=30)
+        if not uri:
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            # koneksi baru cuma dibuka kalau pool belum penuh, kalau sudah: tunggu yang dipakai
+            if not can_open:
+                conn = self._idle.get()
+            else:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    with self._lock:
+                        self._opened -= 1  # slot dikembalikan, kalau tidak pool lama-lama macet
+                    raise
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._keepalive.close()
+
+
+class OrderStore:
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        with pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls, seed: Iterable[Order] | None = None) -> OrderStore:
+        """Database di ORDER_DB_PATH (default in-memory), order awal cuma diisi ke tabel kosong."""
+        store = cls(ConnectionPool(getenv("ORDER_DB_PATH", ":memory:")))
+        if seed:
+            store.seed(seed)
+        return store
+
+    def seed(self, orders: Iterable[Order]) -> bool:
+        """Isi tabel hanya kalau masih kosong; order yang sudah ada tidak ditimpa. True kalau diisi."""
+        with self.pool.connection() as conn, conn:
+            # BEGIN IMMEDIATE: cek kosong + insert atomik, proses lain yang seed bersamaan menunggu
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM orders)").fetchone()[0]:
+                return False
+            conn.executemany(
+                f"INSERT INTO orders ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                ((o.order_id, o.customer_id, o.item, o.purchase_date, o.status) for o in orders),
+            )
+        return True
+
+    def upsert(self, orders: Iterable[Order]) -> None:
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO orders ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                ((o.order_id, o.customer_id, o.item, o.purchase_date, o.status) for o in orders),
+            )
+
+    def latest_order(self, customer_id: str) -> Order | None:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM orders WHERE customer_id = ? "
+                "ORDER BY purchase_date DESC LIMIT 1",
+                (customer_id,),
+            ).fetchone()
+        return Order(*row) if row else None
+
+    def latest_orders(self, customer_ids: Iterable[str]) -> dict[str, Order | None]:
+        """Order terakhir untuk banyak customer dalam satu query."""
+        ids = list(dict.fromkeys(customer_ids))
+        result: dict[str, Order | None] = dict.fromkeys(ids)
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join('o.' + column for column in _COLUMNS.split(', '))} "
+                "FROM json_each(?) AS c JOIN orders AS o ON o.rowid = ("
+                "  SELECT rowid FROM orders WHERE customer_id = c.value ORDER BY purchase_date DESC LIMIT 1)",
+                (json.dumps(ids),),
+            )
+            for row in rows:
+                result[row[1]] = Order(*row)
+        return result
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:  # refund_eligibility tetap jalan, cuma tanpa vektorisasi
+        return None
+    return np
+
+
+def parse_purchase_date(value: str) -> date:
+    """Tanggal YYYY-MM-DD persis; ValueError untuk format lain.
+
+    date.fromisoformat saja terlalu longgar (menerima juga "20240210" dan "2024-W06-6").
+    """
+    if not isinstance(value, str) or not _ISO_DATE.fullmatch(value):
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+    return date.fromisoformat(value)
+
+
+def _iso_date_bytes(np, values):
+    """Array bytes S10 kalau semua string berbentuk YYYY-MM-DD (dicek langsung di byte-nya), selain itu None."""
+    try:
+        raw = np.asarray(values, dtype="S")
+    except (UnicodeEncodeError, ValueError, TypeError):
+        return None
+    if raw.ndim != 1 or raw.dtype.itemsize != 10:  # ada string yang panjangnya bukan 10 karakter
+        return None
+    chars = raw.view(np.uint8).reshape(len(raw), 10)
+    digits = chars[:, _DIGIT_COLUMNS]
+    if not (((digits >= ord("0")) & (digits <= ord("9"))).all() and (chars[:, [4, 7]] == ord("-")).all()):
+        return None
+    return raw
+
+
+def refund_eligibility(
+    purchase_dates: Sequence[str],
+    *,
+    today: date | None = None,
+    window_days: int = REFUND_WINDOW_DAYS,
+) -> tuple[Sequence[int], Sequence[bool]]:
+    """(umur order dalam hari, eligible) untuk tiap tanggal; ValueError kalau ada yang invalid.
+
+    purchase_dates: string YYYY-MM-DD, atau array numpy datetime64[D] (tidak perlu di-parse lagi).
+    Eligible = dibeli hari ini sampai window_days hari yang lalu (tanggal di masa depan tidak).
+    Aturan validasinya sama dengan parse_purchase_date, dengan atau tanpa numpy.
+    """
+    today = today or date.today()
+    np = _numpy()
+    if np is None:
+        days = [(today - parse_purchase_date(value)).days for value in purchase_dates]
+        return days, [0 <= age <= window_days for age in days]
+    if isinstance(purchase_dates, np.ndarray) and purchase_dates.dtype.kind == "M":
+        dates = purchase_dates.astype("datetime64[D]")
+        invalid = np.isnat(dates)
+        if invalid.any():
+            raise ValueError(f"Invalid date {dates[invalid][0]!r}, expected YYYY-MM-DD")
+    elif not len(purchase_dates):
+        dates = np.array([], dtype="datetime64[D]")
+    else:
+        # numpy sendiri menerima "", "NaT" (-> NaT) dan tanggal parsial ("2024", "2024-02")
+        raw = _iso_date_bytes(np, purchase_dates)
+        if raw is None:
+            invalid = (v for v in purchase_dates if not isinstance(v, str) or not _ISO_DATE.fullmatch(v))
+            bad = next(invalid, purchase_dates)
+            raise ValueError(f"Invalid date {bad!r}, expected YYYY-MM-DD")
+        dates = raw.astype("datetime64[D]")  # tanggal mustahil (02-30) -> ValueError
+    days = (np.datetime64(today, "D") - dates).astype(np.int64)
+    return days, (days >= 0) & (days <= window_days)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import timedelta
+
+    rng = random.Random(0)
+    today = date.today()
+    n_customers = 100_000
+    items = ["Mechanical Keyboard", "Mouse", "Monitor", "Headset", "Webcam", "USB Hub", "Laptop Stand"]
+
+    def generate():
+        for customer in range(n_customers):
+            for n in range(rng.randint(1, 10)):
+                yield Order(f"ORD-{customer}-{n}", f"CUST-{customer}", rng.choice(items),
+                            (today - timedelta(days=rng.randrange(365))).isoformat(), "Delivered")
+
+    store = OrderStore(ConnectionPool(":memory:", size=8))
+    start = time.perf_counter()
+    store.upsert(generate())
+    with store.pool.connection() as conn:
+        n_orders = conn.execute("SELECT count(*) FROM orders").fetchone()[0]
+        conn.execute("ANALYZE")
+    print(f"seed {n_orders} order untuk {n_customers} customer: {time.perf_counter() - start:.1f}s")
+    assert not store.seed([Order("ORD-0-0", "CUST-0", "Demo", today.isoformat(), "Delivered")])
+
+    customers = [f"CUST-{rng.randrange(n_customers)}" for _ in range(10_000)]
+
+    # pembanding: tanpa index (customer_id, purchase_date) -> scan + sort, cuma 20 query
+    with store.pool.connection() as conn:
+        start = time.perf_counter()
+        for customer in customers[:20]:
+            conn.execute(f"SELECT {_COLUMNS} FROM orders NOT INDEXED WHERE customer_id = ? "
+                         "ORDER BY purchase_date DESC LIMIT 1", (customer,)).fetchone()
+        scan = (time.perf_counter() - start) / 20
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT {_COLUMNS} FROM orders WHERE customer_id = ? "
+                            "ORDER BY purchase_date DESC LIMIT 1", ("CUST-1",)).fetchall()
+    print(f"  tanpa index: {scan * 1000:.1f}ms/query (10k query ~{scan * 10_000:.0f}s)")
+    print(f"  query plan: {plan[-1][-1]}")
+
+    for size in (1, 8):
+        store.pool = ConnectionPool(store.pool.path, size=size)
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            start = time.perf_counter()
+            orders = list(pool.map(store.latest_order, customers))
+        elapsed = time.perf_counter() - start
+        print(f"  10k query bersamaan (32 thread, pool {size} koneksi): {elapsed * 1000:.0f}ms "
+              f"({elapsed / len(customers) * 1e6:.0f}us/query)")
+
+    start = time.perf_counter()
+    batch = store.latest_orders(customers)
+    print(f"  latest_orders 10k customer (1 query): {(time.perf_counter() - start) * 1000:.0f}ms")
+    assert all(batch[order.customer_id] == order for order in orders)
+
+    dates = [order.purchase_date for order in orders] * 100
+    start = time.perf_counter()
+    loop = [0 <= (today - parse_purchase_date(value)).days <= REFUND_WINDOW_DAYS for value in dates]
+    looped = time.perf_counter() - start
+    start = time.perf_counter()
+    days, eligible = refund_eligibility(dates, today=today)
+    vectorized = time.perf_counter() - start
+    parsed = _numpy().asarray(dates, dtype="datetime64[D]")
+    start = time.perf_counter()
+    refund_eligibility(parsed, today=today)
+    preparsed = time.perf_counter() - start
+    print(f"  cek refund {len(dates)} tanggal: loop Python {looped * 1000:.0f}ms, numpy {vectorized * 1000:.0f}ms "
+          f"(sudah datetime64: {preparsed * 1000:.1f}ms), {int(eligible.sum())} eligible")
+    assert list(eligible) == loop
@@ -0,0 +1,148 @@
+"""
+Menjalankan node LangGraph yang CPU-bound di process pool.
+
+Semua node di langgraph_learn.py jalan di thread milik pemanggil. Node yang berat di CPU
+(parsing, scoring, hitung embedding) memegang GIL, jadi fan-out Send ke agent_a/agent_b
+tetap jalan bergantian walaupun LangGraph mengeksekusinya di beberapa thread.
+
+in_process(fn, reads=...) membungkus node supaya badannya dijalankan di process pool:
+- yang dikirim ke proses worker cuma key state yang dibaca node (reads), bukan seluruh
+  state (misal logs yang panjang tidak ikut di-pickle)
+- hasil node (dict update atau Command) dikirim balik apa adanya
+- pool dibuat sekali dan dipakai bersama semua node; warm_up() menyalakan worker-nya
+  lebih awal. Di Linux pool pakai fork, jadi panggil warm_up() sebelum graph jalan
+  (sebelum ada thread lain), dan fn harus fungsi top-level yang bisa di-pickle.
+
+Benchmark fan-out agent_a/agent_b dengan badan CPU-bound:
+    python process_nodes.py
+"""
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """Pool bersama untuk semua node in_process (dibuat saat pertama dipakai)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _pool
+
+
+def warm_up(max_workers: int | None = None) -> None:
+    """Nyalakan semua worker sekarang, bukan di tengah eksekusi graph."""
+    pool = get_process_pool(max_workers)
+    list(pool.map(_noop, range(pool._max_workers)))
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _noop(_):
+    return None
+
+
+def _project(state, reads):
+    if reads is None:
+        return state
+    if isinstance(state, dict):
+        return {key: state[key] for key in reads if key in state}
+    return {key: getattr(state, key) for key in reads if hasattr(state, key)}
+
+
+def in_process(fn=None, *, reads: tuple[str, ...] | None = None):
+    """Bungkus node supaya dijalankan di process pool. Bisa dipakai sebagai decorator:
+
+        builder.add_node("agent_b", in_process(agent_b, reads=("query",)))
+    """
+    if fn is None:
+        return functools.partial(in_process, reads=reads)
+    reads = tuple(reads) if reads is not None else None
+
+    @functools.wraps(fn)
+    def node(state):
+        return get_process_pool().submit(fn, _project(state, reads)).result()
+
+    node.__wrapped_process_fn__ = fn
+    return node
+
+
+# --- badan node CPU-bound untuk benchmark (top-level supaya bisa di-pickle) ---
+
+def score_documents(state):
+    """Simulasi scoring dokumen yang berat di CPU."""
+    seed = sum(map(ord, state["query"]))
+    total = 0
+    for i in range(3_000_000):
+        total = (total + (i * seed) % 7919) % 1_000_003
+    return {"logs": [f"{state['agent']} score={total}"]}
+
+
+if __name__ == "__main__":
+    import time
+    from typing import Annotated
+
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.types import Send
+    from typing_extensions import TypedDict
+
+    from log_channel import AppendLogChannel
+
+    class FanOutState(TypedDict):
+        query: str
+        agent: str
+        logs: Annotated[list[str], AppendLogChannel]
+
+    def build(agents: int, node_fn):
+        builder = StateGraph(FanOutState)
+        builder.add_node("router", lambda state: {})
+        builder.add_node("agent", node_fn)
+        builder.add_edge(START, "router")
+        builder.add_conditional_edges("router", lambda state: [
+            Send("agent", {"query": state["query"], "agent": f"agent_{i}", "logs": []})
+            for i in range(agents)
+        ])
+        builder.add_edge("agent", END)
+        return builder.compile()
+
+    import pickle
+
+    state = {"query": "analyze data", "agent": "agent_0", "logs": ["x" * 100] * 10_000}
+    print(f"payload ke worker: seluruh state {len(pickle.dumps(state)) / 1024:.0f} KiB, "
+          f"reads=('query', 'agent') {len(pickle.dumps(_project(state, ('query', 'agent'))))} byte")
+
+    warm_up()
+    # speedup dibatasi jumlah core: dengan 1 CPU kedua mode sama cepat
+    print(f"fan-out Send dengan badan CPU-bound, {os.cpu_count()} CPU")
+    for agents in (1, 2, 4):
+        timings = {}
+        for name, node_fn in (
+            ("thread", score_documents),
+            ("process", in_process(score_documents, reads=("query", "agent"))),
+        ):
+            graph = build(agents, node_fn)
+            # logs besar di state tidak ikut dikirim ke proses worker (reads)
+            start = time.perf_counter()
+            result = graph.invoke({"query": "analyze data", "logs": ["x" * 100] * 10_000})
+            timings[name] = time.perf_counter() - start
+            assert len(result["logs"]) == 10_000 + agents
+        print(f"  {agents} agent: thread {timings['thread']:.2f}s, process pool {timings['process']:.2f}s "
+              f"({timings['thread'] / timings['process']:.1f}x)")
+    shutdown()
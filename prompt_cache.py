@@ -0,0 +1,118 @@
+"""
+ChatPromptTemplate versi "frozen": prefix statis dirender sekali saja.
+
+few_shot_template di learn3_lanchain_prompt_focus.py punya system message + 3 pasang
+contoh human/ai yang gak pernah berubah, cuma {user_email} di akhir yang variabel.
+ChatPromptTemplate biasa tetap memformat ketujuh message itu setiap invoke.
+FrozenChatPrompt memformat bagian depan yang tidak punya variabel satu kali di awal,
+menyimpannya sebagai tuple message, dan tiap invoke cuma memformat ekornya.
+
+prefix_hash adalah hash stabil dari prefix tersebut. Selama prefix sama, request ke
+provider diawali token yang persis sama, jadi prompt caching di sisi provider bisa kena;
+hash ini bisa dipakai untuk ngecek/log bahwa prefix memang tidak berubah antar deploy.
+
+Microbenchmark format per call:
+    python prompt_cache.py
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompt_values import ChatPromptValue
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+
+
+def _is_static(message) -> bool:
+    if isinstance(message, BaseMessage):
+        return True
+    # MessagesPlaceholder juga punya input_variables (nama variabelnya), jadi otomatis ikut ekor
+    return not getattr(message, "input_variables", None)
+
+
+def prefix_hash(messages) -> str:
+    payload = [
+        {"type": m.type, "content": m.content, "name": m.name}
+        for m in messages
+    ]
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+class FrozenChatPrompt(Runnable[dict, ChatPromptValue]):
+    """Pengganti ChatPromptTemplate dengan prefix yang sudah dirender.
+
+    Message prefix dipakai bersama oleh semua hasil invoke, jadi jangan dimutasi.
+    """
+
+    def __init__(self, template: ChatPromptTemplate):
+        prefix = []
+        split = 0
+        for message in template.messages:
+            if not _is_static(message):
+                break
+            prefix.extend([message] if isinstance(message, BaseMessage) else message.format_messages())
+            split += 1
+        self.template = template
+        self.prefix = tuple(prefix)
+        self.prefix_hash = prefix_hash(self.prefix)
+        self._tail = tuple(template.messages[split:])
+        self._partial_variables = dict(template.partial_variables)
+
+    @property
+    def input_variables(self) -> list[str]:
+        return self.template.input_variables
+
+    def format_messages(self, **kwargs) -> list[BaseMessage]:
+        if self._partial_variables:
+            kwargs = {**self._partial_variables, **kwargs}
+        messages = list(self.prefix)
+        for message in self._tail:
+            if isinstance(message, BaseMessage):
+                messages.append(message)
+            else:
+                messages.extend(message.format_messages(**kwargs))
+        return messages
+
+    def _format(self, input: dict) -> ChatPromptValue:
+        return ChatPromptValue(messages=self.format_messages(**input))
+
+    def invoke(self, input: dict, config=None, **kwargs) -> ChatPromptValue:
+        return self._call_with_config(self._format, input, config, run_type="prompt")
+
+    async def ainvoke(self, input: dict, config=None, **kwargs) -> ChatPromptValue:
+        # murni CPU dan cepat, gak perlu dilempar ke thread pool
+        return self.invoke(input, config, **kwargs)
+
+
+def freeze_chat_prompt(template: ChatPromptTemplate) -> FrozenChatPrompt:
+    return FrozenChatPrompt(template)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    template = ChatPromptTemplate.from_messages([
+        ("system", "You classify customer emails into a category and priority level."),
+        ("human", "My dashboard went blank after the update."),
+        ("ai", "Category: Technical Bug\nPriority: Level 1\nReason: Workflow blocker."),
+        ("human", "Where do I update billing information?"),
+        ("ai", "Category: Account Management\nPriority: Level 2\nReason: Standard request."),
+        ("human", "Please set my primary email address."),
+        ("ai", "Category: Account Management\nPriority: Level 3\nReason: Routine request."),
+        ("human", "{user_email}"),
+    ])
+    frozen = freeze_chat_prompt(template)
+    data = {"user_email": "My invoice from last month is incorrect."}
+    assert frozen.invoke(data).to_messages() == template.invoke(data).to_messages()
+
+    n = 5_000
+    for name, prompt in (("ChatPromptTemplate", template), ("FrozenChatPrompt", frozen)):
+        per_call = timeit.timeit(lambda: prompt.invoke(data), number=n) / n
+        print(f"{name:18s} invoke: {per_call * 1e6:.1f}us/call")
+        per_call = timeit.timeit(lambda: prompt.format_messages(**data), number=n) / n
+        print(f"{name:18s} format_messages: {per_call * 1e6:.1f}us/call")
+    print("prefix_hash:", frozen.prefix_hash)
@@ -0,0 +1,407 @@
+"""
+Evaluator ekspresi aritmatika untuk tool calc (pengganti eval).
+
+calc() di learn2_langchain.py dulu langsung eval(expression) dari string buatan model:
+berbahaya (bisa jalanin kode apa saja) dan lambat kalau dipanggil ribuan kali.
+
+Di sini ekspresi di-parse jadi AST, dicek terhadap whitelist (angka, + - * / // % **,
+fungsi math tertentu, konstanta pi/e), lalu di-compile jadi closure. Konstanta angka
+diangkat jadi parameter, jadi "10 * 200" dan "3 * 7" berbagi bentuk yang sama dan
+hasil compile-nya di-cache (LRU, jumlah bentuk dibatasi). Bentuk yang sama juga bisa dievaluasi sekaligus
+pakai NumPy (evaluate_many) kalau NumPy terpasang; jalur NumPy cuma dipakai untuk
+ekspresi yang hasilnya dijamin identik dengan jalur Python (angka float saja, operasi
+yang di IEEE 754 dibulatkan dengan benar), jadi 10**20 + 1 tetap integer eksak.
+NumPy baru di-import saat evaluate_many pertama kali memvektorisasi.
+
+Batas keras: panjang ekspresi, jumlah node AST, besar eksponen, digit round(), dan
+jumlah bit integer hasil, jadi tidak ada input yang bisa bikin evaluasi lama atau makan memori
+(misal 9**9**9).
+
+Benchmark:
+    python safe_calc.py
+"""
+from __future__ import annotations
+
+import ast
+import math
+import operator
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache, reduce
+
+MAX_EXPRESSION_LENGTH = 500
+MAX_NODES = 200
+MAX_EXPONENT = 1000
+MAX_ROUND_DIGITS = 100
+MAX_INT_BITS = 4096
+VECTORIZE_MIN_GROUP = 8
+
+
+class CalcError(ValueError):
+    pass
+
+
+def _check_int(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalcError(f"result exceeds {MAX_INT_BITS} bits")
+    return value
+
+
+def _pow(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalcError(f"exponent {exponent} exceeds limit {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if base.bit_length() * exponent > MAX_INT_BITS:
+            raise CalcError(f"result exceeds {MAX_INT_BITS} bits")
+    return base ** exponent
+
+
+def _mul(left, right):
+    return _check_int(left * right)
+
+
+def _round(number, ndigits=None):
+    # round(1, -30000000) jalan bermenit-menit: ndigits dibatasi seperti eksponen di _pow
+    if ndigits is not None and abs(ndigits) > MAX_ROUND_DIGITS:
+        raise CalcError(f"round digits {ndigits} exceed limit {MAX_ROUND_DIGITS}")
+    return round(number, ndigits)
+
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+# operasi yang hasil float64-nya sama persis di Python dan NumPy (pembulatan IEEE 754 yang
+# benar); pow/log/exp/sin dsb. bisa beda 1 ulp antar implementasi libm, round/floor/ceil
+# mengembalikan int di Python
+_EXACT_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_EXACT_FUNCTIONS = {"sqrt", "abs", "min", "max"}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_CONSTANTS = {"pi": math.pi, "e": math.e}
+_FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "log": math.log,
+    "log10": math.log10,
+    "exp": math.exp,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "abs": abs,
+    "round": _round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "min": min,
+    "max": max,
+}
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:  # evaluate_many tetap jalan, cuma tanpa vektorisasi
+        return None
+    return np
+
+
+@lru_cache(maxsize=1)
+def _numpy_ops():
+    """(operator biner, fungsi) versi NumPy; dibangun saat pertama kali vektorisasi."""
+    np = _numpy()
+
+    def np_pow(base, exponent):
+        if np.any(np.abs(exponent) > MAX_EXPONENT):
+            raise CalcError(f"exponent exceeds limit {MAX_EXPONENT}")
+        return np.power(base, exponent)
+
+    def np_round(values, ndigits=0):
+        if np.any(np.abs(ndigits) > MAX_ROUND_DIGITS):
+            raise CalcError(f"round digits exceed limit {MAX_ROUND_DIGITS}")
+        return np.round(values, ndigits)
+
+    functions = {
+        "sqrt": np.sqrt,
+        "log": np.log,
+        "log10": np.log10,
+        "exp": np.exp,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "abs": np.abs,
+        "round": np_round,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "min": lambda *args: reduce(np.minimum, args),
+        "max": lambda *args: reduce(np.maximum, args),
+    }
+    return {**_BIN_OPS, ast.Mult: operator.mul, ast.Pow: np_pow}, functions
+
+
+class _Lift(ast.NodeTransformer):
+    """Validasi AST dan ganti tiap konstanta angka dengan parameter __p{i}."""
+
+    def __init__(self):
+        self.params = []
+        self.nodes = 0
+
+    def visit(self, node):
+        if isinstance(node, (ast.operator, ast.unaryop, ast.expr_context)):
+            return node  # operator sudah dicek di visit_BinOp/visit_UnaryOp
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise CalcError(f"expression has more than {MAX_NODES} nodes")
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        if method is None:
+            raise CalcError(f"unsupported syntax: {type(node).__name__}")
+        return method(node)
+
+    def visit_Expression(self, node):
+        return self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        self.generic_visit(node)
+        if type(node.value) not in (int, float):
+            raise CalcError(f"unsupported constant: {node.value!r}")
+        self.params.append(node.value)
+        return ast.Name(id=f"__p{len(self.params) - 1}", ctx=ast.Load())
+
+    def visit_Name(self, node):
+        self.generic_visit(node)
+        if node.id not in _CONSTANTS:
+            raise CalcError(f"unknown name: {node.id}")
+        return node
+
+    def visit_BinOp(self, node):
+        if type(node.op) not in _BIN_OPS:
+            raise CalcError(f"unsupported operator: {type(node.op).__name__}")
+        return self.generic_visit(node)
+
+    def visit_UnaryOp(self, node):
+        if type(node.op) not in _UNARY_OPS:
+            raise CalcError(f"unsupported operator: {type(node.op).__name__}")
+        return self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise CalcError("only calls to " + ", ".join(sorted(_FUNCTIONS)) + " are allowed")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def _build(node, bin_ops):
+    """Compile AST (yang sudah divalidasi) jadi closure fn(params, functions)."""
+    if isinstance(node, ast.Expression):
+        return _build(node.body, bin_ops)
+    if isinstance(node, ast.Name):
+        if node.id.startswith("__p"):
+            index = int(node.id[3:])
+            return lambda params, functions: params[index]
+        value = _CONSTANTS[node.id]
+        return lambda params, functions: value
+    if isinstance(node, ast.BinOp):
+        op = bin_ops[type(node.op)]
+        left = _build(node.left, bin_ops)
+        right = _build(node.right, bin_ops)
+        return lambda params, functions: op(left(params, functions), right(params, functions))
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPS[type(node.op)]
+        operand = _build(node.operand, bin_ops)
+        return lambda params, functions: op(operand(params, functions))
+    name = node.func.id
+    args = [_build(arg, bin_ops) for arg in node.args]
+    return lambda params, functions: functions[name](*[arg(params, functions) for arg in args])
+
+
+class _Shape:
+    """Satu bentuk ekspresi: AST tervalidasi, closure Python, dan (lazy) versi NumPy-nya."""
+
+    __slots__ = ("tree", "fn", "_exact_numpy", "_numpy_fn")
+
+    def __init__(self, tree: ast.AST):
+        self.tree = tree
+        self.fn = _build(tree, _BIN_OPS)
+        self._exact_numpy: bool | None = None
+        self._numpy_fn = None
+
+    @property
+    def exact_numpy(self) -> bool:
+        """True kalau semua operasi di bentuk ini memberi hasil float64 yang sama di NumPy."""
+        if self._exact_numpy is None:
+            self._exact_numpy = all(
+                not isinstance(node, (ast.BinOp, ast.Call))
+                or (isinstance(node, ast.BinOp) and isinstance(node.op, _EXACT_BIN_OPS))
+                or (isinstance(node, ast.Call) and node.func.id in _EXACT_FUNCTIONS)
+                for node in ast.walk(self.tree)
+            )
+        return self._exact_numpy
+
+    @property
+    def numpy_fn(self):
+        if self._numpy_fn is None:
+            self._numpy_fn = _build(self.tree, _numpy_ops()[0])
+        return self._numpy_fn
+
+
+# ast.dump(tree) -> _Shape, LRU: model bisa mengirim bentuk baru terus-menerus
+_shapes: OrderedDict[str, _Shape] = OrderedDict()
+_shapes_lock = threading.Lock()
+_MAX_SHAPES = 4096
+# "12 * 3.5" -> "# * #": template yang sudah pernah lolos validasi gak perlu di-parse ulang
+_templates: dict[str, tuple] = {}
+_MAX_TEMPLATES = 4096
+_NUMBER = re.compile(r"(?<![\w.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?(?![\w.])")
+
+
+def _number(token: str):
+    return float(token) if any(c in token for c in ".eE") else int(token)
+
+
+@lru_cache(maxsize=16384)
+def parse(expression: str):
+    """Validasi & compile ekspresi. Return (_Shape, params, fn); hasil di-cache per string."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalcError(f"expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    tokens = _NUMBER.findall(expression)
+    template = " ".join(_NUMBER.sub("#", expression).split())
+    cached = _templates.get(template)
+    if cached is not None:
+        shape, fn = cached
+        return shape, tuple(_number(token) for token in tokens), fn
+
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise CalcError(f"invalid expression: {exc.msg}") from None
+    lift = _Lift()
+    tree = lift.visit(tree)
+    key = ast.dump(tree)
+    with _shapes_lock:
+        shape = _shapes.get(key)
+        if shape is None:
+            shape = _shapes[key] = _Shape(tree)
+            if len(_shapes) > _MAX_SHAPES:
+                _shapes.popitem(last=False)
+        else:
+            _shapes.move_to_end(key)
+    fn = shape.fn
+    params = tuple(lift.params)
+    # template cuma dipakai kalau angka hasil regex persis sama dengan konstanta di AST
+    # (literal aneh seperti 0x10 atau 1_000 selalu lewat jalur AST)
+    if [(type(p), p) for p in params] == [(type(p), p) for p in map(_number, tokens)]:
+        if len(_templates) >= _MAX_TEMPLATES:
+            _templates.clear()
+        _templates[template] = (shape, fn)
+    return shape, params, fn
+
+
+def evaluate(expression: str):
+    """Hitung satu ekspresi. Error (syntax, batas, pembagian nol) di-raise."""
+    _, params, fn = parse(expression)
+    try:
+        return fn(params, _FUNCTIONS)
+    except OverflowError as exc:
+        raise CalcError(str(exc)) from None
+
+
+def _evaluate_one(fn, params):
+    try:
+        return fn(params, _FUNCTIONS)
+    except (ArithmeticError, ValueError, TypeError) as exc:
+        return exc if isinstance(exc, CalcError) else CalcError(str(exc))
+
+
+def _evaluate_group_numpy(np, shape: _Shape, items: list):
+    columns = [np.array(column, dtype=np.float64) for column in zip(*(params for _, params in items))]
+    with np.errstate(all="ignore"):
+        values = np.broadcast_to(shape.numpy_fn(columns, _numpy_ops()[1]), (len(items),))
+    # inf/nan (bagi nol, overflow, sqrt negatif): hitung ulang lewat jalur Python supaya
+    # hasil dan pesan error-nya sama dengan evaluate()
+    return [
+        value if math.isfinite(value) else _evaluate_one(shape.fn, params)
+        for value, (_, params) in zip(values.tolist(), items)
+    ]
+
+
+def evaluate_many(expressions, *, vectorize: bool = True) -> list:
+    """Hitung banyak ekspresi sekaligus.
+
+    Ekspresi dengan bentuk yang sama (beda angka saja) dievaluasi sekali lewat NumPy
+    dalam float64, kalau semua angkanya float dan operasinya eksak di float64 (hasilnya
+    sama persis dengan evaluate()); sisanya dihitung per item. Hasil gagal dikembalikan
+    sebagai objek exception di posisinya, bukan di-raise, supaya satu ekspresi rusak gak
+    menggagalkan yang lain.
+    """
+    results: list = [None] * len(expressions)
+    groups: dict[_Shape, list] = {}
+    for position, expression in enumerate(expressions):
+        try:
+            shape, params, _ = parse(expression)
+        except CalcError as exc:
+            results[position] = exc
+            continue
+        groups.setdefault(shape, []).append((position, params))
+
+    np = _numpy() if vectorize and any(len(items) >= VECTORIZE_MIN_GROUP for items in groups.values()) else None
+    for shape, items in groups.items():
+        if np is not None and len(items) >= VECTORIZE_MIN_GROUP and shape.exact_numpy:
+            # integer (bisa lebih dari 2**53) tetap lewat jalur Python supaya eksak
+            floats = [item for item in items if all(type(p) is float for p in item[1])]
+            if len(floats) >= VECTORIZE_MIN_GROUP:
+                try:
+                    for (position, _), value in zip(floats, _evaluate_group_numpy(np, shape, floats)):
+                        results[position] = value
+                    items = [item for item in items if not all(type(p) is float for p in item[1])]
+                except Exception:
+                    pass  # apa pun yang gagal di NumPy: jatuh ke jalur per item
+        for position, params in items:
+            results[position] = _evaluate_one(shape.fn, params)
+    return results
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    expressions = [
+        f"{random.uniform(1, 999):.2f} * {random.uniform(1, 999):.2f} + {random.uniform(1, 99):.2f} / "
+        f"{random.randint(1, 9)}.0"
+        for _ in range(10_000)
+    ]
+
+    start = time.perf_counter()
+    expected = [eval(expression) for expression in expressions]
+    eval_time = time.perf_counter() - start
+
+    parse.cache_clear()
+    start = time.perf_counter()
+    cold = [evaluate(expression) for expression in expressions]
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm = [evaluate(expression) for expression in expressions]
+    warm_time = time.perf_counter() - start
+
+    parse.cache_clear()
+    _numpy_ops()  # import NumPy sekali di luar pengukuran
+    start = time.perf_counter()
+    vectorized = evaluate_many(expressions)
+    many_time = time.perf_counter() - start
+
+    assert cold == expected and warm == expected and vectorized == expected
+    integers = [f"10**20 + {i}" for i in range(100)]
+    assert evaluate_many(integers) == [10**20 + i for i in range(100)]
+    print(f"{len(expressions)} expressions")
+    print(f"  eval()                    {eval_time * 1000:.1f}ms")
+    print(f"  evaluate() parse+compile  {cold_time * 1000:.1f}ms")
+    print(f"  evaluate() cached         {warm_time * 1000:.1f}ms")
+    print(f"  evaluate_many() numpy={_numpy() is not None}  {many_time * 1000:.1f}ms")
+    for hostile in ("9**9**9", "__import__('os')", "(1).__class__", "2**10000", "round(1, -30000000)"):
+        try:
+            evaluate(hostile)
+        except CalcError as exc:
+            print(f"  rejected {hostile!r}: {exc}")
@@ -0,0 +1,385 @@
+"""
+Full-text search lokal untuk tool search_database (learn2_langchain.py).
+
+Sebelumnya search_database cuma mengembalikan string "Found N results". Sekarang record
+customer/transaksi disimpan di SQLite dan dicari lewat index FTS5 (inverted index di
+disk):
+
+- records: tabel sumber (id, kind, title, body, length). records_fts: index FTS5
+  external-content di atas records, di-update trigger -> upsert()/delete() langsung
+  kelihatan di pencarian, tidak perlu rebuild index. corpus_stats (jumlah dokumen dan
+  token, untuk rata-rata panjang dokumen BM25) juga di-update trigger
+- query user di-tokenize dan di-quote per kata, jadi karakter sintaks FTS5 di input LLM
+  tidak bikin error. Semua kata harus cocok (AND); kalau tidak ada hasil, kata yang tidak
+  ada di index lalu kata yang paling umum dibuang satu per satu. Query OR tidak dipakai:
+  di 1M record OR dengan satu kata umum berarti meranking ratusan ribu dokumen
+- rank_window=None (eksak): ranking BM25 (title diberi bobot lebih) atas SEMUA dokumen
+  yang cocok lewat bm25() bawaan FTS5, top-k di SQL (ORDER BY ... LIMIT). Biayanya naik
+  dengan jumlah dokumen yang cocok: menghitung hasil AND saja sudah ~8ms untuk query sedang
+  dan ~25ms untuk query umum di 1M record, bm25() masih membaca seluruh doclist tiap kata
+  untuk idf (~20ms query sedang, 100-190ms kalau ada kata di ratusan ribu record)
+- rank_window=N (perkiraan, default from_env() dan search_database): yang diranking cuma N
+  dokumen cocok terbaru (rowid terbesar, scan doclist berhenti di situ) dengan BM25 di
+  Python dan jumlah dokumen per kata yang di-cache dari fts5vocab (boleh agak basi,
+  optimize() mengisi cache). Latency stabil (<6ms di 1M record) dan tidak bergantung pada
+  jumlah hasil, tapi dokumen lama yang lebih relevan bisa tidak muncul dan hasil berhenti di
+  N. Kandidatnya sama untuk semua halaman, jadi pagination tetap konsisten
+- pagination: search(query, limit, offset) -> SearchPage dengan next_offset; urutan
+  deterministik (skor, lalu id terbesar), jadi halaman tidak saling tumpang tindih
+
+    index = SearchIndex.from_env(seed=[...])  # rank_window dari SEARCH_RANK_WINDOW (default 500)
+    page = index.search("riwayat transaksi rizky", limit=5)
+
+Benchmark 1M record:
+    python search_index.py
+"""
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+from os import getenv
+
+from ttl_cache import TTLCache
+
+# sama dengan tokenizer unicode61: huruf/angka saja, underscore juga pemisah
+_TERMS = re.compile(r"[^\W_]+")
+# bobot kolom: (title, body); parameter BM25 sama dengan default bm25() FTS5
+_WEIGHTS = (4.0, 1.0)
+_K1 = 1.2
+_B = 0.75
+DEFAULT_RANK_WINDOW = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS corpus_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    docs INTEGER NOT NULL,
+    tokens INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO corpus_stats VALUES (0, 0, 0);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    title, body, content='records', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_vocab USING fts5vocab(records_fts, 'row');
+CREATE TRIGGER IF NOT EXISTS records_ai AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    UPDATE corpus_stats SET docs = docs + 1, tokens = tokens + new.length;
+END;
+CREATE TRIGGER IF NOT EXISTS records_ad AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    UPDATE corpus_stats SET docs = docs - 1, tokens = tokens - old.length;
+END;
+CREATE TRIGGER IF NOT EXISTS records_au AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO records_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    UPDATE corpus_stats SET tokens = tokens - old.length + new.length;
+END;
+"""
+
+
+@dataclass(frozen=True)
+class Record:
+    id: int
+    kind: str   # "customer" / "transaction"
+    title: str
+    body: str
+
+
+@dataclass(frozen=True)
+class Hit:
+    record: Record
+    score: float  # BM25, makin besar makin relevan
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    query: str
+    hits: list[Hit]
+    offset: int
+    next_offset: int | None  # None kalau sudah halaman terakhir
+
+    def format(self) -> str:
+        if not self.hits:
+            return f"No results for '{self.query}'"
+        lines = [f"Found {len(self.hits)} results for '{self.query}' (offset {self.offset}):"]
+        for hit in self.hits:
+            lines.append(f"- [{hit.record.kind} #{hit.record.id}] {hit.record.title}: {hit.record.body}")
+        if self.next_offset is not None:
+            lines.append(f"More results available (offset={self.next_offset}).")
+        return "\n".join(lines)
+
+
+def _fold(text: str) -> str:
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return text
+
+
+def tokenize(text: str) -> list[str]:
+    """Token seperti tokenizer index: lowercase, tanpa diakritik, huruf/angka saja."""
+    return _TERMS.findall(_fold(text))
+
+
+def _term_pattern(terms: Iterable[str]) -> re.Pattern:
+    # cuma token yang sama dengan salah satu kata query (batas token sama dengan _TERMS)
+    alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<![^\W_])(?:{alternatives})(?![^\W_])")
+
+
+def match_expression(terms: Iterable[str]) -> str:
+    """Kata -> ekspresi MATCH FTS5 yang aman (tiap kata di-quote, digabung AND)."""
+    return " AND ".join(f'"{term}"' for term in terms)
+
+
+def _idf(docs: int, df: int) -> float:
+    # rumus idf bm25() FTS5: kata yang ada di lebih dari separuh dokumen dapat bobot minimal
+    return max(math.log((docs - df + 0.5) / (df + 0.5)), 1e-6)
+
+
+class SearchIndex:
+    """Tabel records + index FTS5; aman dipakai dari banyak thread (koneksi per thread)."""
+
+    def __init__(self, path: str = ":memory:", *, rank_window: int | None = None):
+        """rank_window=None: ranking BM25 eksak atas semua hasil; N: cuma N hasil terbaru (perkiraan)."""
+        self.rank_window = rank_window
+        if path == ":memory:":
+            # shared cache supaya semua koneksi thread melihat database memory yang sama
+            path = f"file:search-{id(self)}?mode=memory&cache=shared"
+        self.path = path
+        self._local = threading.local()
+        # koneksi pertama dipegang terus: database memory hilang kalau semua koneksi ditutup
+        self._keepalive = self._connect()
+        self._keepalive.executescript(_SCHEMA)
+        # jumlah dokumen per kata (idf dan urutan kata yang dibuang); menghitungnya lewat
+        # fts5vocab berarti membaca seluruh doclist, jadi di-cache
+        self._doc_counts = TTLCache(maxsize=500_000, ttl=3_600)
+
+    @classmethod
+    def from_env(cls, seed: Iterable[Record] | None = None) -> SearchIndex:
+        """Index di SEARCH_DB_PATH (default in-memory), record awal cuma diisi ke index kosong.
+
+        Untuk tool agent latency lebih penting dari ranking eksak: rank_window dari
+        SEARCH_RANK_WINDOW (default DEFAULT_RANK_WINDOW, "0" = ranking eksak).
+        """
+        window = int(getenv("SEARCH_RANK_WINDOW", str(DEFAULT_RANK_WINDOW)))
+        index = cls(getenv("SEARCH_DB_PATH", ":memory:"), rank_window=window or None)
+        if seed:
+            index.seed(seed)
+        return index
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, uri=self.path.startswith("file:"), check_same_thread=False, timeout=30)
+        if not self.path.startswith("file:"):
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def upsert(self, records: Iterable[Record]) -> None:
+        """Tambah/ganti record; index FTS dan corpus_stats ikut ter-update lewat trigger."""
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO records (id, kind, title, body, length) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET kind = excluded.kind, title = excluded.title, "
+                "body = excluded.body, length = excluded.length",
+                ((r.id, r.kind, r.title, r.body, len(tokenize(r.title)) + len(tokenize(r.body))) for r in records),
+            )
+
+    def seed(self, records: Iterable[Record]) -> bool:
+        """Isi index hanya kalau masih kosong; record yang sudah ada tidak ditimpa. True kalau diisi."""
+        conn = self._conn()
+        with conn:
+            # BEGIN IMMEDIATE: cek kosong + insert atomik, proses lain yang seed bersamaan menunggu
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM records)").fetchone()[0]:
+                return False
+            conn.executemany(
+                "INSERT INTO records (id, kind, title, body, length) VALUES (?, ?, ?, ?, ?)",
+                ((r.id, r.kind, r.title, r.body, len(tokenize(r.title)) + len(tokenize(r.body))) for r in records),
+            )
+        return True
+
+    def delete(self, ids: Iterable[int]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.executemany("DELETE FROM records WHERE id = ?", ((i,) for i in ids))
+
+    def optimize(self) -> None:
+        """Setelah bulk load: gabungkan segmen index dan isi cache jumlah dokumen per kata."""
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT INTO records_fts(records_fts) VALUES ('optimize')")
+        self._doc_counts.clear()
+        for term, docs in conn.execute("SELECT term, doc FROM records_vocab"):
+            self._doc_counts.set(term, docs)
+
+    def _fetch_doc_counts(self, terms: list[str]) -> dict[str, int]:
+        conn = self._conn()
+        counts = {}
+        for term in terms:
+            row = conn.execute("SELECT doc FROM records_vocab WHERE term = ?", (term,)).fetchone()
+            counts[term] = row[0] if row else 0
+        return counts
+
+    def _has_match(self, expression: str) -> bool:
+        return self._conn().execute(
+            "SELECT 1 FROM records_fts WHERE records_fts MATCH ? LIMIT 1", (expression,)
+        ).fetchone() is not None
+
+    def _plan(self, terms: list[str]) -> list[str]:
+        """Kata yang dipakai untuk AND: semua kalau ada yang cocok, kalau tidak dikurangi."""
+        if not terms or self._has_match(match_expression(terms)):
+            return terms
+        counts = self._doc_counts.get_many_or_load(terms, self._fetch_doc_counts)
+        # kata yang tidak ada di index tidak mungkin cocok dengan AND
+        terms = [term for term in terms if counts[term]]
+        # kata paling umum dibuang duluan; urutan stabil supaya halaman berikutnya konsisten
+        terms.sort(key=lambda term: counts[term])
+        while terms and not self._has_match(match_expression(terms)):
+            terms.pop()
+        return terms
+
+    def _rank(self, terms: list[str], offset: int, count: int) -> list[Hit]:
+        """Hit ke offset .. offset + count dalam urutan BM25 (skor, lalu id terbesar)."""
+        if self.rank_window is None:
+            rows = self._conn().execute(
+                "SELECT r.id, r.kind, r.title, r.body, -f.score FROM ("
+                f"  SELECT rowid, bm25(records_fts, {_WEIGHTS[0]}, {_WEIGHTS[1]}) AS score FROM records_fts"
+                "   WHERE records_fts MATCH ? ORDER BY score, rowid DESC LIMIT ? OFFSET ?"
+                ") AS f JOIN records AS r ON r.id = f.rowid ORDER BY f.score, r.id DESC",
+                (match_expression(terms), count, offset),
+            ).fetchall()
+            return [Hit(Record(*row[:4]), row[4]) for row in rows]
+        return self._rank_window(terms, self.rank_window, offset, count)
+
+    def _rank_window(self, terms: list[str], window: int, offset: int, count: int) -> list[Hit]:
+        conn = self._conn()
+        # window dokumen cocok terbaru: FTS5 membaca doclist dari rowid terbesar dan berhenti.
+        # Ukurannya tetap (tidak bergantung offset), jadi semua halaman meranking kandidat yang sama
+        rows = conn.execute(
+            "SELECT id, kind, title, body, length FROM records WHERE id IN ("
+            "  SELECT rowid FROM records_fts WHERE records_fts MATCH ? ORDER BY rowid DESC LIMIT ?)",
+            (match_expression(terms), window),
+        ).fetchall()
+        docs, tokens = conn.execute("SELECT docs, tokens FROM corpus_stats").fetchone()
+        avg_length = tokens / docs if docs else 1.0
+        counts = self._doc_counts.get_many_or_load(terms, self._fetch_doc_counts)
+        idf = {term: _idf(docs, counts[term]) for term in terms}
+        title_weight, body_weight = _WEIGHTS
+        pattern = _term_pattern(terms)
+
+        scored = []
+        for row in rows:
+            title, body = pattern.findall(_fold(row[2])), pattern.findall(_fold(row[3]))
+            norm = _K1 * (1 - _B + _B * row[4] / avg_length)
+            total = 0.0
+            for term in terms:
+                f = title_weight * title.count(term) + body_weight * body.count(term)
+                total += idf[term] * f * (_K1 + 1) / (f + norm)
+            scored.append((total, row[0], row))
+        # id lebih besar (lebih baru) menang kalau skornya sama; Hit dibuat untuk halaman ini saja
+        scored.sort(key=lambda item: item[:2], reverse=True)
+        return [Hit(Record(*row[:4]), score) for score, _, row in scored[offset:offset + count]]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> SearchPage:
+        limit = max(1, limit)
+        offset = max(0, offset)
+        terms = self._plan(list(dict.fromkeys(tokenize(query))))
+        # limit + 1 hasil: hasil ekstra cuma untuk tahu masih ada halaman berikutnya
+        hits = self._rank(terms, offset, limit + 1) if terms else []
+        more = len(hits) > limit
+        return SearchPage(query, hits[:limit], offset, offset + limit if more else None)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    first = ["Rizky", "Alice", "Bob", "Siti", "Budi", "Dewi", "Agus", "Rina", "Joko", "Maya", "Andi", "Putri"]
+    last = ["Sulaeman", "Johnson", "Smith", "Wijaya", "Santoso", "Halim", "Pratama", "Lestari", "Nugroho"]
+    cities = ["Jakarta", "Bandung", "Surabaya", "Medan", "Semarang", "Makassar", "Denpasar", "Yogyakarta"]
+    kinds = ["transfer", "pembayaran", "refund", "top up", "penarikan", "pembelian"]
+    merchants = ["Tokopedia", "Shopee", "PLN", "Telkomsel", "Indomaret", "Alfamart", "Grab", "Gojek", "BCA"]
+    rng = random.Random(0)
+    n_customers = 50_000
+    n_records = 1_000_000
+
+    def generate():
+        for i in range(n_customers):
+            name = f"{rng.choice(first)} {rng.choice(last)} {i}"
+            yield Record(i, "customer", name, f"Customer {name}, {rng.choice(cities)}, "
+                                              f"{rng.choice(['Premium', 'Standard'])} account")
+        for i in range(n_customers, n_records):
+            customer = rng.randrange(n_customers)
+            yield Record(i, "transaction", f"Riwayat Transaksi {rng.choice(kinds)} {rng.choice(merchants)}",
+                         f"customer {customer} {rng.choice(first)} {rng.choice(last)} "
+                         f"Rp{rng.randrange(10, 5_000) * 1_000} {rng.choice(cities)} "
+                         f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}")
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.upsert(generate())
+    index.optimize()
+    print(f"index {n_records} record: {time.perf_counter() - start:.1f}s")
+
+    def timed(fn, runs=20):
+        fn()  # warm-up page cache
+        start = time.perf_counter()
+        for _ in range(runs):
+            result = fn()
+        return (time.perf_counter() - start) / runs * 1000, result
+
+    windowed = SearchIndex(index.path, rank_window=DEFAULT_RANK_WINDOW)  # database yang sama, mode perkiraan
+    windowed._doc_counts = index._doc_counts
+    queries = {
+        "langka (1 customer)": "Rizky Sulaeman 12345",
+        "sedang": "refund Tokopedia Bandung",
+        "umum (~80k hasil)": "Riwayat Transaksi Rizky",
+        "sebagian kata tidak ada": "Rizky Tokyo",
+    }
+    for label, query in queries.items():
+        for name, searcher in (("eksak", index), (f"rank_window={DEFAULT_RANK_WINDOW}", windowed)):
+            for limit, offset in ((10, 0), (10, 50)):
+                elapsed, page = timed(lambda: searcher.search(query, limit, offset))
+                print(f"  {label if (name, offset) == ('eksak', 0) else '':24s} {name:15s} limit={limit:2d} "
+                      f"offset={offset:2d}: {elapsed:6.2f}ms, {len(page.hits)} hit, next_offset={page.next_offset}")
+
+    # halaman-halaman berurutan sama dengan satu halaman besar (tidak ada id dobel/terlewat)
+    for searcher in (index, windowed):
+        pages = [searcher.search("refund Tokopedia Bandung", 10, offset).hits for offset in range(0, 50, 10)]
+        assert [hit.record.id for page in pages for hit in page] == \
+            [hit.record.id for hit in searcher.search("refund Tokopedia Bandung", 50).hits]
+
+    # dokumen lama yang paling relevan tetap di urutan pertama (mode eksak)
+    small = SearchIndex()
+    assert small.seed([Record(1, "transaction", "Refund Tokopedia", "refund Tokopedia customer 7")])
+    assert not small.seed([Record(1, "customer", "Demo", "data contoh")])  # index berisi tidak ditimpa
+    small.upsert(Record(i, "transaction", f"Riwayat Transaksi {i}", "refund customer 7")
+                 for i in range(2, 1_002))
+    assert small.search("refund", limit=3).hits[0].record.id == 1
+
+    # update incremental: langsung bisa dicari tanpa rebuild
+    start = time.perf_counter()
+    index.upsert([Record(n_records, "transaction", "Riwayat Transaksi refund Zalora", "customer 7 Rizky Sulaeman")])
+    found = index.search("zalora")
+    print(f"upsert 1 record + search: {(time.perf_counter() - start) * 1000:.2f}ms, {len(found.hits)} hit")
+    assert found.hits[0].record.id == n_records
+    index.delete([n_records])
+    assert not index.search("zalora").hits
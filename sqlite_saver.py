@@ -0,0 +1,617 @@
+"""
+Checkpointer LangGraph berbasis SQLite yang menyimpan delta per step.
+
+Graph multi-agent di langgraph_learn.py di-compile dengan InMemorySaver: tiap step
+menyimpan salinan penuh setiap channel yang berubah (logs yang makin panjang ikut
+di-serialize ulang seluruhnya) dan semuanya hilang begitu proses selesai.
+
+DeltaSqliteSaver:
+- persist ke satu file SQLite (WAL), jadi thread bisa dilanjutkan setelah restart
+- channel bernilai list (logs, messages) yang cuma bertambah di ujung disimpan sebagai
+  delta: hanya ekor baru + versi dasar. Tiap keyframe_interval delta ditulis satu blob
+  penuh supaya rantai yang harus dibaca tetap pendek (dibaca dengan satu recursive query)
+- pending writes dari semua task dalam satu superstep ditampung dulu lalu ditulis dalam
+  satu transaksi bersama checkpoint berikutnya (batch_writes=False untuk tulis langsung;
+  trade-off: kalau proses mati di tengah superstep, task di superstep itu diulang).
+  Write error/interrupt (__error__, __interrupt__, ...) langsung di-flush bersama yang
+  sudah ditampung, karena setelah itu run berhenti tanpa checkpoint berikutnya; resume
+  tetap melihat task yang sudah sukses dan tidak mengulangnya
+- compact(keep_last) membuang checkpoint lama per thread; delta yang basisnya ikut
+  terbuang di-materialize jadi blob penuh dulu
+- .stats: jumlah blob penuh/delta dan byte yang ditulis, untuk mengukur write amplification
+
+Path default dari env CHECKPOINT_DB_PATH (lihat from_env).
+
+Benchmark vs InMemorySaver:
+    python sqlite_saver.py
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from os import getenv
+from os.path import abspath
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+DEFAULT_DB_PATH = ".langgraph_checkpoints.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,  -- 'full' | 'delta' | 'empty'
+    base_version TEXT,
+    type TEXT,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+_CHAIN_QUERY = """
+WITH RECURSIVE chain(kind, base_version, type, blob, depth) AS (
+    SELECT kind, base_version, type, blob, 0 FROM blobs
+    WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?
+    UNION ALL
+    SELECT b.kind, b.base_version, b.type, b.blob, c.depth + 1
+    FROM blobs b JOIN chain c ON c.kind = 'delta' AND b.version = c.base_version
+    WHERE b.thread_id = ? AND b.checkpoint_ns = ? AND b.channel = ?
+)
+SELECT kind, type, blob FROM chain ORDER BY depth DESC
+"""
+
+
+@dataclass
+class SaverStats:
+    checkpoints: int = 0
+    full_blobs: int = 0
+    delta_blobs: int = 0
+    writes: int = 0
+    transactions: int = 0
+    bytes_written: int = 0
+
+
+class DeltaSqliteSaver(BaseCheckpointSaver[str]):
+    """Checkpointer SQLite dengan delta untuk channel list yang append-only."""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        keyframe_interval: int = 32,
+        batch_writes: bool = True,
+        max_cached_channels: int = 1024,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.batch_writes = batch_writes
+        self.max_cached_channels = max_cached_channels
+        self.stats = SaverStats()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending_writes: list[tuple[bool, tuple]] = []
+        # (thread_id, ns, channel) -> (version, value, panjang rantai delta)
+        self._last: OrderedDict[tuple[str, str, str], tuple[str, list, int]] = OrderedDict()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> DeltaSqliteSaver:
+        return cls(getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH), **kwargs)
+
+    @property
+    def graph_cache_key(self) -> tuple | None:
+        """Setelan saver untuk graph_cache: saver ke file yang sama dianggap checkpointer yang sama.
+
+        None untuk database in-memory/temporary (tiap saver punya database sendiri).
+        """
+        if self.path in ("", ":memory:") or self.path.startswith("file:"):
+            return None
+        return (abspath(self.path), self.keyframe_interval, self.batch_writes,
+                self.max_cached_channels, type(self.serde).__qualname__)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def __enter__(self) -> DeltaSqliteSaver:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # --- encoding blob ---
+
+    def _remember(self, key, version: str, value: list, depth: int) -> None:
+        # simpan salinan: reducer di luar sana boleh saja memutasi list aslinya
+        self._last[key] = (version, list(value), depth)
+        self._last.move_to_end(key)
+        while len(self._last) > self.max_cached_channels:
+            self._last.popitem(last=False)
+
+    def _encode_blob(self, thread_id: str, ns: str, channel: str, version: str, value: Any) -> tuple:
+        key = (thread_id, ns, channel)
+        prev = self._last.get(key)
+        if not isinstance(value, list):
+            self._last.pop(key, None)
+            type_, blob = self.serde.dumps_typed(value)
+            return (thread_id, ns, channel, version, "full", None, type_, blob)
+
+        if prev is not None and prev[2] < self.keyframe_interval:
+            base_version, base, depth = prev
+            n = len(base)
+            if len(value) >= n and value[:n] == base:
+                type_, blob = self.serde.dumps_typed(value[n:])
+                self._remember(key, version, value, depth + 1)
+                return (thread_id, ns, channel, version, "delta", base_version, type_, blob)
+
+        type_, blob = self.serde.dumps_typed(value)
+        self._remember(key, version, value, 0)
+        return (thread_id, ns, channel, version, "full", None, type_, blob)
+
+    def _load_value(self, thread_id: str, ns: str, channel: str, version: str) -> tuple[bool, Any]:
+        rows = self._conn.execute(
+            _CHAIN_QUERY, (thread_id, ns, channel, version, thread_id, ns, channel)
+        ).fetchall()
+        if not rows or rows[0][0] == "empty":
+            return False, None
+        kind, type_, blob = rows[0]
+        if kind != "full":
+            raise ValueError(f"Broken delta chain for {channel!r} at version {version}")
+        value = self.serde.loads_typed((type_, blob))
+        if len(rows) > 1:
+            value = list(value)
+            for _, type_, blob in rows[1:]:
+                value.extend(self.serde.loads_typed((type_, blob)))
+        if isinstance(value, list):
+            self._remember((thread_id, ns, channel), version, value, len(rows) - 1)
+        return True, value
+
+    def _load_channel_values(self, thread_id: str, ns: str, versions: ChannelVersions) -> dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            found, value = self._load_value(thread_id, ns, channel, str(version))
+            if found:
+                values[channel] = value
+        return values
+
+    # --- write path ---
+
+    def flush(self) -> None:
+        """Tulis pending writes yang masih ditampung."""
+        with self._lock:
+            if not self._pending_writes:
+                return
+            self._conn.execute("BEGIN")
+            self._write_pending()
+            self._conn.execute("COMMIT")
+            self.stats.transactions += 1
+
+    def _write_pending(self) -> None:
+        pending, self._pending_writes = self._pending_writes, []
+        for replace, row in pending:
+            verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+            self._conn.execute(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+                "channel, type, blob, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        type_, payload = self.serde.dumps_typed(c)
+        metadata_type, metadata_payload = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            blob_rows = []
+            for channel, version in new_versions.items():
+                if channel in values:
+                    blob_rows.append(self._encode_blob(thread_id, ns, channel, str(version), values[channel]))
+                else:
+                    blob_rows.append((thread_id, ns, channel, str(version), "empty", None, None, None))
+
+            self._conn.execute("BEGIN")
+            try:
+                self._write_pending()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, "
+                    "kind, base_version, type, blob) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    blob_rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                    "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     type_, payload, metadata_type, metadata_payload),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._last.clear()  # cache bisa menunjuk versi yang batal ditulis
+                raise
+
+            self.stats.transactions += 1
+            self.stats.checkpoints += 1
+            self.stats.bytes_written += len(payload) + len(metadata_payload)
+            for row in blob_rows:
+                if row[4] == "delta":
+                    self.stats.delta_blobs += 1
+                elif row[4] == "full":
+                    self.stats.full_blobs += 1
+                self.stats.bytes_written += len(row[7] or b"")
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((replace, (thread_id, ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                                   channel, type_, blob, task_path)))
+        with self._lock:
+            self._pending_writes.extend(rows)
+            self.stats.writes += len(rows)
+            self.stats.bytes_written += sum(len(row[7]) for _, row in rows)
+            if not self.batch_writes or any(channel in WRITES_IDX_MAP for channel, _ in writes):
+                self.flush()
+
+    # --- read path ---
+
+    def _tuple_from_row(self, thread_id: str, ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, payload, metadata_type, metadata_payload = row
+        checkpoint = self.serde.loads_typed((type_, payload))
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (thread_id, ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_channel_values(thread_id, ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_payload)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, b))) for task_id, channel, t, b in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            self.flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, ns),
+                ).fetchone()
+            return self._tuple_from_row(thread_id, ns, row) if row else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+        for thread_id, ns, *row in rows:
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            with self._lock:
+                item = self._tuple_from_row(thread_id, ns, row)
+            yield item
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.execute("BEGIN")
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("COMMIT")
+            for key in [k for k in self._last if k[0] == thread_id]:
+                del self._last[key]
+
+    def compact(self, keep_last: int = 10, *, thread_id: str | None = None, vacuum: bool = False) -> int:
+        """Simpan keep_last checkpoint terbaru per (thread, namespace), buang sisanya.
+
+        Return jumlah checkpoint yang dihapus.
+        """
+        removed = 0
+        with self._lock:
+            self.flush()
+            if thread_id is None:
+                scopes = self._conn.execute("SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints").fetchall()
+            else:
+                scopes = self._conn.execute(
+                    "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                ).fetchall()
+            self._conn.execute("BEGIN")
+            try:
+                for tid, ns in scopes:
+                    removed += self._compact_scope(tid, ns, keep_last)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._last.clear()
+            if vacuum:
+                self._conn.execute("VACUUM")
+        return removed
+
+    def _compact_scope(self, thread_id: str, ns: str, keep_last: int) -> int:
+        rows = self._conn.execute(
+            "SELECT checkpoint_id, type, checkpoint FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+            (thread_id, ns),
+        ).fetchall()
+        keep, drop = rows[:keep_last], rows[keep_last:]
+        if not drop:
+            return 0
+        referenced: set[tuple[str, str]] = set()
+        for _, type_, payload in keep:
+            versions = self.serde.loads_typed((type_, payload))["channel_versions"]
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+
+        blobs = self._conn.execute(
+            "SELECT channel, version, kind, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, ns),
+        ).fetchall()
+        # delta yang masih dipakai tapi basisnya akan dibuang: tulis ulang jadi blob penuh
+        for channel, version, kind, base_version in blobs:
+            if kind == "delta" and (channel, version) in referenced and (channel, base_version) not in referenced:
+                _, value = self._load_value(thread_id, ns, channel, version)
+                type_, blob = self.serde.dumps_typed(value)
+                self._conn.execute(
+                    "UPDATE blobs SET kind = 'full', base_version = NULL, type = ?, blob = ? "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (type_, blob, thread_id, ns, channel, version),
+                )
+        self._conn.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            [(thread_id, ns, channel, version) for channel, version, _, _ in blobs
+             if (channel, version) not in referenced],
+        )
+        dropped_ids = [(thread_id, ns, checkpoint_id) for checkpoint_id, _, _ in drop]
+        self._conn.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", dropped_ids
+        )
+        self._conn.executemany(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", dropped_ids
+        )
+        return len(drop)
+
+    def size_bytes(self) -> int:
+        """Ukuran database (halaman terpakai), termasuk yang belum di-VACUUM."""
+        with self._lock:
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # format sama dengan InMemorySaver: "<counter 32 digit>.<random>"
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # --- async: SQLite blocking, jadi dilempar ke thread ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+    from typing import Annotated
+
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import END, START, StateGraph
+    from typing_extensions import TypedDict
+
+    from log_channel import AppendLogChannel
+
+    class BenchState(TypedDict):
+        step: int
+        logs: Annotated[list[str], AppendLogChannel]
+
+    def work(state):
+        return {"step": state.get("step", 0) + 1}
+
+    def log(state):
+        return {"logs": [f"step {state['step']}: " + "x" * 80]}
+
+    builder = StateGraph(BenchState)
+    builder.add_node("work", work)
+    builder.add_node("log", log)
+    builder.add_edge(START, "work")
+    builder.add_edge("work", "log")
+    builder.add_edge("log", END)
+
+    invokes = 1_000
+    config = {"configurable": {"thread_id": "long-running"}}
+    tmpdir = tempfile.mkdtemp()
+    print(f"{invokes} invoke pada satu thread, 2 node per invoke")
+
+    for name, make in (
+        ("InMemorySaver", InMemorySaver),
+        ("DeltaSqliteSaver", lambda: DeltaSqliteSaver(os.path.join(tmpdir, "bench.sqlite"))),
+    ):
+        tracemalloc.start()
+        saver = make()
+        graph = builder.compile(checkpointer=saver)
+        start = time.perf_counter()
+        for _ in range(invokes):
+            result = graph.invoke({}, config)
+        elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(result["logs"]) == invokes
+
+        if isinstance(saver, InMemorySaver):
+            stored = sum(len(b[1]) for b in saver.blobs.values())
+            stored += sum(len(c[0][1]) + len(c[1][1]) for ns in saver.storage.values()
+                          for cps in ns.values() for c in cps.values())
+            stored += sum(len(w[2][1]) for ws in saver.writes.values() for w in ws.values())
+        else:
+            stored = saver.stats.bytes_written
+        # data baru yang benar-benar ditulis node = payload pending writes
+        logical = sum(len(f"step {i}: " + "x" * 80) for i in range(1, invokes + 1))
+        print(f"  {name:16s} {elapsed:6.2f}s  bytes ditulis {stored / 1024:8.0f} KiB  "
+              f"(write amplification vs isi log: {stored / logical:5.1f}x)  "
+              f"memory proses {memory / 1024:8.0f} KiB")
+
+    print(f"  delta blobs {saver.stats.delta_blobs}, full blobs {saver.stats.full_blobs}, "
+          f"transaksi {saver.stats.transactions}")
+    before_size = saver.size_bytes()
+    removed = saver.compact(keep_last=10, vacuum=True)
+    restored = DeltaSqliteSaver(saver.path)
+    graph = builder.compile(checkpointer=restored)
+    assert len(graph.get_state(config).values["logs"]) == invokes
+    print(f"  compact(keep_last=10): {removed} checkpoint dihapus, file {before_size / 1024:.0f} KiB "
+          f"-> {saver.size_bytes() / 1024:.0f} KiB, state tetap utuh setelah dibuka ulang")
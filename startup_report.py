@@ -0,0 +1,72 @@
+"""
+Laporan waktu startup (import) tiap script, gaya `python -X importtime`.
+
+Script di repo ini langsung jalan (memanggil LLM/graph) waktu dijalankan, jadi yang diukur
+di sini cuma import level-modul-nya: statement import di badan modul dieksekusi di proses
+Python baru dengan -X importtime, lalu outputnya dirangkum per paket top-level. Ini biaya
+yang dibayar tiap proses worker sebelum bisa mengerjakan apa pun. Import di dalam fungsi
+(lazy import) tidak ikut dihitung, memang itu tujuannya.
+
+    python startup_report.py                     # semua script default
+    python startup_report.py langgraph_learn.py  # script tertentu
+"""
+from __future__ import annotations
+
+import ast
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SCRIPTS = [
+    "langgraph_learn.py",
+    "langchain3_learn.py",
+    "learn2_langchain.py",
+    "learn3_lanchain_prompt_focus.py",
+]
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def module_imports(path: Path) -> list[str]:
+    """Statement import yang dieksekusi di level modul (bukan di fungsi/class/__main__)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_profile(statements: list[str], cwd: Path) -> tuple[float, dict[str, int]]:
+    """Jalankan import di proses baru. Return (wall time detik, {paket: microsecond})."""
+    code = "\n".join(statements) or "pass"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    per_package: dict[str, int] = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, _, _, name = match.groups()
+            per_package[name.split(".")[0]] += int(self_us)
+    return wall, dict(per_package)
+
+
+def report(script: str, top: int = 8) -> None:
+    path = Path(script)
+    wall, per_package = import_profile(module_imports(path), path.resolve().parent)
+    total = sum(per_package.values())
+    print(f"{script}: startup {wall * 1000:.0f}ms (import {total / 1000:.0f}ms)")
+    for name, us in sorted(per_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:28s} {us / 1000:8.1f}ms  {us / total:6.1%}")
+
+
+if __name__ == "__main__":
+    baseline, _ = import_profile([], Path.cwd())
+    print(f"interpreter kosong: {baseline * 1000:.0f}ms\n")
+    for script in sys.argv[1:] or SCRIPTS:
+        report(script)
+        print()
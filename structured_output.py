@@ -0,0 +1,198 @@
+"""
+Structured output dengan validasi cepat dan perbaikan JSON lokal.
+
+llm.with_structured_output(ContractExtraction) di learn3 mem-parse respons ke dict
+dulu baru dibangun jadi model Pydantic, dan kalau JSON-nya sedikit rusak langsung gagal
+(ujung-ujungnya cuma masuk except Exception lalu print).
+
+StructuredExtractor:
+- compile schema sekali jadi TypeAdapter (pydantic-core), validasi langsung dari teks
+  JSON mentah (validate_json), tanpa json.loads -> dict -> model
+- kalau gagal, coba repair_json dulu (buang code fence, trailing comma, literal Python,
+  tutup kurung yang kepotong), validasi ulang secara lokal
+- baru kalau masih gagal, tanya ulang model dengan pesan error validasinya
+- counter valid / repaired / requeried / failed di .stats
+"""
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import patch_config
+from pydantic import TypeAdapter, ValidationError
+
+
+class StructuredOutputError(ValueError):
+    """Output model tetap tidak valid setelah repair lokal dan re-query."""
+
+    def __init__(self, message: str, raw: str):
+        super().__init__(message)
+        self.raw = raw
+
+
+@dataclass
+class StructuredOutputStats:
+    calls: int = 0
+    valid: int = 0
+    repaired: int = 0
+    requeried: int = 0
+    failed: int = 0
+
+    @property
+    def repair_rate(self) -> float:
+        return self.repaired / self.calls if self.calls else 0.0
+
+    @property
+    def requery_rate(self) -> float:
+        return self.requeried / self.calls if self.calls else 0.0
+
+
+@lru_cache(maxsize=None)
+def schema_adapter(schema) -> TypeAdapter:
+    """TypeAdapter per schema, dibuat sekali lalu dipakai ulang."""
+    return TypeAdapter(schema)
+
+
+_STRING = re.compile(r'"(?:\\.|[^"\\])*"')
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_PY_LITERAL = re.compile(r"\b(True|False|None)\b")
+
+
+def repair_json(text: str) -> str:
+    """Perbaikan murah untuk JSON yang hampir valid. Isi string tidak disentuh."""
+    text = _FENCE.sub("", text.strip())
+    start = text.find("{")
+    if start > 0:
+        text = text[start:]
+    end = text.rfind("}")
+    if 0 <= end < len(text) - 1 and text.count("{") == text[: end + 1].count("{"):
+        text = text[: end + 1]  # buang penjelasan setelah objek JSON
+
+    pieces = []
+    stack = []
+    last = 0
+    for match in _STRING.finditer(text):
+        pieces.append(_repair_outside_string(text[last:match.start()], stack))
+        pieces.append(match.group())
+        last = match.end()
+    tail = text[last:]
+    if tail.count('"') % 2:
+        # string terakhir kepotong (respons kena max_tokens)
+        quote = tail.index('"')
+        pieces.append(_repair_outside_string(tail[:quote], stack))
+        pieces.append(tail[quote:] + '"')
+    else:
+        pieces.append(_repair_outside_string(tail, stack))
+    repaired = "".join(pieces).rstrip().rstrip(",")
+    closers = {"{": "}", "[": "]"}
+    return repaired + "".join(closers[b] for b in reversed(stack))
+
+
+def _repair_outside_string(segment: str, stack: list) -> str:
+    segment = segment.replace("“", '"').replace("”", '"')
+    segment = _PY_LITERAL.sub(lambda m: _PY_LITERALS[m.group()], segment)
+    segment = _TRAILING_COMMA.sub(r"\1", segment)
+    for char in segment:
+        if char in "{[":
+            stack.append(char)
+        elif char in "}]" and stack:
+            stack.pop()
+    return segment
+
+
+class StructuredExtractor(Runnable):
+    """Pengganti llm.with_structured_output(schema) dengan fast path validasi.
+
+    method:
+    - "json_schema": response_format json_schema, JSON mentah ada di content
+    - "json_mode": response_format json_object + schema di system message
+    - "function_calling": schema sebagai tool (argumen sudah di-parse LangChain
+      jadi dict, jadi fast path dari teks hanya berlaku untuk argumen yang invalid)
+    """
+
+    def __init__(self, llm, schema, *, method: str = "json_schema", max_requery: int = 1):
+        self.schema = schema
+        self.method = method
+        self.max_requery = max_requery
+        self.stats = StructuredOutputStats()
+        self._adapter = schema_adapter(schema)
+        self._lock = threading.Lock()
+        json_schema = self._adapter.json_schema()
+        name = getattr(schema, "__name__", "output")
+        self._instructions = None
+        if method == "json_schema":
+            self._model = llm.bind(response_format={
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": json_schema},
+            })
+        elif method == "json_mode":
+            self._model = llm.bind(response_format={"type": "json_object"})
+            self._instructions = SystemMessage(
+                f"Respond only with a JSON object matching this JSON schema:\n{json_schema}"
+            )
+        elif method == "function_calling":
+            self._model = llm.bind_tools([schema], tool_choice=name)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+    def _raw_output(self, message):
+        if self.method != "function_calling":
+            return message.text
+        if message.tool_calls:
+            return message.tool_calls[0]["args"]
+        if message.invalid_tool_calls:
+            return message.invalid_tool_calls[0]["args"] or ""
+        return message.text
+
+    def _validate(self, raw):
+        if isinstance(raw, dict):
+            return self._adapter.validate_python(raw)
+        return self._adapter.validate_json(raw)
+
+    def _extract(self, input, run_manager, config):
+        messages = list(input.to_messages() if hasattr(input, "to_messages") else input)
+        if self._instructions is not None:
+            messages.insert(0, self._instructions)
+        child_config = patch_config(config, callbacks=run_manager.get_child())
+        self._count("calls")
+
+        for attempt in range(self.max_requery + 1):
+            raw = self._raw_output(self._model.invoke(messages, child_config))
+            try:
+                result = self._validate(raw)
+                self._count("valid")
+                return result
+            except ValidationError as exc:
+                error = exc
+            if isinstance(raw, str):
+                repaired = repair_json(raw)
+                if repaired != raw:
+                    try:
+                        result = self._adapter.validate_json(repaired)
+                        self._count("repaired")
+                        return result
+                    except ValidationError as exc:
+                        error = exc
+            if attempt < self.max_requery:
+                self._count("requeried")
+                messages = messages + [HumanMessage(
+                    f"Your previous output was not valid:\n{raw}\n\n"
+                    f"Validation errors:\n{error}\n\n"
+                    "Return the corrected output only."
+                )]
+
+        self._count("failed")
+        raise StructuredOutputError(f"Invalid {getattr(self.schema, '__name__', 'output')}: {error}", str(raw))
+
+    def invoke(self, input, config=None, **kwargs):
+        return self._call_with_config(self._extract, input, config)
@@ -0,0 +1,378 @@
+"""
+Akuntansi token dan admission control berbasis budget untuk ChatOpenAI.
+
+learn2_langchain.py cuma print response.usage_metadata sekali untuk satu panggilan; tidak
+ada yang menjumlahkan pemakaian antar panggilan, jadi agent yang loop terus bisa
+menghabiskan kuota tanpa ketahuan.
+
+- TokenAccountant: jumlah request dan token input/output/cached per model, per user, per
+  thread, dan total. Budget dipasang per scope (set_budget), pemakaian bisa dibaca kapan
+  saja (usage(), snapshot()).
+- BudgetedChatModel: chat model pembungkus. Sebelum request dikirim, perkiraan token
+  di-reserve dulu ke semua scope yang kena:
+  - melewati batas keras budget user/thread/total -> TokenBudgetExceeded (tidak dikirim)
+  - melewati downgrade_at (misal 80% budget), atau budget model utama habis -> pakai
+    model fallback yang lebih murah kalau ada, kalau tidak ditolak
+  Setelah respons datang, reservasi diganti pemakaian sebenarnya dari usage_metadata.
+  Reservasi membuat tool call paralel tidak bisa lolos bareng-bareng melewati budget.
+  Respons yang dilayani cache lokal (llm_cache.ResponseCache atau BaseCache lain) tidak
+  memanggil API, jadi dicatat sebagai cache_hits dengan 0 token. Stream (_stream/_astream)
+  diteruskan ke model aslinya; usage dijumlahkan dari chunk, dan kalau provider tidak
+  mengirim usage di stream (ChatOpenAI tanpa stream_usage=True), dipakai perkiraan.
+
+user_id diambil dari metadata config dan thread_id dari metadata LangGraph:
+
+    budgeted = BudgetedChatModel(model=llm, fallback=llm_murah, accountant=accountant)
+    agent = create_agent(budgeted, tools)
+    agent.invoke(inputs, {"metadata": {"user_id": "user123"}})
+
+Demo:
+    python token_budget.py
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.ai import add_usage
+from langchain_core.outputs import ChatResult
+from langchain_core.runnables.config import ensure_config
+from pydantic import ConfigDict
+
+SCOPES = ("total", "model", "user", "thread")
+
+
+class TokenBudgetExceeded(RuntimeError):
+    def __init__(self, scope: str, key: str, limit: int, projected: int):
+        super().__init__(f"Token budget exceeded for {scope}={key!r}: {projected} > {limit}")
+        self.scope = scope
+        self.key = key
+        self.limit = limit
+        self.projected = projected
+
+
+@dataclass
+class Usage:
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0  # bagian dari input_tokens yang kena prompt cache provider
+    reserved: int = 0       # perkiraan token request yang sedang jalan
+    rejected: int = 0
+    downgraded: int = 0
+    cache_hits: int = 0     # respons dari cache lokal, tanpa request ke API (0 token)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass(frozen=True)
+class Budget:
+    max_tokens: int
+    # fraksi budget yang membuat request dialihkan ke model fallback; None = tidak pernah
+    downgrade_at: float | None = 0.8
+
+
+def estimate_tokens(messages: list[BaseMessage]) -> int:
+    """Perkiraan kasar token input (~4 karakter per token + overhead per message)."""
+    return sum(len(str(message.content)) // 4 + 4 for message in messages)
+
+
+def model_name(model: Any) -> str:
+    return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+
+class TokenAccountant:
+    """Penghitung token per scope + budget. Thread-safe."""
+
+    def __init__(self, user_key: str = "user_id", thread_key: str = "thread_id"):
+        self.user_key = user_key
+        self.thread_key = thread_key
+        self._lock = threading.Lock()
+        self._usage: dict[tuple[str, str], Usage] = {}
+        self._budgets: dict[tuple[str, str], Budget] = {}
+
+    def set_budget(self, scope: str, key: str, budget: Budget | None) -> None:
+        """Pasang budget; key "*" berlaku untuk semua key di scope itu yang tidak punya budget sendiri."""
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope: {scope}")
+        with self._lock:
+            if budget is None:
+                self._budgets.pop((scope, key), None)
+            else:
+                self._budgets[(scope, key)] = budget
+
+    def _budget(self, scope: str, key: str) -> Budget | None:
+        return self._budgets.get((scope, key)) or self._budgets.get((scope, "*"))
+
+    def _keys(self, model: str, metadata: Mapping[str, Any]) -> list[tuple[str, str]]:
+        keys = [("total", ""), ("model", model)]
+        for scope, meta_key in (("user", self.user_key), ("thread", self.thread_key)):
+            value = metadata.get(meta_key)
+            if value is not None:
+                keys.append((scope, str(value)))
+        return keys
+
+    def _entry(self, key: tuple[str, str]) -> Usage:
+        usage = self._usage.get(key)
+        if usage is None:
+            usage = self._usage[key] = Usage()
+        return usage
+
+    def _check(self, keys, estimate: int) -> tuple[str, tuple[str, str], Budget, int] | None:
+        """Scope terburuk: ("hard", ...) kalau lewat batas, ("soft", ...) kalau lewat downgrade_at."""
+        worst = None
+        for key in keys:
+            budget = self._budget(*key)
+            if budget is None:
+                continue
+            usage = self._usage.get(key) or Usage()
+            projected = usage.total_tokens + usage.reserved + estimate
+            if projected > budget.max_tokens:
+                return "hard", key, budget, projected
+            if budget.downgrade_at is not None and projected > budget.max_tokens * budget.downgrade_at:
+                worst = worst or ("soft", key, budget, projected)
+        return worst
+
+    def admit(
+        self, model: str, fallback: str | None, metadata: Mapping[str, Any], estimate: int
+    ) -> tuple[str, list[tuple[str, str]]]:
+        """Pilih model untuk request ini dan reserve estimate. Return (nama model, scope keys)."""
+        with self._lock:
+            keys = self._keys(model, metadata)
+            verdict = self._check(keys, estimate)
+            if verdict is not None:
+                level, (scope, key), budget, projected = verdict
+                # budget model utama habis atau sudah dekat batas: coba model fallback
+                can_downgrade = fallback is not None and (level == "soft" or scope == "model")
+                fallback_keys = self._keys(fallback, metadata) if can_downgrade else None
+                fallback_verdict = self._check(fallback_keys, estimate) if can_downgrade else None
+                if can_downgrade and (fallback_verdict is None or fallback_verdict[0] == "soft"):
+                    for k in fallback_keys:
+                        self._entry(k).downgraded += 1
+                    model, keys = fallback, fallback_keys
+                elif level == "hard" or can_downgrade:
+                    for k in keys:
+                        self._entry(k).rejected += 1
+                    if fallback_verdict is not None and fallback_verdict[0] == "hard":
+                        _, (scope, key), budget, projected = fallback_verdict
+                    raise TokenBudgetExceeded(scope, key, budget.max_tokens, projected)
+            for k in keys:
+                self._entry(k).reserved += estimate
+            return model, keys
+
+    def record(
+        self,
+        keys: list[tuple[str, str]],
+        estimate: int,
+        usage_metadata: Mapping | None,
+        *,
+        ok: bool = True,
+        cache_hit: bool = False,
+    ) -> None:
+        """Ganti reservasi dengan pemakaian sebenarnya.
+
+        ok=False: request gagal, cuma lepas reservasi. cache_hit=True: respons dari cache
+        lokal, dihitung di cache_hits tanpa token (usage_metadata-nya milik request asli).
+        """
+        usage_metadata = {} if cache_hit else usage_metadata or {}
+        input_tokens = usage_metadata.get("input_tokens", 0)
+        output_tokens = usage_metadata.get("output_tokens", 0)
+        cached = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0)
+        with self._lock:
+            for key in keys:
+                usage = self._entry(key)
+                usage.reserved -= estimate
+                if cache_hit:
+                    usage.cache_hits += 1
+                elif ok:
+                    usage.requests += 1
+                    usage.input_tokens += input_tokens
+                    usage.output_tokens += output_tokens
+                    usage.cached_tokens += cached
+
+    def usage(self, scope: str, key: str = "") -> Usage:
+        with self._lock:
+            return replace(self._usage.get((scope, key)) or Usage())
+
+    def snapshot(self) -> dict[str, dict[str, Usage]]:
+        """Salinan semua counter: {scope: {key: Usage}}."""
+        with self._lock:
+            result: dict[str, dict[str, Usage]] = {}
+            for (scope, key), usage in self._usage.items():
+                result.setdefault(scope, {})[key] = replace(usage)
+            return result
+
+
+class BudgetedChatModel(BaseChatModel):
+    """Chat model yang mengecek budget TokenAccountant sebelum meneruskan ke model aslinya."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model: BaseChatModel
+    fallback: BaseChatModel | None = None
+    accountant: TokenAccountant
+    expected_output_tokens: int = 256
+
+    @property
+    def _llm_type(self) -> str:
+        return "budgeted-chat-model"
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        # nama model di tracing/instrumentation tetap nama model aslinya
+        return self.model._get_ls_params(stop=stop, **kwargs)
+
+    def bind_tools(self, tools, **kwargs):
+        # format tools ikut model utama (format OpenAI), fallback menerima kwargs yang sama
+        return self.bind(**self.model.bind_tools(tools, **kwargs).kwargs)
+
+    def _admit(self, messages, run_manager):
+        # stream() memanggil _stream tanpa run_manager: metadata diambil dari config yang
+        # sedang aktif (node LangGraph / Runnable pemanggil)
+        metadata = run_manager.metadata if run_manager is not None else ensure_config().get("metadata", {})
+        estimate = estimate_tokens(messages) + self.expected_output_tokens
+        fallback_name = model_name(self.fallback) if self.fallback is not None else None
+        chosen, keys = self.accountant.admit(model_name(self.model), fallback_name, metadata, estimate)
+        target = self.model if chosen == model_name(self.model) else self.fallback
+        return target, keys, estimate
+
+    @staticmethod
+    def _usage_of(result: ChatResult):
+        for generation in result.generations:
+            usage = getattr(generation.message, "usage_metadata", None)
+            if usage:
+                return usage
+        return None
+
+    @staticmethod
+    def _from_cache(usage: Mapping | None) -> bool:
+        # cache hit di _generate_with_cache: langchain_core menandai usage_metadata hasil
+        # cache dengan total_cost=0; respons API sungguhan tidak membawa key ini
+        return usage is not None and usage.get("total_cost", None) == 0
+
+    def _record_result(self, keys, estimate, result: ChatResult | None) -> None:
+        usage = result and self._usage_of(result)
+        self.accountant.record(keys, estimate, usage, ok=result is not None, cache_hit=self._from_cache(usage))
+
+    def _record_stream(self, keys, estimate, messages, usage, text: list[str], ok: bool) -> None:
+        if usage is None and text:
+            # provider tidak mengirim usage di stream: pakai perkiraan, jangan dihitung 0
+            usage = {"input_tokens": estimate_tokens(messages), "output_tokens": len("".join(text)) // 4}
+        # stream yang berhenti di tengah tetap dihitung kalau token sudah keluar
+        self.accountant.record(keys, estimate, usage, ok=ok or usage is not None)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        target, keys, estimate = self._admit(messages, run_manager)
+        result = None
+        try:
+            # _generate_with_cache: cache respons (llm_cache) model asli tetap dipakai,
+            # dan tidak ada run LLM kedua di callback (token tidak terhitung dobel)
+            result = target._generate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return result
+        finally:
+            self._record_result(keys, estimate, result)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        target, keys, estimate = self._admit(messages, run_manager)
+        result = None
+        try:
+            result = await target._agenerate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return result
+        finally:
+            self._record_result(keys, estimate, result)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        target, keys, estimate = self._admit(messages, run_manager)
+        usage, text, ok = None, [], False
+        try:
+            for chunk in target._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                if chunk.message.usage_metadata:
+                    usage = add_usage(usage, chunk.message.usage_metadata)
+                text.append(chunk.text)
+                yield chunk
+            ok = True
+        finally:
+            self._record_stream(keys, estimate, messages, usage, text, ok)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        target, keys, estimate = self._admit(messages, run_manager)
+        usage, text, ok = None, [], False
+        try:
+            async for chunk in target._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                if chunk.message.usage_metadata:
+                    usage = add_usage(usage, chunk.message.usage_metadata)
+                text.append(chunk.text)
+                yield chunk
+            ok = True
+        finally:
+            self._record_stream(keys, estimate, messages, usage, text, ok)
+
+
+if __name__ == "__main__":
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    def replies(tokens: int):
+        while True:
+            yield AIMessage("ok", usage_metadata={
+                "input_tokens": tokens, "output_tokens": tokens // 4, "total_tokens": tokens + tokens // 4,
+                "input_token_details": {"cache_read": tokens // 2},
+            })
+
+    class FakeModel(GenericFakeChatModel):
+        model_name: str
+
+    accountant = TokenAccountant()
+    accountant.set_budget("model", "big-model", Budget(max_tokens=3_000, downgrade_at=None))
+    accountant.set_budget("user", "*", Budget(max_tokens=6_000, downgrade_at=0.8))
+    llm = BudgetedChatModel(
+        model=FakeModel(model_name="big-model", messages=replies(400)),
+        fallback=FakeModel(model_name="small-model", messages=replies(400)),
+        accountant=accountant,
+        expected_output_tokens=100,
+    )
+
+    # agent yang kebablasan: terus memanggil LLM sampai ditolak budget user
+    for i in range(50):
+        try:
+            llm.invoke("analyze data " * 20, config={"metadata": {"user_id": "user123", "thread_id": "t1"}})
+        except TokenBudgetExceeded as exc:
+            print(f"request ke-{i + 1} ditolak: {exc}")
+            break
+    for scope, entries in accountant.snapshot().items():
+        for key, usage in entries.items():
+            print(f"{scope:6s} {key or '-':12s} requests={usage.requests:2d} in={usage.input_tokens:5d} "
+                  f"out={usage.output_tokens:4d} cached={usage.cached_tokens:5d} "
+                  f"downgraded={usage.downgraded} rejected={usage.rejected}")
+    user = accountant.usage("user", "user123")
+    assert user.total_tokens <= 6_000 and user.reserved == 0
+
+    # respons yang sama dari cache lokal: tidak ada request ke API, 0 token
+    from llm_cache import ResponseCache
+
+    cached_accountant = TokenAccountant()
+    cached_llm = BudgetedChatModel(
+        model=FakeModel(model_name="big-model", messages=replies(400), cache=ResponseCache()),
+        accountant=cached_accountant,
+    )
+    for _ in range(3):
+        cached_llm.invoke("what is the refund policy?")
+    total = cached_accountant.usage("total")
+    print(f"3x prompt sama dengan cache: requests={total.requests} cache_hits={total.cache_hits} "
+          f"tokens={total.total_tokens}")
+    assert total.requests == 1 and total.cache_hits == 2 and total.total_tokens == 500
+
+    # stream ikut dihitung (tanpa usage di chunk: pakai perkiraan); dipanggil dari dalam
+    # Runnable seperti di node agent, user_id dari config yang sedang aktif
+    from langchain_core.runnables import RunnableLambda
+
+    stream_node = RunnableLambda(lambda prompt: list(llm.stream(prompt)))
+    chunks = stream_node.invoke("stream please", config={"metadata": {"user_id": "user456"}})
+    streamed = accountant.usage("user", "user456")
+    print(f"stream {len(chunks)} chunk: requests={streamed.requests} tokens={streamed.total_tokens}")
+    assert streamed.requests == 1 and streamed.total_tokens > 0 and streamed.reserved == 0
@@ -0,0 +1,204 @@
+"""
+Eksekusi semua tool call dari satu AIMessage secara paralel.
+
+Di learn2_langchain.py cuma response.tool_calls[0] yang dijalankan. Kalau model
+mengeluarkan 5-10 tool call sekaligus (misal cek cuaca beberapa kota), menjalankannya
+satu per satu berarti total waktu = jumlah latency semua tool.
+
+execute_tool_calls / aexecute_tool_calls:
+- semua tool call dijalankan bersamaan: tool sync lewat thread pool, tool async
+  langsung di event loop (asyncio)
+- timeout per tool (default sama untuk semua, bisa dioverride per nama tool)
+- hasilnya ToolMessage dengan urutan yang sama seperti tool_calls di AIMessage,
+  siap di-append ke history messages
+- tool yang error, timeout, atau tidak dikenal tetap menghasilkan ToolMessage
+  (status="error") supaya model bisa lanjut, bukan exception
+
+Catatan: thread yang kena timeout tidak bisa dimatikan paksa, hasilnya saja yang
+dibuang. create_agent (langchain3_learn.py) tidak perlu ini karena ToolNode LangGraph
+sudah menjalankan tool call dalam satu pesan secara paralel.
+
+Benchmark:
+    python tool_executor.py
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+DEFAULT_TIMEOUT = 30.0
+
+
+def _tools_by_name(tools) -> dict:
+    if isinstance(tools, dict):
+        return tools
+    return {tool.name if isinstance(tool, BaseTool) else tool.__name__: tool for tool in tools}
+
+
+def _tool_calls(message_or_calls) -> list[dict]:
+    if isinstance(message_or_calls, AIMessage):
+        return message_or_calls.tool_calls
+    return list(message_or_calls)
+
+
+def _to_message(call: dict, result) -> ToolMessage:
+    if isinstance(result, ToolMessage):
+        return result
+    return ToolMessage(
+        content=result if isinstance(result, (str, list)) else str(result),
+        tool_call_id=call["id"],
+        name=call["name"],
+    )
+
+
+def _error_message(call: dict, error: str) -> ToolMessage:
+    return ToolMessage(
+        content=f"Error: {error}",
+        tool_call_id=call["id"],
+        name=call["name"],
+        status="error",
+    )
+
+
+def _run_sync(tool, call: dict):
+    if isinstance(tool, BaseTool):
+        # invoke dengan ToolCall dict langsung menghasilkan ToolMessage
+        return tool.invoke({**call, "type": "tool_call"})
+    return tool(**call["args"])
+
+
+async def _run_async(tool, call: dict):
+    if isinstance(tool, BaseTool):
+        return await tool.ainvoke({**call, "type": "tool_call"})
+    if inspect.iscoroutinefunction(tool):
+        return await tool(**call["args"])
+    return await asyncio.to_thread(tool, **call["args"])
+
+
+def execute_tool_calls(
+    tools,
+    message_or_calls,
+    *,
+    timeout: float | None = DEFAULT_TIMEOUT,
+    timeouts: dict[str, float] | None = None,
+    max_workers: int | None = None,
+) -> list[ToolMessage]:
+    """Jalankan semua tool call (sync) secara paralel, return ToolMessage sesuai urutan.
+
+    tools: list/dict berisi tool LangChain (@tool) atau fungsi biasa.
+    """
+    tools = _tools_by_name(tools)
+    calls = _tool_calls(message_or_calls)
+    timeouts = timeouts or {}
+    results: list[ToolMessage | None] = [None] * len(calls)
+    if not calls:
+        return []
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(calls))
+    try:
+        futures = {}
+        for index, call in enumerate(calls):
+            tool = tools.get(call["name"])
+            if tool is None:
+                results[index] = _error_message(call, f"unknown tool {call['name']!r}")
+            else:
+                futures[index] = pool.submit(_run_sync, tool, call)
+
+        start = time.monotonic()
+        for index, future in futures.items():
+            call = calls[index]
+            limit = timeouts.get(call["name"], timeout)
+            remaining = None if limit is None else max(0.0, start + limit - time.monotonic())
+            try:
+                results[index] = _to_message(call, future.result(timeout=remaining))
+            except FutureTimeoutError:
+                results[index] = _error_message(call, f"tool {call['name']!r} timed out after {limit}s")
+            except Exception as exc:
+                results[index] = _error_message(call, repr(exc))
+    finally:
+        # jangan tunggu thread yang kena timeout
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+async def aexecute_tool_calls(
+    tools,
+    message_or_calls,
+    *,
+    timeout: float | None = DEFAULT_TIMEOUT,
+    timeouts: dict[str, float] | None = None,
+) -> list[ToolMessage]:
+    """Versi async: tool async jalan di event loop, tool sync di thread (asyncio.to_thread)."""
+    tools = _tools_by_name(tools)
+    calls = _tool_calls(message_or_calls)
+    timeouts = timeouts or {}
+
+    async def run_one(call):
+        tool = tools.get(call["name"])
+        if tool is None:
+            return _error_message(call, f"unknown tool {call['name']!r}")
+        limit = timeouts.get(call["name"], timeout)
+        try:
+            return _to_message(call, await asyncio.wait_for(_run_async(tool, call), limit))
+        except asyncio.TimeoutError:
+            return _error_message(call, f"tool {call['name']!r} timed out after {limit}s")
+        except Exception as exc:
+            return _error_message(call, repr(exc))
+
+    return list(await asyncio.gather(*(run_one(call) for call in calls)))
+
+
+if __name__ == "__main__":
+    from langchain_core.tools import tool
+
+    LATENCY = 0.2
+
+    @tool
+    def lookup_weather(city: str) -> str:
+        """Fake weather lookup with network-like latency."""
+        time.sleep(LATENCY)
+        return f"{city}: 22C"
+
+    @tool
+    async def alookup_weather(city: str) -> str:
+        """Async fake weather lookup."""
+        await asyncio.sleep(LATENCY)
+        return f"{city}: 22C"
+
+    for n in (5, 10):
+        cities = [f"city-{i}" for i in range(n)]
+        message = AIMessage(content="", tool_calls=[
+            {"name": "lookup_weather", "args": {"city": c}, "id": f"call_{i}"} for i, c in enumerate(cities)
+        ])
+        amessage = AIMessage(content="", tool_calls=[
+            {**call, "name": "alookup_weather"} for call in message.tool_calls
+        ])
+
+        start = time.perf_counter()
+        sequential = [lookup_weather.invoke({**call, "type": "tool_call"}) for call in message.tool_calls]
+        t_seq = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = execute_tool_calls([lookup_weather], message)
+        t_par = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_results = asyncio.run(aexecute_tool_calls([alookup_weather], amessage))
+        t_async = time.perf_counter() - start
+
+        assert [m.content for m in parallel] == [m.content for m in sequential]
+        assert [m.tool_call_id for m in async_results] == [c["id"] for c in message.tool_calls]
+        print(f"{n:2d} tool calls: sequential {t_seq:.2f}s  thread pool {t_par:.2f}s  asyncio {t_async:.2f}s")
+
+    slow = AIMessage(content="", tool_calls=[
+        {"name": "lookup_weather", "args": {"city": "slow"}, "id": "call_slow"},
+        {"name": "missing_tool", "args": {}, "id": "call_missing"},
+    ])
+    for result in execute_tool_calls([lookup_weather], slow, timeout=0.05):
+        print(f"{result.tool_call_id}: {result.status} {result.content}")
@@ -0,0 +1,213 @@
+"""
+Cache LRU dengan TTL + request coalescing, untuk lookup ke backend yang lambat.
+
+Dipakai sebagai read-through cache: get_or_load(key, loader) mengembalikan nilai dari cache
+kalau masih segar, kalau tidak memanggil loader. Kalau beberapa thread meminta key yang
+sama waktu loader-nya masih jalan, mereka menunggu hasil loader yang sama (satu fetch ke
+backend), bukan fetch sendiri-sendiri.
+
+- maxsize: jumlah entry maksimum, yang paling lama tidak dipakai dibuang duluan
+- ttl / negative_ttl: umur entry (detik); negative_ttl untuk hasil None (key tidak ada),
+  supaya id yang tidak ada tidak terus-terusan menembus ke backend
+- get_many_or_load(keys, batch_loader): versi batch, semua key yang miss diambil dengan
+  satu panggilan batch_loader; key yang sedang di-load request lain ikut ditunggu
+- stats: hit, miss, load, coalesced, eviction, expired
+
+Benchmark:
+    python ttl_cache.py
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0        # panggilan loader/batch_loader
+    coalesced: int = 0    # request yang menunggu load milik request lain
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache:
+    """LRU + TTL, thread-safe, dengan coalescing untuk key yang sedang di-load."""
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 60.0,
+        *,
+        negative_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _lookup(self, key: Hashable, now: float) -> Any:
+        """Dipanggil dengan lock dipegang. Return _MISSING kalau tidak ada/kedaluwarsa."""
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at <= now:
+            del self._data[key]
+            self.stats.expired += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any, now: float) -> None:
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._data[key] = (value, now + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key, self._clock())
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value, self._clock())
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        with self._lock:
+            value = self._lookup(key, self._clock())
+            if value is not _MISSING:
+                self.stats.hits += 1
+                return value
+            self.stats.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.stats.loads += 1
+            else:
+                self.stats.coalesced += 1
+        if not owner:
+            return future.result()[key]
+        try:
+            value = loader(key)
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._store(key, value, self._clock())
+            del self._inflight[key]
+        future.set_result({key: value})
+        return value
+
+    def get_many_or_load(
+        self, keys: Iterable[Hashable], batch_loader: Callable[[list], Mapping[Hashable, Any]]
+    ) -> dict[Hashable, Any]:
+        """Nilai untuk semua keys; key yang tidak dikembalikan batch_loader dianggap None."""
+        result: dict[Hashable, Any] = {}
+        waiting: dict[Hashable, Future] = {}
+        owned: list[Hashable] = []
+        batch = Future()  # satu future untuk seluruh batch, hasilnya dict {key: nilai}
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                value = self._lookup(key, now)
+                if value is not _MISSING:
+                    self.stats.hits += 1
+                    result[key] = value
+                    continue
+                self.stats.misses += 1
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.stats.coalesced += 1
+                    waiting[key] = future
+                else:
+                    owned.append(key)
+                    self._inflight[key] = batch
+            if owned:
+                self.stats.loads += 1
+        if owned:
+            try:
+                loaded = batch_loader(owned)
+            except BaseException as exc:
+                with self._lock:
+                    for key in owned:
+                        del self._inflight[key]
+                batch.set_exception(exc)
+                raise
+            values = {}
+            with self._lock:
+                now = self._clock()
+                for key in owned:
+                    value = values[key] = loaded.get(key)
+                    self._store(key, value, now)
+                    del self._inflight[key]
+            batch.set_result(values)
+            result.update(values)
+        for key, future in waiting.items():
+            result[key] = future.result()[key]
+        return result
+
+
+if __name__ == "__main__":
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+
+    def slow_loader(key):
+        calls.append(key)
+        time.sleep(0.05)  # simulasi query ke backend
+        return f"value-{key}"
+
+    cache = TTLCache(maxsize=1_000, ttl=30)
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        start = time.perf_counter()
+        values = list(pool.map(lambda _: cache.get_or_load("user123", slow_loader), range(50)))
+    print(f"50 request bersamaan untuk key yang sama: {len(calls)} fetch ke backend, "
+          f"{time.perf_counter() - start:.3f}s, coalesced {cache.stats.coalesced}")
+    assert len(calls) == 1 and set(values) == {"value-user123"}
+
+    rng = random.Random(0)
+    keys = [f"user{rng.paretovariate(1.2):.0f}" for _ in range(200_000)]
+    cache = TTLCache(maxsize=1_000, ttl=30)
+    start = time.perf_counter()
+    for key in keys:
+        cache.get_or_load(key, lambda k: k.upper())
+    elapsed = time.perf_counter() - start
+    print(f"{len(keys)} lookup (zipf-ish): hit rate {cache.stats.hit_rate:.1%}, "
+          f"{elapsed / len(keys) * 1e6:.2f}us/lookup")
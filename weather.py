@@ -0,0 +1,195 @@
+"""
+Lookup cuaca di belakang tool get_weather (learn2_langchain.py).
+
+Agent sering menanyakan kota yang sama berulang kali dalam beberapa menit, dan tiap
+panggilan tool dulu berarti satu request ke upstream. Di sini:
+
+- WeatherProvider: apa pun yang punya fetch(location, units, include_forecast) -> Weather.
+  FakeWeatherProvider adalah provider lokal yang deterministik (untuk demo/test, bisa
+  diberi latency buatan), provider HTTP sungguhan cukup mengikuti Protocol yang sama
+- normalize_location(): " JAKARTA ", "jakarta" dan "Jakárta" jadi key yang sama;
+  koordinat dibulatkan ke 2 desimal (~1 km) supaya "-6.2,106.8" dan "-6.20, 106.80" sama
+- WeatherService: cache TTL per (lokasi ternormalisasi, units, include_forecast) di atas
+  ttl_cache.TTLCache (request bersamaan untuk lokasi yang sama berbagi satu fetch).
+  get_many() menerima banyak lokasi sekaligus: yang miss di-fetch paralel di thread pool,
+  lokasi duplikat di dalam satu panggilan cuma di-fetch sekali
+
+    service = WeatherService(FakeWeatherProvider())
+    service.get_many(["Jakarta", "bandung", " JAKARTA "], units="celsius")
+
+Benchmark:
+    python weather.py
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Protocol
+
+from ttl_cache import TTLCache
+
+_COORDINATES = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+_CONDITIONS = ("Sunny", "Partly cloudy", "Cloudy", "Light rain", "Thunderstorms")
+
+
+@dataclass(frozen=True)
+class Weather:
+    location: str
+    units: str
+    temperature: float
+    condition: str
+    forecast: tuple[str, ...] | None = None  # 5 hari ke depan, None kalau tidak diminta
+
+    def format(self) -> str:
+        result = (f"Current weather in {self.location}: {self.temperature:g} degrees "
+                  f"{self.units[0].upper()}, {self.condition}")
+        if self.forecast is not None:
+            result += f"\nNext 5 days: {', '.join(self.forecast)}"
+        return result
+
+
+class WeatherProvider(Protocol):
+    def fetch(self, location: str, units: str, include_forecast: bool) -> Weather: ...
+
+
+def normalize_location(location: str) -> str:
+    """Key cache untuk lokasi: lowercase, spasi dirapikan, tanpa diakritik, koordinat dibulatkan."""
+    match = _COORDINATES.match(location)
+    if match:
+        lat, lon = (float(value) for value in match.groups())
+        return f"{lat:.2f},{lon:.2f}"
+    text = unicodedata.normalize("NFKD", location.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.replace(",", " , ").split()).replace(" ,", ",")
+
+
+class FakeWeatherProvider:
+    """Provider lokal: cuaca deterministik per lokasi, menghitung jumlah fetch."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, location: str, units: str, include_forecast: bool) -> Weather:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)  # simulasi round trip ke API cuaca
+        seed = zlib.crc32(location.encode())
+        celsius = 18 + seed % 15
+        forecast = None
+        if include_forecast:
+            forecast = tuple(_CONDITIONS[(seed >> (3 * day)) % len(_CONDITIONS)] for day in range(5))
+        return Weather(
+            location=location.title(),
+            units=units,
+            temperature=celsius if units == "celsius" else round(celsius * 9 / 5 + 32),
+            condition=_CONDITIONS[seed % len(_CONDITIONS)],
+            forecast=forecast,
+        )
+
+
+class WeatherService:
+    """Cache TTL + fetch paralel di depan WeatherProvider."""
+
+    def __init__(
+        self,
+        provider: WeatherProvider,
+        *,
+        ttl: float = 600.0,
+        cache: TTLCache | None = None,
+        max_workers: int = 8,
+    ):
+        self.provider = provider
+        # fetch yang gagal di-cache sebentar (None), supaya upstream yang down tidak dihajar terus
+        self.cache = cache or TTLCache(maxsize=10_000, ttl=ttl, negative_ttl=10)
+        self.max_workers = max_workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="weather")
+            return self._pool
+
+    def _fetch(self, key: tuple[str, str, bool]) -> Weather | None:
+        try:
+            return self.provider.fetch(*key)
+        except Exception:
+            return None
+
+    def _fetch_many(self, keys: list[tuple[str, str, bool]]) -> dict[tuple[str, str, bool], Weather | None]:
+        if len(keys) == 1:
+            return {keys[0]: self._fetch(keys[0])}
+        return dict(zip(keys, self._executor().map(self._fetch, keys)))
+
+    def get(self, location: str, units: str = "celsius", include_forecast: bool = False) -> Weather | None:
+        return self.get_many([location], units, include_forecast)[location]
+
+    def get_many(
+        self, locations: Iterable[str], units: str = "celsius", include_forecast: bool = False
+    ) -> dict[str, Weather | None]:
+        """{lokasi seperti yang diminta: Weather, atau None kalau provider gagal}."""
+        locations = list(dict.fromkeys(locations))
+        keys = {location: (normalize_location(location), units, include_forecast) for location in locations}
+        found = self.cache.get_many_or_load(keys.values(), self._fetch_many)
+        return {location: found[key] for location, key in keys.items()}
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+if __name__ == "__main__":
+    import random
+
+    cities = ["Jakarta", "Bandung", "Surabaya", "Medan", "Semarang", "Makassar", "Denpasar", "Yogyakarta",
+              "Singapore", "Tokyo", "Paris", "London", "New York", "Sydney", "-6.2,106.8"]
+    variants = [str.lower, str.upper, str.title, lambda c: f"  {c} ", lambda c: c]
+    rng = random.Random(0)
+    # trafik agent: 300 panggilan tool, 1-4 lokasi per panggilan, kota yang sama berulang
+    calls = [
+        [rng.choice(variants)(rng.choice(cities)) for _ in range(rng.randint(1, 4))]
+        for _ in range(300)
+    ]
+    latency = 0.02
+    n_locations = sum(len(call) for call in calls)
+
+    naive = FakeWeatherProvider(latency)
+    start = time.perf_counter()
+    for call in calls:
+        for location in call:
+            naive.fetch(location, "celsius", False)
+    naive_elapsed = time.perf_counter() - start
+
+    provider = FakeWeatherProvider(latency)
+    service = WeatherService(provider)
+    start = time.perf_counter()
+    for call in calls:
+        results = service.get_many(call)
+    elapsed = time.perf_counter() - start
+    print(f"{len(calls)} panggilan tool, {n_locations} lokasi, latency upstream {latency * 1000:.0f}ms:")
+    print(f"  tanpa cache: {naive.calls} fetch, {naive_elapsed:.2f}s")
+    print(f"  WeatherService: {provider.calls} fetch, {elapsed:.2f}s (hit rate {service.cache.stats.hit_rate:.1%})")
+    assert provider.calls == len({normalize_location(city) for city in cities})
+
+    # satu panggilan dengan banyak lokasi baru: fetch paralel
+    provider = FakeWeatherProvider(latency)
+    service = WeatherService(provider)
+    start = time.perf_counter()
+    results = service.get_many(cities, include_forecast=True)
+    print(f"  {len(cities)} lokasi baru dalam satu panggilan: {(time.perf_counter() - start) * 1000:.0f}ms "
+          f"(berurutan ~{len(cities) * latency * 1000:.0f}ms)")
+    print(results["Jakarta"].format())
+    assert service.get("  JAKARTA ", include_forecast=True) == results["Jakarta"] and provider.calls == len(cities)
+    service.shutdown()